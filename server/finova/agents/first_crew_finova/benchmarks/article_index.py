@@ -0,0 +1,95 @@
+"""Article catalog index: build time, prompt size and local matching on a large catalog.
+
+Writes a synthetic catalog of `--articles` entries in Node's JSON format, plus a
+few known articles, and runs the articles module over a sample invoice: index
+build, a cached reload, the prompt candidates for the invoice text and the local
+matching of its line items. Compares the candidate JSON with the whole catalog
+that used to go into the prompt.
+
+    python benchmarks/article_index.py [--articles 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "first_crew_finova")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+import articles  # noqa: E402
+
+NOUNS = ["pix", "creion", "hartie", "caiet", "dosar", "biblioraft", "toner", "cartus", "cafea", "zahar", "apa",
+         "suc", "bec", "cablu", "priza", "surub", "diblu", "vopsea", "pensula", "manusi", "detergent", "sapun"]
+DETAILS = ["rosu", "albastru", "negru", "alb", "verde", "mare", "mic", "premium", "eco", "A4", "A5", "1L", "2L",
+           "500ml", "10buc", "set", "cu capac", "fara capac"]
+BRANDS = ["Bic", "Pelikan", "Stabilo", "Jacobs", "Dorna", "Philips", "Bosch", "Makita"]
+KNOWN = {
+    "K001": "Pix roșu cu capac",
+    "K002": "Hârtie copiator A4 500 coli",
+    "K003": "Cafea boabe Jacobs Krönung 1kg",
+}
+INVOICE = """FACTURA FISCALA seria BRT nr. 5521 din 03.03.2025
+Furnizor: Birotica Expres S.R.L. CUI RO1234567
+1. Pix rosu cu capac 10 buc 2,50 25,00
+2. Hartie copiator A4 500 coli 5 top 20,00 100,00
+3. Cafea boabe Jacobs Kronung 1 kg 45,00 45,00
+4. Suport documente plastic 2 buc 15,00 30,00
+Total de plata 200,00 lei"""
+LINE_ITEMS = [
+    {"name": "Pix rosu cu capac", "articleCode": "NEW1", "isNew": True},
+    {"name": "Hartie copiator A4 500 coli", "articleCode": "NEW2", "isNew": True},
+    {"name": "Cafea boabe Jacobs Kronung 1kg", "articleCode": "NEW3", "isNew": True},
+    {"name": "Suport documente plastic", "articleCode": "NEW4", "isNew": True},
+]
+
+
+def synthetic_catalog(size, seed=0):
+    rng = random.Random(seed)
+    catalog = {}
+    for i in range(size):
+        name = " ".join((rng.choice(NOUNS), rng.choice(BRANDS), rng.choice(DETAILS), rng.choice(DETAILS)))
+        catalog[f"ART{i:06d}"] = {"name": name, "vat": "NINETEEN", "unitOfMeasure": "BUCATA", "type": "Marfuri"}
+    for code, name in KNOWN.items():
+        catalog[code] = {"name": name, "vat": "NINETEEN", "unitOfMeasure": "BUCATA", "type": "Marfuri"}
+    return catalog
+
+
+def timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    print(f"{label:<28} {(time.perf_counter() - started) * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=20000)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.articles)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(catalog, f)
+        path = f.name
+    try:
+        index = timed("build index", lambda: articles.load(path))
+        timed("reload (cached)", lambda: articles.load(path))
+        candidates = timed("prompt candidates", lambda: index.prompt_articles(INVOICE))
+        data = {"line_items": [dict(item) for item in LINE_ITEMS]}
+        timed("match line items", lambda: index.match_line_items(data))
+    finally:
+        os.remove(path)
+
+    full, sent = len(json.dumps(catalog, ensure_ascii=False)), len(json.dumps(candidates, ensure_ascii=False))
+    print(f"\nprompt articles: {len(candidates)} of {len(catalog)}; {sent} chars instead of {full} "
+          f"(~{sent // 4} vs ~{full // 4} tokens)")
+    print(f"known articles among the candidates: {sum(code in candidates for code in KNOWN)}/{len(KNOWN)}")
+    for item in data["line_items"]:
+        print(f"  {item['name']:<34} -> {item['articleCode']} {'(new)' if item['isNew'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
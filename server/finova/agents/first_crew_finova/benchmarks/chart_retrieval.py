@@ -0,0 +1,85 @@
+"""Prompt size and account recall of chart_retrieval, full chart vs candidates.
+
+Each sample is a short invoice text (line items with the usual header noise) and
+the account codes an accountant would post its lines to. Retrieval runs over the
+built-in chart (chart_fallback). A sample is a hit when every expected code is
+among the candidates sent to the model. Tokens are chars / 4.
+
+    python benchmarks/chart_retrieval.py [--top-k 40]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "first_crew_finova")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+import chart_of_accounts  # noqa: E402
+import chart_retrieval  # noqa: E402
+from chart_fallback import FALLBACK_CHART_OF_ACCOUNTS  # noqa: E402
+
+HEADER = ("FACTURĂ FISCALĂ seria FNV nr. 1043 din 12.03.2025\nFurnizor: {vendor} S.R.L. CUI RO123456 "
+          "Reg. Com. J40/1/2010\nCumpărător: Client Test S.R.L. CUI 654321\nBanca Transilvania IBAN RO49BTRL\n")
+FOOTER = "\nTotal fără TVA {total}\nTVA 19%\nTotal de plată {total} lei\nSemnătura și ștampila"
+
+SAMPLES = [
+    ("fuel", "Petrom", ["Motorină standard 120 L", "Benzină 95 40 L"], ["6022"]),
+    ("rent", "Imobiliare", ["Chirie spațiu birou martie 2025", "Utilități refacturate"], ["6123"]),
+    ("telecom", "Orange", ["Abonament telefonie mobilă", "Internet fibră 1 Gbps"], ["626"]),
+    ("transport", "Fan Courier", ["Servicii transport marfă București-Cluj"], ["624"]),
+    ("courier", "Cargus", ["Expediere colet curier"], ["626"]),
+    ("utilities", "Enel", ["Energie electrică activă consum februarie"], ["6051"]),
+    ("gas", "Engie", ["Gaze naturale consum februarie"], ["6053"]),
+    ("water", "Apa Nova", ["Apă potabilă și canalizare"], ["6052"]),
+    ("repairs", "Auto Service", ["Reparație instalație climatizare", "Manoperă service auto"], ["611"]),
+    ("insurance", "Allianz", ["Poliță RCA autoturism", "Asigurare CASCO"], ["613"]),
+    ("advertising", "Media", ["Campanie publicitate online", "Reclamă panou stradal"], ["6232"]),
+    ("bank fees", "BRD", ["Comision administrare cont", "Comision transfer bancar"], ["627"]),
+    ("goods", "Metro", ["Marfă pentru revânzare cafea 10 kg", "Zahăr marfă 50 kg"], ["371", "607"]),
+    ("consumables", "Office Direct", ["Rechizite birou pixuri", "Hârtie copiator A4"], ["6028"]),
+    ("travel", "Hotel Central", ["Cazare 2 nopți delegație", "Mic dejun"], ["625"]),
+    ("consulting", "Consult", ["Servicii de consultanță fiscală"], ["618"]),
+    ("services sold", "Client Test", ["Servicii prestate dezvoltare software"], ["704"]),
+    ("spare parts", "Auto Parts", ["Piese de schimb filtru ulei", "Plăcuțe frână"], ["6024"]),
+]
+
+
+def sample_text(vendor, lines):
+    items = "\n".join(f"{i}. {line} 1 buc 100,00 19,00" for i, line in enumerate(lines, 1))
+    return HEADER.format(vendor=vendor) + items + FOOTER.format(total=100 * len(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top-k", type=int, default=chart_retrieval.TOP_K)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    chart = chart_of_accounts.ChartOfAccounts(FALLBACK_CHART_OF_ACCOUNTS)
+    chart.index
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"full chart: {len(chart.text)} chars, ~{len(chart.text) // 4} tokens; "
+          f"parsed and indexed in {build_ms:.1f} ms\n")
+
+    print(f"{'sample':<14} {'chars':>6} {'tokens':>7} {'ms':>5}  expected")
+    hits, total_chars = 0, 0
+    for label, vendor, lines, expected in SAMPLES:
+        started = time.perf_counter()
+        candidates = chart_retrieval.candidate_chart(chart, sample_text(vendor, lines), args.top_k)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        codes = chart_of_accounts.ChartOfAccounts(candidates).accounts
+        missing = [code for code in expected if code not in codes]
+        hits += not missing
+        total_chars += len(candidates)
+        found = "ok" if not missing else "MISSING " + ",".join(missing)
+        print(f"{label:<14} {len(candidates):>6} {len(candidates) // 4:>7} {elapsed_ms:>5.1f}  {','.join(expected)} {found}")
+
+    average = total_chars / len(SAMPLES)
+    print(f"\nrecall {hits}/{len(SAMPLES)}; average {average:.0f} chars, "
+          f"{average / len(chart.text):.0%} of the full chart")
+
+
+if __name__ == "__main__":
+    main()
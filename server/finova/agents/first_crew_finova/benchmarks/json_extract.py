@@ -0,0 +1,155 @@
+"""JSON answer extraction: the legacy extract_json_from_text scan vs json_extract.
+
+Accuracy is checked on the fixture corpus in fixtures/json_extract (one .txt per
+case, the expected objects in expected.json). Speed is measured on synthetic
+~100 KB agent transcripts: thoughts, tool calls and an OCR observation full of
+braces and quotes, followed by the final answer, once as a bare object and once
+inside a code fence.
+
+The legacy scan is copied below without its logging: json.loads of the whole
+text, a brace counter that ignores string literals with json.loads on every
+candidate, a code-fence regex and per-field regexes.
+
+    python benchmarks/json_extract.py [--size-kb 100] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "first_crew_finova")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+import json_extract  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "json_extract")
+
+
+def legacy_extract(text):
+    text = re.sub(r'\x1b\[[0-9;]*m', '', text).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    results, brace_count, start_idx = [], 0, -1
+    for i, char in enumerate(text):
+        if char == '{':
+            if brace_count == 0:
+                start_idx = i
+            brace_count += 1
+        elif char == '}':
+            brace_count -= 1
+            if brace_count == 0 and start_idx != -1:
+                try:
+                    results.append(json.loads(text[start_idx:i + 1]))
+                    if len(results) >= 5:
+                        break
+                except json.JSONDecodeError:
+                    pass
+                start_idx = -1
+    if results:
+        results.sort(key=lambda x: len(x.keys()), reverse=True)
+        return results[0]
+    json_in_code = re.search(r'```(?:json)?\s*(\{[^`]+\})\s*```', text, re.DOTALL)
+    if json_in_code:
+        try:
+            return json.loads(json_in_code.group(1))
+        except json.JSONDecodeError:
+            pass
+    if any(keyword in text.lower() for keyword in json_extract.FIELD_KEYWORDS):
+        result = {}
+        for key in json_extract._STRING_FIELDS + json_extract._NUMBER_FIELDS:
+            value_pattern = r'([\d.]+)' if key in json_extract._NUMBER_FIELDS else r'"([^"]+)"'
+            match = re.search(rf'"{key}"\s*:\s*' + value_pattern, text, re.IGNORECASE)
+            if match:
+                try:
+                    result[key] = float(match.group(1)) if key in json_extract._NUMBER_FIELDS else match.group(1)
+                except ValueError:
+                    result[key] = match.group(1)
+        line_items_match = re.search(r'"line_items"\s*:\s*\[(.*?)\]', text, re.DOTALL | re.IGNORECASE)
+        if line_items_match:
+            try:
+                result['line_items'] = json.loads('[' + line_items_match.group(1) + ']')
+            except Exception:
+                result['line_items'] = []
+        if result:
+            return result
+    return {}
+
+
+def new_extract(text):
+    return json_extract.extract_json(text)[0]
+
+
+def answer(line_items):
+    return {
+        "document_type": "Invoice", "direction": "incoming", "vendor": "Birotica Expres S.R.L.", "vendor_ein": "1234567",
+        "buyer": "Client Test S.R.L.", "buyer_ein": "654321", "document_number": "BRT 5521",
+        "document_date": "03-03-2025", "total_amount": 2500.0, "vat_amount": 399.16, "currency": "RON",
+        "line_items": [{"name": f"Articol {i} {{model {i % 7}}}", "quantity": i % 9 + 1, "unit_price": 10.5,
+                        "vat_amount": 1.99, "total": 12.49, "type": "Marfuri", "articleCode": f"ART{i:03d}",
+                        "um": "BUCATA", "account_code": "371", "isNew": False} for i in range(line_items)],
+    }
+
+
+def transcript(size_kb, fenced):
+    observation = []
+    i = 0
+    while sum(map(len, observation)) < size_kb * 1024 * 0.7:
+        observation.append(f'{i}. Produs "{i}" {{cod {i}}} 1 buc 10,50 lei; nota: pret/unit }} }} {{\n')
+        i += 1
+    final = json.dumps(answer(line_items=int(size_kb * 1.2)), ensure_ascii=False, indent=2)
+    if fenced:
+        final = "```json\n" + final + "\n```"
+    return ("Thought: I need the document text.\nAction: Text Extractor\n"
+            'Action Input: {"file_path": "/tmp/document.pdf"}\nObservation: ' + "".join(observation)
+            + "\nThought: I now know the final answer\nFinal Answer: " + final + "\n")
+
+
+def fixtures():
+    with open(os.path.join(FIXTURES, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    for name, value in sorted(expected.items()):
+        with open(os.path.join(FIXTURES, f"{name}.txt"), encoding="utf-8") as f:
+            yield name, f.read(), value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<24} {'legacy':>7} {'new':>7}")
+    correct = {"legacy": 0, "new": 0}
+    cases = list(fixtures())
+    for name, text, expected in cases:
+        marks = []
+        for label, extract in (("legacy", legacy_extract), ("new", new_extract)):
+            ok = extract(text) == expected
+            correct[label] += ok
+            marks.append("ok" if ok else "WRONG")
+        print(f"{name:<24} {marks[0]:>7} {marks[1]:>7}")
+    print(f"accuracy: legacy {correct['legacy']}/{len(cases)}, new {correct['new']}/{len(cases)}\n")
+
+    for fenced in (False, True):
+        text = transcript(args.size_kb, fenced)
+        expected = answer(line_items=int(args.size_kb * 1.2))
+        timings = {}
+        for label, extract in (("legacy", legacy_extract), ("new", new_extract)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                result = extract(text)
+            timings[label] = (time.perf_counter() - started) * 1000 / args.repeat
+            timings[label + "_ok"] = result == expected
+        print(f"{len(text) // 1024} KB transcript{' (code fence)' if fenced else ''}: "
+              f"legacy {timings['legacy']:.2f} ms ({'ok' if timings['legacy_ok'] else 'WRONG'}), "
+              f"new {timings['new']:.2f} ms ({'ok' if timings['new_ok'] else 'WRONG'}), "
+              f"{timings['legacy'] / timings['new']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
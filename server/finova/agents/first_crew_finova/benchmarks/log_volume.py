@@ -0,0 +1,164 @@
+"""Stderr volume and time per document at each log level.
+
+Runs the phase 1 extract path of main.py (`run_job` -> `process_single_document` ->
+`process_with_retry`) against a stub crew that returns canned task outputs, so no
+LLM is called, and counts the bytes the logging handler writes.
+
+TRACE with the budget disabled emits every former debug print including the full
+payload dumps, so it stands in for the old always-on output. INFO is the default.
+
+    python benchmarks/log_volume.py [--documents 20] [--line-items 40]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "first_crew_finova")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("FINOVA_STATE_DIR", tempfile.mkdtemp(prefix="finova_log_volume_"))
+
+import document_models  # noqa: E402
+import jsonlog  # noqa: E402
+import main  # noqa: E402
+
+
+class CountingStream:
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode("utf-8"))
+
+    def flush(self):
+        pass
+
+
+class TaskOutput:
+    def __init__(self, payload):
+        self.raw = "Final answer:\n" + json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+class CrewResult:
+    def __init__(self, outputs):
+        self.tasks_output = outputs
+
+
+class StubCrew:
+    def __init__(self, outputs):
+        self.tasks = []
+        self.outputs = outputs
+
+    def kickoff(self, inputs):
+        return CrewResult(self.outputs)
+
+
+def build_outputs(line_items: int):
+    invoice = {
+        "document_type": "Invoice",
+        "document_number": "FCT-2024-0042",
+        "document_date": "15-03-2024",
+        "vendor": "Exemplu Furnizor SRL",
+        "vendor_ein": "RO12345678",
+        "buyer": "Client Demo SRL",
+        "buyer_ein": "RO87654321",
+        "currency": "RON",
+        "total_amount": 11900.0,
+        "vat_amount": 1900.0,
+        "line_items": [
+            {
+                "description": f"Servicii consultanta contabila luna {i}",
+                "quantity": 1,
+                "unit_price": 250.0,
+                "vat_rate": 19,
+                "total": 297.5,
+                "account_code": "628",
+                "article_code": f"{1000 + i}",
+            }
+            for i in range(line_items)
+        ],
+    }
+    duplicates = {"is_duplicate": False, "duplicate_matches": [], "confidence": 0.0}
+    compliance = {
+        "compliance_status": "COMPLIANT",
+        "overall_score": 0.95,
+        "validation_rules": {"ro": ["Format CUI valid"], "en": ["Valid CUI format"]},
+        "errors": {"ro": [], "en": []},
+        "warnings": {"ro": [], "en": []},
+    }
+    return [TaskOutput(invoice), TaskOutput(duplicates), TaskOutput(compliance)]
+
+
+def make_stub_crew_class(outputs):
+    class StubFinovaCrew:
+        def __init__(self, client_company_ein, existing_articles, management_records, user_corrections, processing_phase):
+            self.processing_phase = processing_phase
+
+        def crew(self, extraction_task=None):
+            return StubCrew(outputs)
+
+        def extract_invoice_data_task(self):
+            return SimpleNamespace(output_pydantic=document_models.Invoice)
+
+        def extract_other_document_data_task(self, doc_type=""):
+            return SimpleNamespace(output_pydantic=document_models.model_for(doc_type))
+
+    return StubFinovaCrew
+
+
+def run_setting(level: str, budget_kb: int, documents: int, document_path: str):
+    os.environ["FINOVA_LOG_BUDGET_KB"] = str(budget_kb)
+    stream = CountingStream()
+    jsonlog.setup_logging(level, stream=stream)
+
+    job = {
+        "type": "extract",
+        "client_company_ein": "RO87654321",
+        "document_path": document_path,
+        "phase": 1,
+        "phase0_data": {"document_type": "Invoice", "direction": "incoming"},
+    }
+    started = time.perf_counter()
+    for _ in range(documents):
+        result = main.run_job(dict(job))
+        assert "data" in result, result
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return stream.bytes / documents, elapsed_ms / documents
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--line-items", type=int, default=40)
+    args = parser.parse_args()
+
+    main.get_crew_class = lambda: make_stub_crew_class(build_outputs(args.line_items))
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as document:
+        document.write(b"%PDF-1.4 benchmark document\n")
+
+    settings = [
+        ("TRACE, no budget (old output)", "TRACE", 0),
+        ("DEBUG", "DEBUG", jsonlog.DEFAULT_BUDGET_KB),
+        ("INFO (default)", "INFO", jsonlog.DEFAULT_BUDGET_KB),
+    ]
+    try:
+        rows = [(label, *run_setting(level, budget, args.documents, document.name)) for label, level, budget in settings]
+    finally:
+        os.remove(document.name)
+        jsonlog.setup_logging("INFO")
+
+    baseline_bytes, baseline_ms = rows[0][1], rows[0][2]
+    print(f"{'setting':<32} {'stderr bytes/doc':>17} {'ms/doc':>8} {'bytes saved':>12} {'ms saved':>9}")
+    for label, bytes_per_doc, ms_per_doc in rows:
+        print(f"{label:<32} {bytes_per_doc:>17,.0f} {ms_per_doc:>8.2f} "
+              f"{baseline_bytes - bytes_per_doc:>12,.0f} {baseline_ms - ms_per_doc:>9.2f}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
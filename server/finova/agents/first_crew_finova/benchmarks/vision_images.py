@@ -0,0 +1,85 @@
+"""Upload bytes and estimated image tokens per page, old encoding vs image_prep.
+
+Draws synthetic 200 dpi A4 scans (a dense invoice, a sparse receipt-like page and
+a blank page) with scanner margins and noise. Each page goes through the old
+full size RGB detail=high encoding and through `image_prep.prepare_page`. No
+request is sent; tokens use the gpt-4o image accounting in image_prep.
+
+    python benchmarks/vision_images.py [--save-dir DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "first_crew_finova")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+import image_prep  # noqa: E402
+
+A4_200_DPI = (1654, 2339)
+# 10 pt text at 200 dpi.
+FONT_PX = 28
+
+
+def scanned_page(lines, font_px=FONT_PX, seed=0):
+    rng = random.Random(seed)
+    page = Image.new("RGB", A4_200_DPI, (250, 249, 246))
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=font_px)
+    y = 180
+    for line in lines:
+        draw.text((160, y), line, fill=(20, 20, 20), font=font)
+        y += int(font_px * 1.5)
+    for _ in range(400):
+        x, y = rng.randrange(A4_200_DPI[0]), rng.randrange(A4_200_DPI[1])
+        draw.point((x, y), fill=(235, 235, 232))
+    return page
+
+
+def sample_pages():
+    invoice = ["FACTURA FISCALA  Seria FCT  Nr. 2024-0042  Data 15.03.2024",
+               "Furnizor: Exemplu Furnizor SRL  CUI RO12345678  Reg. Com. J40/123/2010",
+               "Cumparator: Client Demo SRL  CUI RO87654321", ""]
+    invoice += [f"{i:>3}. Servicii consultanta contabila luna {i:<3} buc 1  250,00  19%  297,50"
+                for i in range(1, 46)]
+    invoice += ["", "Total fara TVA: 11.250,00 RON   TVA: 2.137,50 RON   Total: 13.387,50 RON"]
+    receipt = ["BON FISCAL", "Magazin Demo SRL  CUI RO11223344", "Cafea  2 x 9,50  19,00",
+               "TOTAL  19,00 RON", "Numerar 20,00  Rest 1,00"]
+    return [
+        ("dense invoice", scanned_page(invoice, seed=1)),
+        ("sparse receipt", scanned_page(receipt, font_px=48, seed=2)),
+        ("blank page", scanned_page([], seed=3)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save-dir", help="Write the prepared JPEGs here for visual inspection")
+    args = parser.parse_args()
+
+    print(f"{'page':<16} {'old KB':>7} {'old tok':>8} {'new KB':>7} {'new tok':>8} {'detail':>7} {'size':>10} {'prep ms':>8}")
+    totals = [0, 0, 0, 0]
+    for label, image in sample_pages():
+        old = image_prep.encode_unprocessed(image)
+        started = time.perf_counter()
+        new = image_prep.prepare_page(image)
+        prep_ms = (time.perf_counter() - started) * 1000
+        if args.save_dir and not new.blank:
+            os.makedirs(args.save_dir, exist_ok=True)
+            with open(os.path.join(args.save_dir, label.replace(" ", "_") + ".jpg"), "wb") as f:
+                f.write(new.jpeg)
+        detail = "skip" if new.blank else new.detail
+        print(f"{label:<16} {len(old.jpeg) / 1024:>7.0f} {old.estimated_tokens:>8} {len(new.jpeg) / 1024:>7.0f} "
+              f"{new.estimated_tokens:>8} {detail:>7} {f'{new.width}x{new.height}':>10} {prep_ms:>8.1f}")
+        for i, value in enumerate((len(old.jpeg), old.estimated_tokens, len(new.jpeg), new.estimated_tokens)):
+            totals[i] += value
+    print(f"{'total':<16} {totals[0] / 1024:>7.0f} {totals[1]:>8} {totals[2] / 1024:>7.0f} {totals[3]:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Local check and repair of the account codes the LLM assigns.
+
+Invoice line items (`account_code`) and bank transaction attributions
+(`account_code`, `alternative_accounts[].code`) are checked against the parsed
+chart (chart_of_accounts) with one dict lookup each. A code passes when its base,
+the digits before an analytic suffix such as "4111.01", is an account of the chart
+at synthetic level or below. Class and group codes (one or two digits) are not
+postable, so they do not pass.
+
+A code that fails is repaired without another LLM call:
+
+1. Walk up the code's prefixes to the deepest code the chart has: "6029" → 602,
+   "62400" → 624, "62" → the group itself.
+2. Pick the postable account under it whose name best matches the item's name
+   (BM25 of chart_retrieval). If no name matches, the ancestor itself is used,
+   when it is postable.
+3. If no prefix exists, pick the best name match in the whole chart.
+
+Each change is recorded in the output under `account_code_repairs`, with the
+original code, the new one and how it was found. Codes that cannot be repaired
+stay as they are and are recorded with `account_code: null`.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from chart_of_accounts import ChartOfAccounts
+from jsonlog import get_logger
+
+logger = get_logger("account_codes")
+
+_BASE = re.compile(r"^\s*(\d{1,6})(?:[.\-/]\w+)?\s*$")
+POSTABLE_LEVELS = ("synthetic", "analytic")
+
+
+class Repair(NamedTuple):
+    original: str
+    account_code: Optional[str]
+    # "prefix", "prefix+name", "name" or "unresolved"
+    method: str
+
+
+def is_valid(chart: ChartOfAccounts, code: Any) -> bool:
+    match = _BASE.match(str(code))
+    if not match:
+        return False
+    account = chart.get(match.group(1))
+    return account is not None and account.level in POSTABLE_LEVELS
+
+
+def _postable(chart: ChartOfAccounts, code: str) -> bool:
+    account = chart.get(code)
+    return account is not None and account.level in POSTABLE_LEVELS
+
+
+def _descendants(chart: ChartOfAccounts, code: str) -> List[str]:
+    found, pending = [], list(chart.children.get(code, ()))
+    while pending:
+        child = pending.pop()
+        found.append(child)
+        pending.extend(chart.children.get(child, ()))
+    return found
+
+
+def _best_by_name(chart: ChartOfAccounts, name: str, codes: Optional[List[str]] = None) -> Optional[str]:
+    if not name:
+        return None
+    scores = chart.index.scores(name)
+    if codes is not None:
+        allowed = set(codes)
+        scores = {code: score for code, score in scores.items() if code in allowed}
+    return max((code for code in scores if _postable(chart, code)), key=lambda code: scores[code], default=None)
+
+
+def repair(chart: ChartOfAccounts, code: Any, name: str = "") -> Repair:
+    """The nearest valid code to an invalid `code`, using the item's `name` to choose among candidates."""
+    original = str(code).strip()
+    digits = re.sub(r"\D", "", original.split(".")[0])
+    ancestor = next((digits[:length] for length in range(len(digits), 0, -1) if digits[:length] in chart), None)
+    if ancestor:
+        best = _best_by_name(chart, name, [ancestor] + _descendants(chart, ancestor))
+        if best:
+            return Repair(original, best, "prefix+name")
+        if _postable(chart, ancestor):
+            return Repair(original, ancestor, "prefix")
+    best = _best_by_name(chart, name)
+    if best:
+        return Repair(original, best, "name")
+    return Repair(original, None, "unresolved")
+
+
+def _check(chart: ChartOfAccounts, code: Any, name: str, where: Dict[str, Any], repairs: List[Dict[str, Any]]) -> Any:
+    """Return the code to keep, recording a repair in `repairs` when it changes."""
+    if code in (None, "") or is_valid(chart, code):
+        return code
+    fixed = repair(chart, code, name)
+    repairs.append(dict(where, **fixed._asdict()))
+    return fixed.account_code or code
+
+
+def check_line_items(chart: ChartOfAccounts, data: Dict[str, Any]) -> int:
+    """Validate and repair the `account_code` of every line item in place; returns the number of repairs."""
+    items = data.get("line_items")
+    if not isinstance(items, list) or not len(chart):
+        return 0
+    repairs: List[Dict[str, Any]] = []
+    for position, item in enumerate(items):
+        if isinstance(item, dict) and "account_code" in item:
+            item["account_code"] = _check(chart, item["account_code"], str(item.get("name") or ""),
+                                          {"line_item": position, "name": item.get("name")}, repairs)
+    _report(data, repairs, len(items))
+    return len(repairs)
+
+
+def check_attribution(chart: ChartOfAccounts, result: Dict[str, Any], description: str = "") -> int:
+    """Validate and repair an account attribution (main and alternative codes) in place."""
+    if not isinstance(result, dict) or not len(chart):
+        return 0
+    repairs: List[Dict[str, Any]] = []
+    name = " ".join(str(part) for part in (result.get("account_name"), description) if part)
+    if "account_code" in result:
+        result["account_code"] = _check(chart, result["account_code"], name, {"field": "account_code"}, repairs)
+        account = chart.get(str(result["account_code"]))
+        if repairs and account is not None:
+            result["account_name"] = account.name
+    alternatives = result.get("alternative_accounts")
+    alternatives = alternatives if isinstance(alternatives, list) else []
+    for position, alternative in enumerate(alternatives):
+        if isinstance(alternative, dict) and "code" in alternative:
+            alternative["code"] = _check(chart, alternative["code"], str(alternative.get("name") or ""),
+                                         {"field": f"alternative_accounts[{position}]"}, repairs)
+    _report(result, repairs, 1 + len(alternatives))
+    return len(repairs)
+
+
+def _report(data: Dict[str, Any], repairs: List[Dict[str, Any]], checked: int) -> None:
+    if not repairs:
+        return
+    data.setdefault("account_code_repairs", []).extend(repairs)
+    unresolved = sum(1 for entry in repairs if entry["account_code"] is None)
+    logger.info("Account codes: %d checked, %d repaired, %d unresolved", checked, len(repairs) - unresolved, unresolved,
+                extra={"fields": {"repairs": repairs}})
@@ -0,0 +1,180 @@
+"""Atomic allocation of new article codes, per client.
+
+The extraction prompt used to ask the LLM for the "next available" articleCode of
+a new article. Documents of the same client processed in parallel were given the
+same code, and the LLM skipped or repeated numbers within a document. The LLM now
+leaves the code of a new article empty; after local matching (articles) has
+decided which line items really are new, `assign_new_items` gives them codes from
+a sequence per client EIN, kept in a local sqlite file
+(`FINOVA_ARTICLE_CODES_PATH`, default article_codes.sqlite in the private state_dir).
+
+- Codes follow the backend's format, "ART" and the number padded to 3 digits.
+- A sequence never goes below 1 + the highest ART number of the client's catalog.
+- All the new items of a document are reserved in one transaction
+  (BEGIN IMMEDIATE), so concurrent workers and processes never share a code.
+- Reservations are remembered per document hash and article name: a retry or
+  re-run of the same document gets each article's code back, even when the LLM
+  lists the line items in another order, instead of burning new ones.
+- Line items with the same name in one document share a code.
+
+Each assignment is listed in the output under `article_code_allocations`. If the
+sqlite file cannot be used, the codes the LLM gave are kept.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from jsonlog import get_logger
+import state_dir
+
+logger = get_logger("article_codes")
+
+CODE_PREFIX = "ART"
+CODE_DIGITS = 3
+
+_CODE = re.compile(r"^\s*ART0*(\d+)\s*$", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    ein TEXT PRIMARY KEY,
+    next INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    ein TEXT NOT NULL,
+    document_hash TEXT NOT NULL,
+    codes TEXT NOT NULL,  -- JSON object, normalized article name -> code
+    created_at REAL NOT NULL,
+    PRIMARY KEY (ein, document_hash)
+);
+"""
+
+
+def format_code(number: int) -> str:
+    return f"{CODE_PREFIX}{number:0{CODE_DIGITS}d}"
+
+
+def name_key(name: Any) -> str:
+    """An article name as reservations key it: lower case, whitespace collapsed."""
+    return " ".join(str(name).lower().split())
+
+
+def _highest(codes: Iterable[str]) -> int:
+    numbers = [int(match.group(1)) for match in map(_CODE.match, map(str, codes)) if match]
+    return max(numbers, default=0)
+
+
+class ArticleCodeAllocator:
+    def __init__(self, path: str):
+        self.path = path
+        self.reserved = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite connections must not cross a fork, so pooled workers open their own.
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def reserve(self, ein: str, names: List[str], catalog: Iterable[str] = (), document_hash: str = "") -> Dict[str, str]:
+        """An unused article code of client `ein` for each of `names` (`name_key`s), reserved atomically.
+
+        With a `document_hash`, a name reserved earlier for that document gets its
+        code back, and only the new names take codes from the sequence, in order.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        floor = _highest(catalog) + 1
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                reserved: Dict[str, str] = {}
+                if document_hash:
+                    row = db.execute("SELECT codes FROM reservations WHERE ein = ? AND document_hash = ?",
+                                     (ein, document_hash)).fetchone()
+                    stored = json.loads(row[0]) if row else {}
+                    # Rows written before reservations were keyed by name hold a bare list.
+                    reserved = stored if isinstance(stored, dict) else {}
+                missing = [name for name in names if name not in reserved]
+                if missing:
+                    row = db.execute("SELECT next FROM sequences WHERE ein = ?", (ein,)).fetchone()
+                    start = max(row[0] if row else 0, floor)
+                    reserved.update((name, format_code(start + offset)) for offset, name in enumerate(missing))
+                    db.execute("INSERT OR REPLACE INTO sequences (ein, next) VALUES (?, ?)", (ein, start + len(missing)))
+                    if document_hash:
+                        db.execute("INSERT OR REPLACE INTO reservations (ein, document_hash, codes, created_at) "
+                                   "VALUES (?, ?, ?, ?)", (ein, document_hash, json.dumps(reserved), time.time()))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            self.reserved += len(missing)
+            self.reused += len(names) - len(missing)
+        return {name: reserved[name] for name in names}
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"reserved": self.reserved, "reused": self.reused}
+        try:
+            with self._lock:
+                stats["clients"] = self._db().execute("SELECT COUNT(*) FROM sequences").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+_allocator: Optional[ArticleCodeAllocator] = None
+
+
+def get_allocator() -> ArticleCodeAllocator:
+    global _allocator
+    if _allocator is None:
+        configured = os.getenv("FINOVA_ARTICLE_CODES_PATH")
+        path = state_dir.private_file(configured) if configured else state_dir.path("article_codes.sqlite")
+        _allocator = ArticleCodeAllocator(path)
+    return _allocator
+
+
+def stats() -> Dict[str, Any]:
+    return get_allocator().stats() if _allocator is not None else {"reserved": 0, "reused": 0}
+
+
+def assign_new_items(ein: str, data: Dict[str, Any], catalog: Dict[str, Any], document_hash: str = "") -> int:
+    """Give every new line item (isNew, or a code the catalog does not have) a reserved code, in place."""
+    items = data.get("line_items")
+    if not ein or not isinstance(items, list):
+        return 0
+    new_items = [(position, item) for position, item in enumerate(items)
+                 if isinstance(item, dict) and item.get("name")
+                 and (item.get("isNew") or str(item.get("articleCode") or "") not in catalog)]
+    if not new_items:
+        return 0
+    names = [name_key(item["name"]) for _, item in new_items]
+    try:
+        codes = get_allocator().reserve(ein, names, catalog, document_hash)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Article code allocation failed, keeping the extracted codes: %s", e)
+        return 0
+    allocations = []
+    for position, item in new_items:
+        code = codes[name_key(item["name"])]
+        allocations.append({"line_item": position, "name": item["name"],
+                            "original_code": item.get("articleCode"), "articleCode": code})
+        item.update(articleCode=code, isNew=True)
+    data.setdefault("article_code_allocations", []).extend(allocations)
+    logger.info("Article codes: %d reserved for %d new line items (%s)", len(codes), len(allocations),
+                ", ".join(sorted(codes.values())))
+    return len(codes)
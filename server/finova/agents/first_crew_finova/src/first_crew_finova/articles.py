@@ -0,0 +1,263 @@
+"""Per-client article catalog index and local matching of line-item names.
+
+The client's articles used to be read into a dict for every document and put
+whole into the extraction prompt, so that the LLM could match "same thing,
+different name" line items to existing codes. Clients with 20k+ articles did not
+fit in the context window. The `existing_articles_file` Node passes was ignored
+in favour of the bundled articles.csv.
+
+`load(path)` reads the catalog: Node's JSON (code → {name, vat, unitOfMeasure,
+type}) or a CSV with those columns. It returns an `ArticleIndex`, cached by the
+file's mtime and size and by content digest, because Node writes the same
+catalog to a new temp file for every document. The index has:
+
+- names normalized (lowercase, diacritics folded, punctuation dropped);
+- a token → articles inverted index, with IDF weights;
+- a character trigram → token index over the vocabulary, so a misspelled or
+  inflected word ("pixuri", "pix") still finds its articles.
+
+`match(name)` ranks articles by token overlap, then by trigram similarity of the
+whole name. It is used twice:
+
+- `prompt_articles(text)` puts only the best candidates for the document's lines
+  into the prompt (`FINOVA_ARTICLE_PROMPT_LIMIT`, default 50). Smaller catalogs are
+  sent whole.
+- `match_line_items(data)` checks the extracted line items after the crew. An item
+  the LLM marked new, or gave an unknown code, takes the code and name of an
+  article whose name is at least `FINOVA_ARTICLE_MATCH_THRESHOLD` (default 0.8)
+  similar, unless another article is about as similar. Each change is listed
+  under `article_matches`.
+"""
+
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from jsonlog import get_logger
+
+logger = get_logger("articles")
+
+PROMPT_LIMIT = int(os.getenv("FINOVA_ARTICLE_PROMPT_LIMIT", "50"))
+MATCH_THRESHOLD = float(os.getenv("FINOVA_ARTICLE_MATCH_THRESHOLD", "0.8"))
+# Vocabulary words at least this trigram-similar to a query word count as a fuzzy hit.
+MIN_TOKEN_SIMILARITY = 0.4
+# Articles re-ranked by whole-name similarity per query.
+RERANK_CANDIDATES = 50
+# Candidates per document line for the prompt.
+LINE_CANDIDATES = 5
+# A local match must beat the runner-up by this much; otherwise the name is ambiguous.
+AMBIGUITY_MARGIN = 0.05
+CATALOGS_KEPT = 8
+MAX_QUERY_LINES = 400
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class ArticleMatch(NamedTuple):
+    code: str
+    name: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_WORD.findall(folded))
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(left: Set[str], right: Set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+class ArticleIndex:
+    def __init__(self, articles: Dict[str, Dict[str, Any]]):
+        self.articles = articles
+        self.codes = list(articles)
+        self.names = [normalize(article.get("name", "")) for article in articles.values()]
+        self.name_trigrams = [_trigrams(name) for name in self.names]
+        self.postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            for token in set(name.split()):
+                self.postings.setdefault(token, []).append(position)
+        total = len(self.codes)
+        self.idf = {token: math.log(1 + total / len(found)) for token, found in self.postings.items()}
+        self.vocabulary_trigrams: Dict[str, List[str]] = {}
+        for token in self.postings:
+            if len(token) >= 3 and not token.isdigit():
+                for trigram in _trigrams(token):
+                    self.vocabulary_trigrams.setdefault(trigram, []).append(token)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _similar_tokens(self, token: str, memo: Dict[str, List[Tuple[str, float]]]) -> List[Tuple[str, float]]:
+        """Vocabulary words matching `token`: itself when known, else trigram-similar words."""
+        if token in memo:
+            return memo[token]
+        if token in self.postings:
+            similar = [(token, 1.0)]
+        elif len(token) < 3 or token.isdigit():
+            similar = []
+        else:
+            query = _trigrams(token)
+            shared: Counter = Counter()
+            for trigram in query:
+                shared.update(self.vocabulary_trigrams.get(trigram, ()))
+            similar = []
+            for word, count in shared.items():
+                # A padded word of n letters has n trigrams.
+                score = 2 * count / (len(query) + len(word))
+                if score >= MIN_TOKEN_SIMILARITY:
+                    similar.append((word, score))
+        memo[token] = similar
+        return similar
+
+    def match(self, name: str, k: int = 5, memo: Optional[Dict] = None) -> List[ArticleMatch]:
+        """The `k` articles whose names best match `name`, best first; scores are 0..1."""
+        normalized = normalize(name)
+        if not normalized or not self.codes:
+            return []
+        memo = {} if memo is None else memo
+        token_scores: Counter = Counter()
+        for token in set(normalized.split()):
+            for word, similarity in self._similar_tokens(token, memo):
+                weight = self.idf[word] * similarity
+                for position in self.postings[word]:
+                    token_scores[position] += weight
+        if not token_scores:
+            return []
+        query = _trigrams(normalized)
+        ranked = sorted(((_dice(query, self.name_trigrams[position]), position)
+                         for position, _ in token_scores.most_common(RERANK_CANDIDATES)), reverse=True)
+        return [ArticleMatch(self.codes[position], self.articles[self.codes[position]].get("name", ""), round(score, 3))
+                for score, position in ranked[:k]]
+
+    def prompt_articles(self, text: str, limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """The catalog entries worth showing the LLM for a document: best matches of its lines."""
+        limit = limit or PROMPT_LIMIT
+        if len(self.codes) <= limit:
+            return self.articles
+        best: Dict[str, float] = {}
+        memo: Dict[str, List[Tuple[str, float]]] = {}
+        lines = [line for line in (text or "").splitlines() if len(line.strip()) > 2]
+        for line in lines[:MAX_QUERY_LINES]:
+            for found in self.match(line, LINE_CANDIDATES, memo):
+                if found.score > best.get(found.code, 0.0):
+                    best[found.code] = found.score
+        chosen = sorted(best, key=best.get, reverse=True)[:limit]
+        logger.info("Articles: %d of %d sent to the prompt", len(chosen), len(self.codes))
+        return {code: self.articles[code] for code in chosen}
+
+    def match_line_items(self, data: Dict[str, Any]) -> int:
+        """Point new or unknown line items at an existing article with a near-identical name."""
+        items = data.get("line_items")
+        if not isinstance(items, list) or not self.codes:
+            return 0
+        matches = []
+        for position, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("name"):
+                continue
+            if str(item.get("articleCode", "")) in self.articles and not item.get("isNew"):
+                continue
+            found = self.match(item["name"], 2)
+            if not found or found[0].score < MATCH_THRESHOLD:
+                continue
+            best = found[0]
+            if len(found) > 1 and best.score - found[1].score < AMBIGUITY_MARGIN:
+                continue
+            matches.append({"line_item": position, "name": item["name"], "original_code": item.get("articleCode"),
+                            "articleCode": best.code, "article_name": best.name, "score": best.score})
+            item.update(articleCode=best.code, name=best.name, isNew=False)
+        if matches:
+            data.setdefault("article_matches", []).extend(matches)
+            logger.info("Articles: %d of %d line items matched to existing articles", len(matches), len(items))
+        return len(matches)
+
+
+def _read(path: str, content: bytes) -> Dict[str, Dict[str, Any]]:
+    text = content.decode("utf-8-sig")
+    if path.lower().endswith(".json") or text.lstrip().startswith(("{", "[")):
+        data = json.loads(text) if text.strip() else {}
+        if isinstance(data, list):
+            data = {str(row.get("code")): row for row in data if isinstance(row, dict) and row.get("code")}
+        return {str(code): dict(article) for code, article in data.items() if isinstance(article, dict)}
+    articles = {}
+    for row in csv.DictReader(text.splitlines()):
+        articles[row["code"]] = {
+            "name": row["name"],
+            "vat": row["vat"],
+            "unitOfMeasure": row["unitOfMeasure"],
+            "type": row["type"]
+        }
+    return articles
+
+
+_lock = threading.Lock()
+_by_stamp: Dict[str, Tuple[int, int, str]] = {}
+_indexes: "OrderedDict[str, ArticleIndex]" = OrderedDict()
+
+
+def default_path() -> Optional[str]:
+    for path in (os.path.join(os.path.dirname(os.path.abspath(__file__)), "articles.csv"), "articles.csv"):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load(path: Optional[str] = None) -> ArticleIndex:
+    """The article index of a catalog file (the bundled articles.csv without one)."""
+    path = path if path and os.path.exists(path) else default_path()
+    if not path:
+        logger.warning("No articles file found, using an empty catalog")
+        return ArticleIndex({})
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ArticleIndex({})
+    key = os.path.abspath(path)
+    with _lock:
+        known = _by_stamp.get(key)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size) and known[2] in _indexes:
+            _indexes.move_to_end(known[2])
+            return _indexes[known[2]]
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    with _lock:
+        _by_stamp[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        index = _indexes.get(digest)
+        if index is not None:
+            _indexes.move_to_end(digest)
+            return index
+    try:
+        index = ArticleIndex(_read(path, content))
+    except (ValueError, KeyError, AttributeError) as e:
+        logger.error("Unreadable articles file %s: %s", os.path.basename(path), e)
+        index = ArticleIndex({})
+    logger.info("Loaded %s articles", len(index), extra={"fields": {"articles_file": os.path.basename(path)}})
+    with _lock:
+        _indexes[digest] = index
+        while len(_indexes) > CATALOGS_KEPT:
+            _indexes.popitem(last=False)
+        if len(_by_stamp) > 4 * CATALOGS_KEPT:
+            _by_stamp.clear()
+    return index
+
+
+def catalog(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """The articles of a catalog file as code → {name, vat, unitOfMeasure, type}."""
+    return load(path).articles
@@ -0,0 +1,664 @@
+"""Built-in copy of the Romanian chart of accounts.
+
+Only imported when romanianChartOfAccounts.ts cannot be found, so the literal is not
+loaded on every start.
+"""
+
+FALLBACK_CHART_OF_ACCOUNTS = """
+        ROMANIAN_CHART_OF_ACCOUNTS:
+
+    Clasa 1 - Conturi de capitaluri, provizioane, imprumuturi si datorii asimilate
+        10. Capital si rezerve
+            101. Capital
+                1011. Capital subscris nevarsat (P)
+                1012. Capital subscris varsat (P)
+                1015. Patrimoniul regiei (P)
+                1016. Patrimoniul public (P)
+                1017. Patrimoniul privat (P)
+                1018. Patrimoniul institutelor nationale de cercetare-dezvoltare (P)
+            103. Alte elemente de capitaluri proprii
+                1031. Beneficii acordate angajatilor sub forma instrumentelor de capitaluri proprii (P)
+                1033. Diferente de curs valutar in relatie cu investitia neta intr-o entitate straina (A/P)
+                1038. Diferente din modificarea valorii juste a activelor financiare disponibile in vederea vanzarii si alte elemente de capitaluri proprii (A/P)
+            104. Prime de capital
+                1041. Prime de emisiune (P)
+                1042. Prime de fuziune/divizare (P)
+                1043. Prime de aport (P)
+                1044. Prime de conversie a obligatiunilor in actiuni (P)
+            105. Rezerve din reevaluare (P)
+            106. Rezerve
+                1061. Rezerve legale (P)
+                1063. Rezerve statutare sau contractuale (P)
+                1068. Alte rezerve (P)
+            107. Diferente de curs valutar din conversie (A/P)
+            108. Interese care nu controleaza
+                1081. Interese care nu controleaza - rezultatul exercitiului financiar (A/P)
+                1082. Interese care nu controleaza - alte capitaluri proprii (A/P)
+            109. Actiuni proprii
+                1091. Actiuni proprii detinute pe termen scurt (A)
+                1092. Actiuni proprii detinute pe termen lung (A)
+                1095. Actiuni proprii reprezentand titluri detinute de societatea absorbita la societatea absorbanta (A)
+        11. Rezultatul reportat
+            117. Rezultatul reportat
+                1171. Rezultatul reportat reprezentand profitul nerepartizat sau pierderea neacoperita (A/P)
+                1172. Rezultatul reportat provenit din adoptarea pentru prima data a IAS, mai putin IAS 29* (A/P)
+                1173. Rezultatul reportat provenit din modificarile politicilor contabile (A/P)
+                1174. Rezultatul reportat provenit din corectarea erorilor contabile (A/P)
+                1175. Rezultatul reportat reprezentand surplusul realizat din rezerve din reevaluare (P)
+                1176. Rezultatul reportat provenit din trecerea la aplicarea reglementarilor contabile conforme cu directivele europene (A/P)
+        12. Rezultatul exercitiului financiar
+            121. Profit sau pierdere (A/P)
+            129. Repartizarea profitului (A)
+        14. Castiguri sau pierderi legate de emiterea, rascumpararea, vanzarea, cedarea cu titlu gratuit sau anularea instrumentelor de capitaluri proprii
+            141. Castiguri legate de vanzarea sau anularea instrumentelor de capitaluri proprii
+                1411. Castiguri legate de vanzarea instrumentelor de capitaluri proprii (P)
+                1412. Castiguri legate de anularea instrumentelor de capitaluri proprii (P)
+            149. Pierderi legate de emiterea, rascumpararea, vanzarea, cedarea cu titlu gratuit sau anularea instrumentelor de capitaluri proprii
+                1491. Pierderi rezultate din vanzarea instrumentelor de capitaluri proprii (A)
+                1495. Pierderi rezultate din reorganizari, care sunt determinate de anularea titlurilor detinute (A)
+                1496 Pierderi rezultate din reorganizari de societati, corespunzatoare activului net negativ al societatii absorbite
+                1498. Alte pierderi legate de instrumentele de capitaluri proprii (A)
+        15. Provizioane
+            151. Provizioane
+                1511. Provizioane pentru litigii (P)
+                1512. Provizioane pentru garantii acordate clientilor (P)
+                1513. Provizioane pentru dezafectare imobilizari corporale si alte actiuni similare legate de acestea (P)
+                1514. Provizioane pentru restructurare (P)
+                1515. Provizioane pentru pensii si obligatii similare (P)
+                1516. Provizioane pentru impozite (P)
+                1517. Provizioane pentru terminarea contractului de munca (P)
+                1518. Alte provizioane (P)
+        16. Imprumuturi si datorii asimilate
+            161. Imprumuturi din emisiuni de obligatiuni
+                1614. Imprumuturi externe din emisiuni de obligatiuni garantate de stat (P)
+                1615. Imprumuturi externe din emisiuni de obligatiuni garantate de banci (P)
+                1617. Imprumuturi interne din emisiuni de obligatiuni garantate de stat (P)
+                1618. Alte imprumuturi din emisiuni de obligatiuni (P)
+            162. Credite bancare pe termen lung
+                1621. Credite bancare pe termen lung (P)
+                1622. Credite bancare pe termen lung nerambursate la scadenta (P)
+                1623. Credite externe guvernamentale (P)
+                1624. Credite bancare externe garantate de stat (P)
+                1625. Credite bancare externe garantate de banci (P)
+                1626. Credite de la trezoreria statului (P)
+                1627. Credite bancare interne garantate de stat (P)
+            166. Datorii care privesc imobilizarile financiare
+                1661. Datorii fata de entitatile afiliate (P)
+                1663. Datorii fata de entitatile asociate si entitatile controlate in comun (P)
+            167. Alte imprumuturi si datorii asimilate (P)
+            168. Dobanzi aferente imprumuturilor si datoriilor asimilate
+                1681. Dobanzi aferente imprumuturilor din emisiuni de obligatiuni (P)
+                1682. Dobanzi aferente creditelor bancare pe termen lung (P)
+                1685. Dobanzi aferente datoriilor fata de entitatile afiliate (P)
+                1686. Dobanzi aferente datoriilor fata de entitatile asociate si entitatile controlate in comun (P)
+                1687. Dobanzi aferente altor imprumuturi si datorii asimilate (P)
+            169. Prime privind rambursarea obligatiunilor si a altor datorii
+                1691. Prime privind rambursarea obligatiunilor (A)
+                1692. Prime privind rambursarea altor datorii (A)
+    
+    Clasa 2 - Conturi de imobilizari
+        20. IMOBILIZARI NECORPORALE
+            201. Cheltuieli de constituire (A)
+            203. Cheltuieli de dezvoltare (A)
+            205. Concesiuni, brevete, licente, marci comerciale, drepturi si active similare (A)
+            206. Active necorporale de explorare si evaluare a resurselor minerale (A)
+            207. Fond comercial
+                2071. Fond comercial pozitiv (A)
+                2075. Fond comercial negativ (P)
+            208. Alte imobilizari necorporale (A)
+        21. Imobilizari corporale
+            211. Terenuri si amenajari de terenuri (A)
+                2111. Terenuri
+                2112. Amenajari de terenuri
+            212. Constructii (A)
+            213. Instalatii tehnice si mijloace de transport
+                2131. Echipamente tehnologice (masini, utilaje si instalatii de lucru) (A)
+                2132. Aparate si instalatii de masurare, control si reglare (A)
+                2133. Mijloace de transport (A)
+            214. Mobilier, aparatura birotica, echipamente de protectie a valorilor umane si materiale si alte active corporale (A)
+            215. Investitii imobiliare (A)
+            216. Active corporale de explorare si evaluare a resurselor minerale (A)
+            217. Active biologice productive (A)
+        22. Imobilizari corporale in curs de aprovizionare
+            223. Instalatii tehnice si mijloace de transport in curs de aprovizionare (A)
+            224. Mobilier, aparatura birotica, echipamente de protectie a valorilor umane si materiale si alte active corporale in curs de aprovizionare (A)
+            227. Active biologice productive in curs de aprovizionare (A)
+        23. Imobilizari in curs
+            231. Imobilizari corporale in curs de executie (A)
+            235. Investitii imobiliare in curs de executie (A)
+        26. Imobilizari financiare
+            261. Actiuni detinute la entitatile afiliate (A)
+            262. Actiuni detinute la entitati asociate (A)
+            263. Actiuni detinute la entitati controlate in comun (A)
+            264. Titluri puse in echivalenta (A)
+            265. Alte titluri imobilizate (A)
+            266. Certificate verzi amanate (A)
+            267. Creante imobilizate
+                2671. Sume de incasat de la entitatile afiliate (A)
+                2672. Dobanda aferenta sumelor de incasat de la entitatile afiliate (A)
+                2673. Creante fata de entitatile asociate si entitatile controlate in comun (A)
+                2674. Dobanda aferenta creantelor fata de entitatile asociate si entitatile controlate in comun (A)
+                2675. Imprumuturi acordate pe termen lung (A)
+                2676. Dobanda aferenta imprumuturilor acordate pe termen lung (A)
+                2677. Obligatiuni achizitionate cu ocazia emisiunilor efectuate de terti (A)
+                2678. Alte creante imobilizate (A)
+                2679. Dobanzi aferente altor creante imobilizate (A)
+            269. Varsaminte de efectuat pentru imobilizari financiare
+                2691. Varsaminte de efectuat privind actiunile detinute la entitatile afiliate (P)
+                2692. Varsaminte de efectuat privind actiunile detinute la entitati asociate (P)
+                2693. Varsaminte de efectuat privind actiunile detinute la entitati controlate in comun (P)
+                2695. Varsaminte de efectuat pentru alte imobilizari financiare (P)
+        28. Amortizari privind imobilizarile
+            280. Amortizari privind imobilizarile necorporale
+                2801. Amortizarea cheltuielilor de constituire (P)
+                2803. Amortizarea cheltuielilor de dezvoltare (P)
+                2805. Amortizarea concesiunilor, brevetelor, licentelor, marcilor comerciale, drepturilor si activelor similare (P)
+                2806. Amortizarea activelor necorporale de explorare si evaluare a resurselor minerale (P)
+                2807. Amortizarea fondului comercial (P)
+                2808. Amortizarea altor imobilizari necorporale (P)
+            281. Amortizari privind imobilizarile corporale
+                2811. Amortizarea amenajarilor de terenuri (P)
+                2812. Amortizarea constructiilor (P)
+                2813. Amortizarea instalatiilor si mijloacelor de transport (P)
+                2814. Amortizarea altor imobilizari corporale (P)
+                2815. Amortizarea investitiilor imobiliare (P)
+                2816. Amortizarea activelor corporale de explorare si evaluare a resurselor minerale (P)
+                2817. Amortizarea activelor biologice productive (P)
+        29. Ajustari pentru deprecierea sau pierderea de valoare a imobilizarilor
+            290. Ajustari pentru deprecierea imobilizarilor necorporale
+                2903. Ajustari pentru deprecierea cheltuielilor de dezvoltare (P)
+                2905. Ajustari pentru deprecierea concesiunilor, brevetelor, licentelor, marcilor comerciale, drepturilor si activelor similare (P)
+                2906. Ajustari pentru deprecierea activelor necorporale de explorare si evaluare a resurselor minerale (P)
+                2908. Ajustari pentru deprecierea altor imobilizari necorporale (P)
+            291. Ajustari pentru deprecierea imobilizarilor corporale
+                2911. Ajustari pentru deprecierea terenurilor si amenajarilor de terenuri (P)
+                2912. Ajustari pentru deprecierea constructiilor (P)
+                2913. Ajustari pentru deprecierea instalatiilor si mijloacelor de transport (P)
+                2914. Ajustari pentru deprecierea altor imobilizari corporale (P)
+                2915. Ajustari pentru deprecierea investitiilor imobiliare (P)
+                2916. Ajustari pentru deprecierea activelor corporale de explorare si evaluare a resurselor minerale (P)
+                2917. Ajustari pentru deprecierea activelor biologice productive (P)
+            293. Ajustari pentru deprecierea imobilizarilor in curs de executie
+                2931. Ajustari pentru deprecierea imobilizarilor corporale in curs de executie (P)
+                2935. Ajustari pentru deprecierea investitiilor imobiliare in curs de executie (P)
+            296. Ajustari pentru pierderea de valoare a imobilizarilor financiare
+                2961. Ajustari pentru pierderea de valoare a actiunilor detinute la entitatile afiliate (P)
+                2962. Ajustari pentru pierderea de valoare a actiunilor detinute la entitati asociate si entitati controlate in comun (P)
+                2963. Ajustari pentru pierderea de valoare a altor titluri imobilizate (P)
+                2964. Ajustari pentru pierderea de valoare a sumelor de incasat de la entitatile afiliate (P)
+                2965. Ajustari pentru pierderea de valoare a creantelor fata de entitatile asociate si entitatile controlate in comun (P)
+                2966. Ajustari pentru pierderea de valoare a imprumuturilor acordate pe termen lung (P)
+                2968. Ajustari pentru pierderea de valoare a altor creante imobilizate (P)
+    
+    Clasa 3 - Conturi de stocuri si productie in curs de executie
+        30. Stocuri de materii prime si materiale
+            301. Materii prime (A)
+            302. Materiale consumabile
+                3021. Materiale auxiliare (A)
+                3022. Combustibili (A)
+                3023. Materiale pentru ambalat (A)
+                3024. Piese de schimb (A)
+                3025. Seminte si materiale de plantat (A)
+                3026. Furaje (A)
+                3028. Alte materiale consumabile (A)
+            303. Materiale de natura obiectelor de inventar (A)
+            308. Diferente de pret la materii prime si materiale (A/P)
+        32. Stocuri in curs de aprovizionare
+            321. Materii prime in curs de aprovizionare (A)
+            322. Materiale consumabile in curs de aprovizionare (A)
+            323. Materiale de natura obiectelor de inventar in curs de aprovizionare (A)
+            326. Active biologice de natura stocurilor in curs de aprovizionare (A)
+            327. Marfuri in curs de aprovizionare (A)
+            328. Ambalaje in curs de aprovizionare (A)
+        33. Productie in curs de executie
+            331. Produse in curs de executie (A)
+            332. Servicii in curs de executie (A)
+        34. PRODUSE
+            341. Semifabricate (A)
+            345. Produse finite (A)
+            346. Produse reziduale (A)
+            347. Produse agricole (A)
+            348. Diferente de pret la produse (A/P)
+        35. STOCURI AFLATE LA TERTI
+            351. Materii si materiale aflate la terti (A)
+            354. Produse aflate la terti (A)
+            356. Active biologice de natura stocurilor aflate la terti (A)
+            357. Marfuri aflate la terti (A)
+            358. Ambalaje aflate la terti (A)
+        36. Active biologice de natura stocurilor
+            361. Active biologice de natura stocurilor (A)
+            368. Diferente de pret la active biologice de natura stocurilor (A/P)
+        37. MARFURI
+            371. Marfuri (A)
+            378. Diferente de pret la marfuri (A/P)
+        38. Ambalaje
+            381. Ambalaje (A)
+            388. Diferente de pret la ambalaje (A/P)
+        39. Ajustari pentru deprecierea stocurilor si productiei in curs de executie
+            391. Ajustari pentru deprecierea materiilor prime (P)
+            392. Ajustari pentru deprecierea materialelor
+                3921. Ajustari pentru deprecierea materialelor consumabile (P)
+                3922. Ajustari pentru deprecierea materialelor de natura obiectelor de inventar (P)
+            393. Ajustari pentru deprecierea productiei in curs de executie (P)
+            394. Ajustari pentru deprecierea produselor
+                3941. Ajustari pentru deprecierea semifabricatelor (P)
+                3945. Ajustari pentru deprecierea produselor finite (P)
+                3946. Ajustari pentru deprecierea produselor reziduale (P)
+                3947. Ajustari pentru deprecierea produselor agricole (P)
+            395. Ajustari pentru deprecierea stocurilor aflate la terti
+                3951. Ajustari pentru deprecierea materiilor si materialelor aflate la terti (P)
+                3952. Ajustari pentru deprecierea semifabricatelor aflate la terti (P)
+                3953. Ajustari pentru deprecierea produselor finite aflate la terti (P)
+                3954. Ajustari pentru deprecierea produselor reziduale aflate la terti (P)
+                3955. Ajustari pentru deprecierea produselor agricole aflate la terti (P)
+                3956. Ajustari pentru deprecierea activelor biologice de natura stocurilor aflate la terti (P)
+                3957. Ajustari pentru deprecierea marfurilor aflate la terti (P)
+                3958. Ajustari pentru deprecierea ambalajelor aflate la terti (P)
+            396. Ajustari pentru deprecierea activelor biologice de natura stocurilor (P)
+            397. Ajustari pentru deprecierea marfurilor (P)
+            398. Ajustari pentru deprecierea ambalajelor (P)
+    
+    Clasa 4 - Conturi de terti
+        40. Furnizori si conturi asimilate
+            401. Furnizori (P)
+            403. Efecte de platit (P)
+            404. Furnizori de imobilizari (P)
+            405. Efecte de platit pentru imobilizari (P)
+            408. Furnizori - facturi nesosite (P)
+            409. Furnizori - debitori
+                4091. Furnizori - debitori pentru cumparari de bunuri de natura stocurilor (A)
+                4092. Furnizori - debitori pentru prestari de servicii (A)
+                4093. Avansuri acordate pentru imobilizari corporale (A)
+                4094. Avansuri acordate pentru imobilizari necorporale (A)
+        41. Clienti si conturi asimilate
+            411. Clienti
+                4111. Clienti (A)
+                4118. Clienti incerti sau in litigiu (A)
+            413. Efecte de primit de la clienti (A)
+            418. Clienti - facturi de intocmit (A)
+            419. Clienti - creditori (P)
+        42. Personal si conturi asimilate
+            421. Personal - salarii datorate (P)
+            423. Personal - ajutoare materiale datorate (P)
+            424. Prime reprezentand participarea personalului la profit (P)
+            425. Avansuri acordate personalului (A)
+            426. Drepturi de personal neridicate (P)
+            427. Retineri din salarii datorate tertilor (P)
+            428. Alte datorii si creante in legatura cu personalul
+                4281. Alte datorii in legatura cu personalul (P)
+                4282. Alte creante in legatura cu personalul (A)
+        43. Asigurari sociale, protectia sociala si conturi asimilate
+            431. Asigurari sociale
+                4311. Contributia unitatii la asigurarile sociale (P)
+                4312. Contributia personalului la asigurarile sociale (P)
+                4313. Contributia angajatorului pentru asigurarile sociale de sanatate (P)
+                4314. Contributia angajatilor pentru asigurarile sociale de sanatate (P)
+                4315. Contributia de asigurari sociale (P)
+                4316. Contributia de asigurari sociale de sanatate (P)
+                4318. Alte contributii pentru asigurarile sociale de sanatate
+            436. Contributia asiguratorie pentru munca (P)
+            437. Ajutor de somaj
+                4371. Contributia unitatii la fond  ul de somaj (P)
+                4372. Contributia personalului la fondul de somaj (P)
+            438. Alte datorii si creante sociale
+                4381. Alte datorii sociale (P)
+                4382. Alte creante sociale (A)
+        44. Bugetul statului, fonduri speciale si conturi asimilate
+            441. Impozitul pe profit si alte impozite
+                4411. Impozitul pe profit (P)
+                4415. Impozitul specific unor activitati (P)
+                4417 Impozitul pe profit la nivelul impozitului minim pe cifra de afaceri
+                4418. Impozitul pe venit (P)
+            442. Taxa pe valoarea adaugata
+                4423. TVA de plata (P)
+                4424. TVA de recuperat (A)
+                4426. TVA deductibila (A)
+                4427. TVA colectata (P)
+                4428. TVA neexigibila (A/P)
+            444. Impozitul pe venituri de natura salariilor (P)
+            445. Subventii
+                4451. Subventii guvernamentale (A)
+                4452. Imprumuturi nerambursabile cu caracter de subventii (A)
+                4458. Alte sume primite cu caracter de subventii (A)
+            446. Alte impozite, taxe si varsaminte asimilate (P)
+            447. Fonduri speciale - taxe si varsaminte asimilate (P)
+            448. Alte datorii si creante cu bugetul statului
+                4481. Alte datorii fata de bugetul statului (P)
+                4482. Alte creante privind bugetul statului (A)
+        45. Grup si actionari/asociati
+            451. Decontari intre entitatile afiliate
+                4511. Decontari intre entitatile afiliate (A/P)
+                4518. Dobanzi aferente decontarilor intre entitatile afiliate (A/P)
+            453. Decontari cu entitatile asociate si entitatile controlate in comun
+                4531. Decontari cu entitatile asociate si entitatile controlate
+                4538. Dobanzi aferente decontarilor cu entitatile asociate si entitatile controlate in comun (A/P)
+            455. Sume datorate actionarilor/asociatilor
+                4551. Actionari/Asociati - conturi curente (P)
+                4558. Actionari/Asociati - dobanzi la conturi curente (P)
+            456. Decontari cu actionarii/asociatii privind capitalul (A/P)
+            457. Dividende de plata (P)
+            458. Decontari din operatiuni in participatie
+                4581. Decontari din operatiuni in participatie - pasiv (P)
+                4582. Decontari din operatiuni in participatie - activ (A)
+        46. Debitori si creditori diversi
+            461. Debitori diversi (A)
+            462. Creditori diversi (P)
+            463. Creante reprezentand dividende repartizate in cursul exercitiului financiar (A)
+            466. Decontari din operatiuni de fiducie
+                4661. Datorii din operatiuni de fiducie (P)
+                4662. Creante din operatiuni de fiducie (A)
+            467. Datorii aferente distribuirilor interimare de dividende   
+        47. Conturi de subventii, regularizare si asimilate
+            471. Cheltuieli inregistrate in avans (A)
+            472. Venituri inregistrate in avans (P)
+            473. Decontari din operatiuni in curs de clarificare (A/P)
+            475. Subventii pentru investitii
+                4751. Subventii guvernamentale pentru investitii (P)
+                4752. Imprumuturi nerambursabile cu caracter de subventii pentru investitii (P)
+                4753. Donatii pentru investitii (P)
+                4754. Plusuri de inventar de natura imobilizarilor (P)
+                4758. Alte sume primite cu caracter de subventii pentru investitii (P)
+            478. Venituri in avans aferente activelor primite prin transfer de la clienti (P)
+        48. Decontari in cadrul unitatii
+            481. Decontari intre unitate si subunitati (A/P)
+            482. Decontari intre subunitati (A/P)
+        49. Ajustari pentru deprecierea creantelor
+            490. Ajustari pentru deprecierea creantelor reprezentand avansuri acordate furnizorilor
+                4901. Ajustari pentru deprecierea creantelor aferente cumpararilor de bunuri de natura stocurilor (P)
+                4902. Ajustari pentru deprecierea creantelor aferente prestarilor de servicii (P)
+                4903. Ajustari pentru deprecierea creantelor aferente imobilizarilor corporale (P)
+                4904. Ajustari pentru deprecierea creantelor aferente imobilizarilor necorporale (P)
+            491. Ajustari pentru deprecierea creantelor - clienti (P)
+            495. Ajustari pentru deprecierea creantelor - decontari in cadrul grupului si cu actionarii/asociatii (P)
+            496. Ajustari pentru deprecierea creantelor - debitori diversi (P)
+    
+    Clasa 5 - Conturi de trezorerie
+        50. Investitii pe termen scurt
+            501. Actiuni detinute la entitatile afiliate (A)
+            505. Obligatiuni emise si rascumparate (A)
+            506. Obligatiuni (A)
+            507. Certificate verzi primite (A)
+            508. Alte investitii pe termen scurt si creante asimilate
+                5081. Alte titluri de plasament (A)
+                5088. Dobanzi la obligatiuni si titluri de plasament (A)
+            509. Varsaminte de efectuat pentru investitiile pe termen scurt
+                5091. Varsaminte de efectuat pentru actiunile detinute la entitatile afiliate (P)
+                5092. Varsaminte de efectuat pentru alte investitii pe termen scurt (P)
+        51. Conturi la banci
+            511. Valori de incasat
+                5112. Cecuri de incasat (A)
+                5113. Efecte de incasat (A)
+                5114. Efecte remise spre scontare (A)
+            512. Conturi curente la banci
+                5121. Conturi la banci in lei (A)
+                5124. Conturi la banci in valuta (A)
+                5125. Sume in curs de decontare (A)
+            518. Dobanzi
+                5186. Dobanzi de platit (P)
+                5187. Dobanzi de incasat (A)
+            519. Credite bancare pe termen scurt
+                5191. Credite bancare pe termen scurt (P)
+                5192. Credite bancare pe termen scurt nerambursate la scadenta (P)
+                5193. Credite externe guvernamentale (P)
+                5194. Credite externe garantate de stat (P)
+                5195. Credite externe garantate de banci (P)
+                5196. Credite de la Trezoreria Statului (P)
+                5197. Credite interne garantate de stat (P)
+                5198. Dobanzi aferente creditelor bancare pe termen scurt (P)
+        53. Casa
+            531. Casa
+                5311. Casa in lei (A)
+                5314. Casa in valuta (A)
+            532. Alte valori
+                5321. Timbre fiscale si postale (A)
+                5322. Bilete de tratament si odihna (A)
+                5323. Tichete si bilete de calatorie (A)
+                5328. Alte valori (A)
+        54. Acreditive
+            541. Acreditive
+                5411. Acreditive in lei (A)
+                5414. Acreditive in valuta (A)
+            542. Avansuri de trezorerie (A)
+        58. Viramente interne
+            581. Viramente interne (A/P)
+        59. Ajustari pentru pierderea de valoare a conturilor de trezorerie
+            591. Ajustari pentru pierderea de valoare a actiunilor detinute la entitatile afiliate (P)
+            595. Ajustari pentru pierderea de valoare a obligatiunilor emise si rascumparate (P)
+            596. Ajustari pentru pierderea de valoare a obligatiunilor (P)
+            598. Ajustari pentru pierderea de valoare a altor investitii pe termen scurt si creante asimilate (P)
+    
+    Clasa 6 - Conturi de cheltuieli
+        60. Cheltuieli privind stocurile si alte consumuri
+            601. Cheltuieli cu materiile prime
+            602. Cheltuieli cu materialele consumabile
+                6021. Cheltuieli cu materialele auxiliare
+                6022. Cheltuieli privind combustibilii
+                6023. Cheltuieli privind materialele pentru ambalat
+                6024. Cheltuieli privind piesele de schimb
+                6025. Cheltuieli privind semintele si materialele de plantat
+                6026. Cheltuieli privind furajele
+                6028. Cheltuieli privind alte materiale consumabile
+            603. Cheltuieli privind materialele de natura obiectelor de inventar
+            604. Cheltuieli privind materialele nestocate
+            605. Cheltuieli privind utilitatile 
+                6051. Cheltuieli privind consumul de energie
+                6052. Cheltuieli privind consumul de apa
+                6053 Cheltuieli privind consumul de gaze naturale
+                6058 Cheltuieli cu alte utilitati
+            606. Cheltuieli privind activele biologice de natura stocurilor
+            607. Cheltuieli privind marfurile
+            608. Cheltuieli privind ambalajele
+            609. Reduceri comerciale primite
+        61. Cheltuieli cu serviciile executate de terti
+            611. Cheltuieli cu intretinerea si reparatiile
+            612. Cheltuieli cu redeventele, locatiile de gestiune si chiriile
+                6121 „Cheltuieli cu redeventele
+                6122 Cheltuieli cu locatiile de gestiune
+                6123 Cheltuieli cu chiriile
+            613. Cheltuieli cu primele de asigurare
+            614. Cheltuieli cu studiile si cercetarile
+            615. Cheltuieli cu pregatirea personalului
+            616 Cheltuieli aferente drepturilor de proprietate intelectuală”
+            617 Cheltuieli de management 
+            618 Cheltuieli de consultanta
+        62. Cheltuieli cu alte servicii executate de terti
+            621. Cheltuieli cu colaboratorii
+            622. Cheltuieli privind comisioanele si onorariile
+            623. Cheltuieli de protocol, reclama si publicitate
+                6231. Cheltuieli de protocol
+                6232. Cheltuieli de reclama si publicitate
+            624. Cheltuieli cu transportul de bunuri si personal
+            625. Cheltuieli cu deplasari, detasari si transferari
+            626. Cheltuieli postale si taxe de telecomunicatii
+            627. Cheltuieli cu serviciile bancare si asimilate
+            628. Alte cheltuieli cu serviciile executate de terti
+        63. Cheltuieli cu alte impozite, taxe si varsaminte asimilate
+            635. Cheltuieli cu alte impozite, taxe si varsaminte asimilate
+                6351. Cheltuieli cu impozitul suplimentar pentru sectoarele de activitate specifice
+        64. Cheltuieli cu personalul
+            641. Cheltuieli cu salariile personalului
+            642. Cheltuieli cu avantajele in natura si tichetele acordate salariatilor
+                6421. Cheltuieli cu avantajele in natura acordate salariatilor
+                6422. Cheltuieli cu tichetele acordate salariatilor
+            643. Cheltuieli cu remunerarea in instrumente de capitaluri proprii
+            644. Cheltuieli cu primele reprezentand participarea personalului la profit
+            645. Cheltuieli privind asigurarile si protectia sociala
+                6451. Cheltuieli privind contributia unitatii la asigurarile sociale
+                6452. Cheltuieli privind contributia unitatii pentru ajutorul de somaj
+                6453. Cheltuieli privind contributia angajatorului pentru asigurarile sociale de sanatate
+                6455. Cheltuieli privind contributia unitatii la asigurarile de viata
+                6456. Cheltuieli privind contributia unitatii la fondurile de pensii facultative
+                6457. Cheltuieli privind contributia unitatii la primele de asigurare voluntara de sanatate
+                6458. Alte cheltuieli privind asigurarile si protectia sociala
+            646. Cheltuieli privind contributia asiguratorie pentru munca
+                6461. Cheltuieli privind contributia asiguratorie pentru munca corespunzatoare salariatilor
+                6462. Cheltuieli privind contributia asiguratorie pentru munca corespunzatoare altor persoane, decat salariatii
+        65. Alte cheltuieli de exploatare
+            651. Cheltuieli din operatiuni de fiducie
+                6511. Cheltuieli ocazionate de constituirea fiduciei
+                6512. Cheltuieli din derularea operatiunilor de fiducie
+                6513. Cheltuieli din lichidarea operatiunilor de fiducie
+            652. Cheltuieli cu protectia mediului inconjurator
+            654. Pierderi din creante si debitori diversi
+            655. Cheltuieli din reevaluarea imobilizarilor corporale
+            658. Alte cheltuieli de exploatare
+                6581. Despagubiri, amenzi si penalitati
+                6582. Donatii acordate
+                6583. Cheltuieli privind activele cedate si alte operatiuni de capital
+                6584. Cheltuieli cu sumele sau bunurile acordate ca sponsorizari
+                6586. Cheltuieli reprezentand transferuri si contributii datorate in baza unor acte normative speciale
+                6587. Cheltuieli privind calamitatile si alte evenimente similare
+                6588. Alte cheltuieli de exploatare
+        66. Cheltuieli financiare
+            663. Pierderi din creante legate de participatii
+            664. Cheltuieli privind investitiile financiare cedate
+                6641. Cheltuieli privind imobilizarile financiare cedate
+                6642. Pierderi din investitiile pe termen scurt cedate
+            665. Cheltuieli din diferente de curs valutar
+                6651. Diferente nefavorabile de curs valutar legate de elementele monetare exprimate in valuta
+                6652. Diferente nefavorabile de curs valutar din evaluarea elementelor monetare care fac parte din investitia neta intr-o entitate straina
+            666. Cheltuieli privind dobanzile
+            667. Cheltuieli privind sconturile acordate
+            668. Alte cheltuieli financiare
+        68. Cheltuieli cu amortizarile, provizioanele si ajustarile pentru depreciere sau pierdere de valoare
+            681. Cheltuieli de exploatare privind amortizarile, provizioanele si ajustarile pentru depreciere
+                6811. Cheltuieli de exploatare privind amortizarea imobilizarilor
+                6812. Cheltuieli de exploatare privind provizioanele
+                6813. Cheltuieli de exploatare privind ajustarile pentru deprecierea imobilizarilor
+                6814. Cheltuieli de exploatare privind ajustarile pentru deprecierea activelor circulante
+                6817. Cheltuieli de exploatare privind ajustarile pentru deprecierea fondului comercial
+                6818. Cheltuieli de exploatare privind ajustarile pentru deprecierea creantelor reprezentand avansuri acordate furnizorilor
+            686. Cheltuieli financiare privind amortizarile, provizioanele si ajustarile pentru pierdere de valoare
+                6861. Cheltuieli privind actualizarea provizioanelor
+                6863. Cheltuieli financiare privind ajustarile pentru pierderea de valoare a imobilizarilor financiare
+                6864. Cheltuieli financiare privind ajustarile pentru pierderea de valoare a activelor circulante
+                6865. Cheltuieli financiare privind amortizarea diferentelor aferente titlurilor de stat
+                6868. Cheltuieli financiare privind amortizarea primelor de rambursare a obligatiunilor si a altor datorii
+        69. Cheltuieli cu impozitul pe profit si alte impozite
+            691. Cheltuieli cu impozitul pe profit
+            694. Cheltuieli cu impozitul pe profit rezultat din decontarile in cadrul grupului fiscal in domeniul impozitului pe profit
+            695. Cheltuieli cu impozitul specific unor activitati
+            697. Cheltuieli cu impozitul pe profit la nivelul impozitului minim pe cifra de afaceri
+            698. Cheltuieli cu impozitul pe venit si cu alte impozite care nu apar in elementele de mai sus
+    
+    Clasa 7 - Conturi de venituri
+        70. Cifra de afaceri neta
+            701. Venituri din vanzarea produselor finite, produselor agricole si a activelor biologice de natura stocurilor
+                7015. Venituri din vanzarea produselor finite
+                7017. Venituri din vanzarea produselor agricole
+                7018. Venituri din vanzarea activelor biologice de natura stocurilor
+            702. Venituri din vanzarea semifabricatelor
+            703. Venituri din vanzarea produselor reziduale
+            704. Venituri din servicii prestate
+            705. Venituri din studii si cercetari
+            706. Venituri din redevente, locatii de gestiune si chirii
+            707. Venituri din vanzarea marfurilor
+            708. Venituri din activitati diverse
+            709. Reduceri comerciale acordate
+        71. Venituri aferente costului productiei in curs de executie
+            711. Venituri aferente costurilor stocurilor de produse
+            712. Venituri aferente costurilor serviciilor in curs de executie
+        72. Venituri din productia de imobilizari
+            721. Venituri din productia de imobilizari necorporale
+            722. Venituri din productia de imobilizari corporale
+            725. Venituri din productia de investitii imobiliare
+        74. Venituri din subventii de exploatare
+            741. Venituri din subventii de exploatare
+                7411. Venituri din subventii de exploatare aferente cifrei de afaceri*22)
+                7412. Venituri din subventii de exploatare pentru materii prime si materiale
+                7413. Venituri din subventii de exploatare pentru alte cheltuieli externe
+                7414. Venituri din subventii de exploatare pentru plata personalului
+                7415. Venituri din subventii de exploatare pentru asigurari si protectie sociala
+                7416. Venituri din subventii de exploatare pentru alte cheltuieli de exploatare
+                7417. Venituri din subventii de exploatare in caz de calamitati si alte evenimente similare
+                7418. Venituri din subventii de exploatare pentru dobanda datorata
+                7419. Venituri din subventii de exploatare aferente altor venituri
+        75. Alte venituri din exploatare
+            751. Venituri din operatiuni de fiducie
+                7511. Venituri ocazionate de constituirea fiduciei
+                7512. Venituri din derularea operatiunilor de fiducie
+                7513. Venituri din lichidarea operatiunilor de fiducie
+            754. Venituri din creante reactivate si debitori diversi
+            755. Venituri din reevaluarea imobilizarilor corporale
+            758. Alte venituri din exploatare
+                7581. Venituri din despagubiri, amenzi si penalitati
+                7582. Venituri din donatii primite
+                7583. Venituri din vanzarea activelor si alte operatiuni de capital
+                7584. Venituri din subventii pentru investitii
+                7586. Venituri reprezentand transferuri cuvenite in baza unor acte normative speciale
+                7588. Alte venituri din exploatare
+        76. Venituri financiare
+            761. Venituri din imobilizari financiare
+                7611. Venituri din actiuni detinute la entitatile afiliate
+                7612. Venituri din actiuni detinute la entitati asociate
+                7613. Venituri din actiuni detinute la entitati controlate in comun
+                7615. Venituri din alte imobilizari financiare
+            762. Venituri din investitii financiare pe termen scurt
+            764. Venituri din investitii financiare cedate
+                7641. Venituri din imobilizari financiare cedate
+                7642. Castiguri din investitii pe termen scurt cedate
+            765. Venituri din diferente de curs valutar
+                7651. Diferente favorabile de curs valutar legate de elementele monetare exprimate in valuta
+                7652. Diferente favorabile de curs valutar din evaluarea elementelor monetare care fac parte din investitia neta intr-o entitate straina
+            766. Venituri din dobanzi
+            767. Venituri din sconturi obtinute
+            768. Alte venituri financiare
+        78. Venituri din provizioane, amortizari si ajustari pentru depreciere sau pierdere de valoare
+            781. Venituri din provizioane si ajustari pentru depreciere privind activitatea de exploatare
+                7812. Venituri din provizioane
+                7813. Venituri din ajustari pentru deprecierea imobilizarilor
+                7814. Venituri din ajustari pentru deprecierea activelor circulante
+                7815. Venituri din fondul comercial negativ
+                7818. Venituri din ajustari pentru deprecierea creantelor reprezentand avansuri acordate furnizorilor
+            786. Venituri financiare din amortizari si ajustari pentru pierdere de valoare
+                7863. Venituri financiare din ajustari pentru pierderea de valoare a imobilizarilor financiare
+                7864. Venituri financiare din ajustari pentru pierderea de valoare a activelor circulante
+                7865. Venituri financiare din amortizarea diferentelor aferente titlurilor de stat
+        79. Venituri din impozitul pe profit
+            794. Venituri din impozitul pe profit rezultat din decontarile in cadrul grupului fiscal in domeniul impozitului pe profit
+    
+    Clasa 8 - conturi speciale
+        80. Conturi in afara bilantului
+            801. Angajamente acordate
+                8011. Giruri si garantii acordate
+                8018. Alte angajamente acordate
+            802. Angajamente primite
+                8021. Giruri si garantii primite
+                8028. Alte angajamente primite
+            803. Alte conturi in afara bilantului
+                8031. Imobilizari corporale primite cu chirie sau in baza altor contracte similare
+                8032. Valori materiale primite spre prelucrare sau reparare
+                8033. Valori materiale primite in pastrare sau custodie
+                8034. Debitori scosi din activ, urmariti in continuare
+                8035. Stocuri de natura obiectelor de inventar date in folosinta
+                8036. Redevente, locatii de gestiune, chirii si alte datorii asimilate
+                8037. Efecte scontate neajunse la scadenta
+                8038. Bunuri primite in administrare, concesiune, cu chirie si alte bunuri similare
+                8039. Alte valori in afara bilantului
+            804. Certificate verzi
+            805. Dobanzi aferente contractelor de leasing si altor contracte asimilate, neajunse la scadenta
+                8051. Dobanzi de platit
+                8052. Dobanzi de incasat
+            806. Certificate de emisii de gaze cu efect de sera
+            807. Active contingente
+            808. Datorii contingente
+            809. Creante preluate prin cesionare
+        89. Bilant
+            891. Bilant de deschidere
+            892. Bilant de inchidere
+    
+    Clasa 9 - conturi de gestiune
+        90. Decontari interne
+            901. Decontari interne privind cheltuielile
+            902. Decontari interne privind productia obtinuta
+            903. Decontari interne privind diferentele de pret
+        92. Conturi de calculatie
+            921. Cheltuielile activitatii de baza
+            922. Cheltuielile activitatilor auxiliare
+            923. Cheltuieli indirecte de productie
+            924. Cheltuieli generale de administratie
+            925. Cheltuieli de desfacere
+        93. Costul productiei
+            931. Costul productiei obtinute
+            933. Costul productiei in curs de executie
+    """
@@ -0,0 +1,258 @@
+"""The Romanian chart of accounts, parsed once and shared by every consumer.
+
+`get_chart()` returns a `ChartOfAccounts` model of the chart. The chart is read from
+the backend's `romanianChartOfAccounts.ts` (`FINOVA_CHART_FILE`, else found next to
+this agent or under the working directory), or else from the built-in copy in
+chart_fallback. The model holds:
+
+- the class → group → account tree (`children`, `Account.parent`);
+- a code → `Account` dict (name, A/P nature, level) for O(1) lookups;
+- the chart text, as the prompts use it, and its retrieval index (chart_retrieval).
+
+The model is reloaded only when the source file's mtime or size changes. A pickled
+snapshot of it, index included, is kept at `FINOVA_CHART_SNAPSHOT` (default
+chart_of_accounts.pickle in the private state_dir), so a new worker skips reading
+and parsing the chart while the source is unchanged. Unpickling runs code, so the
+snapshot is only loaded from a directory private to this user, and only when the
+file is ours and not writable by anyone else.
+
+Charts sent with a job (bank transaction attribution) go through `from_text`,
+which keeps the last few parsed charts.
+"""
+
+import importlib.util
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from jsonlog import get_logger
+import state_dir
+
+logger = get_logger("chart_of_accounts")
+
+SNAPSHOT_VERSION = 1
+TS_START_MARKER = "export const ROMANIAN_CHART_OF_ACCOUNTS = `"
+MIN_CHART_CHARS = 1000
+TEXT_CHARTS_KEPT = 8
+
+_ENTRY = re.compile(r"^\s*(\d{2,6})\.?\s+(\S.*?)\s*$")
+_CLASS = re.compile(r"^\s*Clasa\s+(\d)\s*-?\s*(.*?)\s*$", re.IGNORECASE)
+_NATURE = re.compile(r"\s*\((A|P|A/P)\)\s*$")
+LEVELS = {1: "class", 2: "group", 3: "synthetic"}
+
+
+class Account(NamedTuple):
+    code: str
+    name: str
+    # "A" (asset), "P" (liability) or "A/P"; None where the chart does not say
+    nature: Optional[str]
+    parent: Optional[str]
+    level: str
+    # The chart line as written, indentation included
+    line: str
+
+
+class ChartOfAccounts:
+    def __init__(self, text: str, source: str = ""):
+        self.text = text
+        self.source = source
+        self.accounts: Dict[str, Account] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.classes: List[str] = []
+        self._index = None
+        for line in text.splitlines():
+            match = _CLASS.match(line) or _ENTRY.match(line)
+            if not match:
+                continue
+            code, name = match.group(1), match.group(2).strip("„”\"' ")
+            nature = _NATURE.search(name)
+            if nature:
+                name = name[:nature.start()]
+            parent = self._parent(code)
+            self.accounts[code] = Account(code, name, nature.group(1) if nature else None, parent,
+                                          LEVELS.get(len(code), "analytic"), line.rstrip())
+            if parent:
+                self.children.setdefault(parent, []).append(code)
+            elif len(code) == 1:
+                self.classes.append(code)
+
+    def _parent(self, code: str) -> Optional[str]:
+        for length in range(len(code) - 1, 0, -1):
+            if code[:length] in self.accounts:
+                return code[:length]
+        return None
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.accounts
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def get(self, code: str) -> Optional[Account]:
+        return self.accounts.get(code)
+
+    def ancestors(self, code: str) -> List[str]:
+        """Parent, grandparent, ... up to the class."""
+        chain = []
+        account = self.accounts.get(code)
+        while account is not None and account.parent:
+            chain.append(account.parent)
+            account = self.accounts.get(account.parent)
+        return chain
+
+    @property
+    def index(self):
+        """BM25 index of the account names (chart_retrieval), built on first use."""
+        if self._index is None:
+            from chart_retrieval import ChartIndex
+            self._index = ChartIndex(self)
+        return self._index
+
+
+_chart: Optional[ChartOfAccounts] = None
+_chart_stamp: Optional[tuple] = None
+_source_path: Optional[str] = None
+_lock = threading.Lock()
+_text_charts: "OrderedDict[str, ChartOfAccounts]" = OrderedDict()
+
+
+def _candidate_paths() -> List[str]:
+    here = os.path.dirname(os.path.abspath(__file__))
+    relative = os.path.join("src", "utils", "romanianChartOfAccounts.ts")
+    paths = [
+        # agents/first_crew_finova/src/first_crew_finova -> server/finova
+        os.path.join(here, "..", "..", "..", "..", relative),
+        os.path.join(os.getcwd(), relative),
+        os.path.join(os.getcwd(), "server", "finova", relative),
+    ]
+    configured = os.getenv("FINOVA_CHART_FILE")
+    return [configured] + paths if configured else paths
+
+
+def _fallback_path() -> str:
+    return importlib.util.find_spec("chart_fallback").origin
+
+
+def _stamp(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _source() -> str:
+    """The chart file to read, probed once per process and again only if it disappears."""
+    global _source_path
+    if _source_path and os.path.exists(_source_path):
+        return _source_path
+    for path in _candidate_paths():
+        if os.path.exists(path):
+            _source_path = os.path.abspath(path)
+            logger.info("Chart of accounts source: %s", _source_path)
+            return _source_path
+    logger.error("romanianChartOfAccounts.ts not found (set FINOVA_CHART_FILE); using the built-in chart")
+    _source_path = _fallback_path()
+    return _source_path
+
+
+def _read_text(path: str) -> Optional[str]:
+    if path == _fallback_path():
+        from chart_fallback import FALLBACK_CHART_OF_ACCOUNTS
+        return FALLBACK_CHART_OF_ACCOUNTS
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    start = content.find(TS_START_MARKER)
+    end = content.rfind("`")
+    if start == -1 or end <= start + len(TS_START_MARKER):
+        logger.warning("No chart literal found in %s", path)
+        return None
+    text = content[start + len(TS_START_MARKER):end].strip()
+    if len(text) < MIN_CHART_CHARS:
+        logger.warning("Chart in %s too short (%d chars)", path, len(text))
+        return None
+    return text
+
+
+def _snapshot_path() -> str:
+    configured = os.getenv("FINOVA_CHART_SNAPSHOT")
+    return state_dir.private_file(configured) if configured else state_dir.path("chart_of_accounts.pickle")
+
+
+def _load_snapshot(stamp: tuple) -> Optional[ChartOfAccounts]:
+    try:
+        with open(_snapshot_path(), "rb") as f:
+            info = os.fstat(f.fileno())
+            if info.st_uid != os.getuid() or info.st_mode & 0o022:
+                logger.warning("Ignoring chart snapshot %s: not owned by this user or writable by others", f.name)
+                return None
+            snapshot: Dict[str, Any] = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except state_dir.UnsafeStateDir as e:
+        logger.warning("Not loading the chart snapshot: %s", e)
+        return None
+    except Exception as e:
+        logger.debug("Chart snapshot unreadable: %s", e)
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("stamp") != stamp:
+        return None
+    return snapshot.get("chart")
+
+
+def _save_snapshot(stamp: tuple, chart: ChartOfAccounts) -> None:
+    try:
+        path = _snapshot_path()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "stamp": stamp, "chart": chart}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("Could not save the chart snapshot: %s", e)
+
+
+def _load(path: str, stamp: tuple) -> ChartOfAccounts:
+    chart = _load_snapshot(stamp)
+    if chart is not None:
+        logger.debug("Chart of accounts loaded from snapshot: %d accounts", len(chart))
+        return chart
+    text = _read_text(path)
+    if text is None:
+        path = _fallback_path()
+        stamp = _stamp(path)
+        text = _read_text(path)
+    chart = ChartOfAccounts(text, path)
+    chart.index  # built now, so the snapshot includes it
+    _save_snapshot(stamp, chart)
+    logger.info("Chart of accounts parsed: %d accounts from %s", len(chart), os.path.basename(path))
+    return chart
+
+
+def get_chart() -> ChartOfAccounts:
+    """The shared chart model, reloaded when its source file changes."""
+    global _chart, _chart_stamp
+    path = _source()
+    stamp = _stamp(path)
+    if _chart is not None and stamp == _chart_stamp:
+        return _chart
+    with _lock:
+        if _chart is None or stamp != _chart_stamp:
+            _chart = _load(path, stamp)
+            _chart_stamp = stamp
+    return _chart
+
+
+def from_text(text: str) -> ChartOfAccounts:
+    """Model of a chart given as text (e.g. sent with the job)."""
+    with _lock:
+        chart = _text_charts.get(text)
+        if chart is None:
+            chart = ChartOfAccounts(text, "job")
+            _text_charts[text] = chart
+            while len(_text_charts) > TEXT_CHARTS_KEPT:
+                _text_charts.popitem(last=False)
+        _text_charts.move_to_end(text)
+    return chart
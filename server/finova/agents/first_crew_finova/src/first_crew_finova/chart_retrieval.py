@@ -0,0 +1,137 @@
+"""Chart-of-accounts candidates for a document instead of the whole chart.
+
+The extraction and attribution prompts used to interpolate the whole Romanian
+chart of accounts: about 43 KB, over 10k input tokens, on every call that sees
+it. `candidate_chart(chart, query)` returns a short chart instead. It holds the
+entries most relevant to the document text (or transaction description), their
+parent groups and classes, and a few accounts almost every document posts to
+(`COMMON_ACCOUNTS`). Entries keep the chart's own order and indentation.
+
+Relevance is BM25 over the account names:
+
+- text is lowercased, diacritics are folded (ă/â→a, î→i, ș/ş→s, ț/ţ→t) and words
+  are cut to their first `STEM_LENGTH` letters, a crude stemmer for Romanian
+  inflections ("combustibilii", "combustibil");
+- every distinct query word counts once, so a word repeated across the document
+  does not drown out the rest;
+- a few everyday words that never appear in account names are expanded to chart
+  vocabulary (`QUERY_EXPANSIONS`, e.g. motorina → combustibili).
+
+The index is built once per chart and kept on its `ChartOfAccounts` model, and in
+the model's snapshot. `FINOVA_CHART_TOP_K` (default 40) sets the number of
+retrieved entries. `FINOVA_CHART_RETRIEVAL=0` sends the full chart again. When
+nothing in the query matches the chart, the full chart is returned too.
+"""
+
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from chart_of_accounts import ChartOfAccounts
+from jsonlog import get_logger
+
+logger = get_logger("chart_retrieval")
+
+ENABLED = os.getenv("FINOVA_CHART_RETRIEVAL", "1").lower() not in ("0", "false", "no", "off")
+TOP_K = int(os.getenv("FINOVA_CHART_TOP_K", "40"))
+STEM_LENGTH = 6
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Suppliers, customers, VAT, bank and cash, goods and the generic service/material accounts.
+COMMON_ACCOUNTS = ("401", "411", "4111", "4426", "4427", "5121", "5311", "371", "604", "607", "6028", "628", "704", "707")
+
+STOP_WORDS = {
+    "a", "ai", "al", "ale", "alt", "au", "ca", "care", "ce", "cu", "de", "din", "du", "este", "fara", "iar",
+    "in", "la", "lor", "mai", "nu", "o", "or", "ori", "pe", "pentru", "prin", "privind", "sa", "sau", "se", "si",
+    "sub", "un", "una", "unei", "unui", "the", "and", "of", "for", "to",
+}
+
+QUERY_EXPANSIONS = {
+    "motorina": "combustibili", "benzina": "combustibili", "carburant": "combustibili", "diesel": "combustibili",
+    "gpl": "combustibili", "chirie": "chiriile", "inchiriere": "chiriile", "telefon": "telecomunicatii",
+    "internet": "telecomunicatii", "abonament": "telecomunicatii", "curier": "postale", "curent": "energie",
+    "electricitate": "energie", "gaz": "gaze naturale", "salariu": "salariile", "reparatie": "reparatiile",
+    "service": "intretinerea reparatiile", "rca": "asigurare", "casco": "asigurare",
+    "comision": "comisioanele", "dobanda": "dobanzile", "reclama": "publicitate", "marketing": "publicitate",
+    "hotel": "deplasari", "cazare": "deplasari", "diurna": "deplasari",
+    "laptop": "aparatura birotica", "calculator": "aparatura birotica", "software": "licente",
+    "licenta": "licente", "rechizite": "materiale consumabile", "hartie": "materiale consumabile",
+}
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics; cedilla and comma-below forms fold alike."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return [word[:STEM_LENGTH] for word in _WORD.findall(fold(text)) if len(word) > 1 and word not in STOP_WORDS]
+
+
+class ChartIndex:
+    """BM25 index over the account names of one chart."""
+
+    def __init__(self, chart: ChartOfAccounts):
+        self.chart = chart
+        self.codes = list(chart.accounts)
+        self.term_counts = [Counter(tokenize(account.name)) for account in chart.accounts.values()]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        self.postings: Dict[str, List[int]] = {}
+        for position, counts in enumerate(self.term_counts):
+            for term in counts:
+                self.postings.setdefault(term, []).append(position)
+        total = len(self.codes)
+        self.idf = {term: math.log(1 + (total - len(found) + 0.5) / (len(found) + 0.5))
+                    for term, found in self.postings.items()}
+
+    def scores(self, query: str) -> Counter:
+        """BM25 score of every account sharing a term with `query`."""
+        words = _WORD.findall(fold(query))
+        expanded = " ".join(QUERY_EXPANSIONS.get(word, "") for word in words)
+        terms = set(tokenize(" ".join(words) + " " + expanded)) & self.postings.keys()
+        scores: Counter = Counter()
+        for term in terms:
+            idf = self.idf[term]
+            for position in self.postings[term]:
+                frequency = self.term_counts[position][term]
+                norm = 1 - BM25_B + BM25_B * self.lengths[position] / self.average_length
+                scores[self.codes[position]] += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+        return scores
+
+    def search(self, query: str, k: int) -> List[str]:
+        """Codes of the `k` best matching accounts, best first."""
+        return [code for code, _ in self.scores(query).most_common(k)]
+
+    def subset(self, codes: Iterable[str]) -> str:
+        """Chart text with the given accounts, their children and all their ancestors."""
+        keep: Set[str] = set()
+        for code in codes:
+            if code not in self.chart:
+                continue
+            keep.add(code)
+            keep.update(self.chart.children.get(code, ()))
+            keep.update(self.chart.ancestors(code))
+        return "\n".join(account.line for account in self.chart.accounts.values() if account.code in keep)
+
+
+def candidate_chart(chart: ChartOfAccounts, query: str, k: Optional[int] = None) -> str:
+    """The part of `chart` relevant to `query`, or the whole chart text when retrieval is off or finds nothing."""
+    if not ENABLED or not len(chart) or not query or not query.strip():
+        return chart.text
+    index = chart.index
+    matches = index.search(query, k or TOP_K)
+    if not matches:
+        logger.info("No chart entries match the document text, sending the full chart")
+        return chart.text
+    candidates = index.subset(matches + list(COMMON_ACCOUNTS))
+    logger.info("Chart of accounts: %d of %d entries sent (%d of %d chars)",
+                candidates.count("\n") + 1, len(chart), len(candidates), len(chart.text))
+    return "ROMANIAN_CHART_OF_ACCOUNTS (candidate accounts):\n" + candidates
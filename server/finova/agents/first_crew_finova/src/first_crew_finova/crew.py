@@ -1,16 +1,28 @@
 from crewai import Agent, Crew, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
+from crewai.tasks.conditional_task import ConditionalTask
 from crewai.tools import BaseTool
-from typing import List, Dict, Type
+from crewai.utilities.converter import Converter, ConverterError
+from litellm.integrations.custom_logger import CustomLogger
+from typing import List, Dict, Optional, Type
 import os
 import json
-import traceback
-import sys
+import time
 from pydantic import BaseModel, Field
-import logging
-import hashlib
+import importlib.util
 import re
 
+import document_models
+import llm_cache
+import openai_client
+import pdf_pages
+import text_cache
+import usage
+from ingest import document_hash
+from jsonlog import get_logger
+
+logger = get_logger("crew")
+
 
 try:
     from .tools.serper_tool import get_serper_tool
@@ -18,7 +30,7 @@ except ImportError:
     try:
         from tools.serper_tool import get_serper_tool
     except ImportError:
-        print("Warning: Serper tool not available", file=sys.stderr)
+        logger.warning("Serper tool not available")
         def get_serper_tool():
             return None
 
@@ -27,17 +39,15 @@ try:
 except ImportError:
     from crewai.process import Process
 
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
+# Heavy optional dependencies are only checked for here and imported on first use.
+PYPDF2_AVAILABLE = importlib.util.find_spec("PyPDF2") is not None
 
 try:
-    from llm_vision_ocr_tool import LLMVisionTextExtractorTool
+    from llm_vision_ocr_tool import LLMVisionTextExtractorTool, PDF_TO_IMAGE_AVAILABLE
     LLM_VISION_AVAILABLE = True
 except ImportError:
     LLM_VISION_AVAILABLE = False
+    PDF_TO_IMAGE_AVAILABLE = False
     try:
         OCR_TOOL_AVAILABLE = True
     except ImportError:
@@ -62,18 +72,29 @@ class SimpleTextExtractorTool(BaseTool):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        def _extract_with_pages(path: str) -> str:
+            """Text layer where usable; image-only pages OCR'd page by page. Empty if that is not possible."""
+            pages = pdf_pages.classify_pages(path)
+            if all(page.has_text_layer for page in pages):
+                return pdf_pages.merge_pages(pages, {})
+            text_layer = "\n".join(page.text for page in pages if page.has_text_layer)
+            if not (LLM_VISION_AVAILABLE and PDF_TO_IMAGE_AVAILABLE):
+                return pdf_pages.merge_pages(pages, {}) if len(text_layer.strip()) > 100 else ""
+            image_only = [page.number for page in pages if not page.has_text_layer]
+            ocr_texts = get_text_extractor_tool().ocr_pdf_pages(path, image_only, text_layer)
+            return pdf_pages.merge_pages(pages, ocr_texts)
+
         def _extract_with_vision(path: str) -> str:
             """Extract text using OpenAI's Vision API."""
             try:
                 import base64
-                from openai import OpenAI
                 
                 with open(path, "rb") as f:
                     file_content = f.read()
                 base64_encoded = base64.b64encode(file_content).decode('utf-8')
                 
-                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                response = client.chat.completions.create(
+                extracted_text = llm_cache.cached_chat_completion(
+                    "simple_text_extractor_vision",
                     model="gpt-4o",
                     messages=[
                         {
@@ -92,25 +113,22 @@ class SimpleTextExtractorTool(BaseTool):
                     ],
                     max_tokens=6000,  # Increased token limit for better extraction
                 )
-                extracted_text = response.choices[0].message.content
-                print(f"🔍 Vision API extracted {len(extracted_text)} characters", file=sys.stderr)
+                logger.debug("Vision API extracted %s characters", len(extracted_text))
                 return extracted_text
             except Exception as e:
-                print(f"OpenAI Vision extraction failed: {e}", file=sys.stderr)
+                logger.warning("OpenAI Vision extraction failed: %s", e)
                 return ""
 
         if file_path.lower().endswith(".pdf"):
             if PYPDF2_AVAILABLE:
                 try:
-                    with open(file_path, "rb") as f:
-                        reader = PyPDF2.PdfReader(f)
-                        extracted = "\n".join(page.extract_text() or "" for page in reader.pages)
-                        if len(extracted.strip()) > 100:
-                            return extracted
+                    extracted = text_cache.get_or_extract(file_path, "pdf_plain", lambda: _extract_with_pages(file_path))
+                    if extracted.strip():
+                        return extracted
                 except Exception as e:
-                    print(f"PyPDF2 extraction failed, will try Vision API: {e}", file=sys.stderr)
+                    logger.info("Per-page extraction failed, will try Vision API: %s", e)
 
-            vision_result = _extract_with_vision(file_path)
+            vision_result = text_cache.get_or_extract(file_path, "vision_pdf", lambda: _extract_with_vision(file_path))
             if vision_result and len(vision_result.strip()) > 50:
                 return vision_result
             return "Could not extract text from PDF (PyPDF2 and Vision API both failed)."
@@ -129,14 +147,8 @@ class DocumentHashTool(BaseTool):
     args_schema: Type[BaseModel] = FileReadInput
     
     def _run(self, file_path: str) -> str:
-        """Generate MD5 hash of document content."""
-        try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                return hashlib.md5(content).hexdigest()
-        except Exception as e:
-            print(f"Failed to generate hash: {str(e)}")
-            return ""
+        """Generate MD5 hash of document content, reusing the hash computed at ingest."""
+        return document_hash(file_path)
         
 class ComplianceMessageTranslator:
     """Helper class for generating bilingual compliance messages"""
@@ -196,8 +208,8 @@ class EnhancedDuplicateDetectionTool(BaseTool):
         
         current_normalized = self._normalize_document(current_doc)
         
-        print(f"[DUPLICATE_DETECTION] Checking document type: {current_normalized.get('document_type')}")
-        print(f"[DUPLICATE_DETECTION] Against {len(existing_documents)} existing documents")
+        logger.debug("Duplicate detection: checking document type %s", current_normalized.get('document_type'))
+        logger.debug("Duplicate detection: against %s existing documents", len(existing_documents))
         
         same_type_docs = []
         for existing_doc in existing_documents:
@@ -207,7 +219,7 @@ class EnhancedDuplicateDetectionTool(BaseTool):
                 current_normalized['document_type'] == existing_normalized['document_type']):
                 same_type_docs.append((existing_doc, existing_normalized))
         
-        print(f"[DUPLICATE_DETECTION] Found {len(same_type_docs)} documents of same type to compare")
+        logger.debug("Duplicate detection: %s documents of same type to compare", len(same_type_docs))
         
         for existing_doc, existing_normalized in same_type_docs:
             if (current_doc.get('document_hash') and existing_doc.get('document_hash') and
@@ -242,10 +254,10 @@ class EnhancedDuplicateDetectionTool(BaseTool):
         
         is_duplicate = len(duplicates) > 0
         
-        print(f"[DUPLICATE_DETECTION] Result: {len(duplicates)} potential duplicates found")
+        logger.info("Duplicate detection: %s potential duplicates found", len(duplicates))
         if duplicates:
             for dup in duplicates:
-                print(f"  - {dup['duplicate_type']}: {dup['reason']} (score: {dup['similarity_score']:.2f})")
+                logger.debug("  - %s: %s (score: %.2f)", dup['duplicate_type'], dup['reason'], dup['similarity_score'])
         
         return json.dumps({
             "is_duplicate": is_duplicate,
@@ -424,14 +436,101 @@ class EnhancedDuplicateDetectionTool(BaseTool):
         except:
             return 999  
         
+_text_extractor_tool = None
+
 def get_text_extractor_tool():
+    """One extractor tool shared by every agent; extracted text is cached in text_cache."""
+    global _text_extractor_tool
+    if _text_extractor_tool is not None:
+        return _text_extractor_tool
+    _text_extractor_tool = _create_text_extractor_tool()
+    return _text_extractor_tool
+
+def _create_text_extractor_tool():
     if LLM_VISION_AVAILABLE:
-        print("Using LLM Vision Text Extractor")
+        logger.debug("Using LLM Vision Text Extractor")
         return LLMVisionTextExtractorTool()
     else:
-        print("Using Simple Text Extractor (fallback)")
+        logger.debug("Using Simple Text Extractor (fallback)")
         return SimpleTextExtractorTool()
 
+class _UsageCallback(CustomLogger):
+    """Keeps the usage crewai reports for one completion.
+
+    crewai hands callbacks `{"usage": ...}` itself; litellm's own invocation passes the
+    full response object and is ignored so nothing is counted twice.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.response = {}
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        if isinstance(response_obj, dict) and "usage" in response_obj:
+            self.response = response_obj
+
+
+class CachedLLM(LLM):
+    """crewai LLM whose plain text completions go through the persistent response cache.
+
+    Calls that reach the API wait for the shared OpenAI rate limiter first, and their
+    usage is recorded in the job's ledger under the task name. litellm does not
+    report usage to the limiter, so the full estimate stays spent.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, **kwargs):
+        task_name = getattr(from_task, "name", None) or "crew"
+
+        def _call():
+            usage.check_budget(task_name)
+            openai_client.limiter.acquire(openai_client.estimate_tokens(
+                messages if isinstance(messages, list) else [messages], self.max_tokens))
+            recorder = _UsageCallback()
+            started = time.perf_counter()
+            try:
+                response = super(CachedLLM, self).call(messages, tools=tools, callbacks=list(callbacks or []) + [recorder],
+                                                       available_functions=available_functions,
+                                                       from_task=from_task, from_agent=from_agent, **kwargs)
+            except Exception as e:
+                openai_client.note_error(e)
+                raise
+            usage.record_response(task_name, self.model, recorder.response, (time.perf_counter() - started) * 1000)
+            return response
+
+        # Native tool calls execute functions as a side effect, so only plain completions are cached.
+        if tools or available_functions:
+            return _call()
+
+        params = {"temperature": self.temperature, "max_tokens": self.max_tokens}
+        return llm_cache.cached_call(self.model, messages, task_name, _call, params)
+
+class SchemaConverter(Converter):
+    """Turns a final answer crewai could not validate into the task's output model.
+
+    crewai's own converter asks the LLM again, through instructor and outside the
+    response cache, rate limiter and usage ledger. This one first reads the answer
+    locally (json_extract, then the lenient models), and only if that fails makes
+    one call through the agent's CachedLLM.
+    """
+
+    def _convert(self):
+        output = document_models.parse(self.text, self.model)
+        if output is None:
+            logger.info("%s answer not readable locally, asking the LLM to reformat it", self.model.__name__)
+            response = self.llm.call([
+                {"role": "system", "content": self.instructions},
+                {"role": "user", "content": self.text},
+            ])
+            output = document_models.parse(response if isinstance(response, str) else "", self.model)
+        return output if output is not None else ConverterError(f"Answer does not match {self.model.__name__}")
+
+    def to_pydantic(self, current_attempt: int = 1):
+        return self._convert()
+
+    def to_json(self, current_attempt: int = 1):
+        output = self._convert()
+        return output if isinstance(output, ConverterError) else json.dumps(document_models.to_dict(output))
+
 def get_configured_llm():
     """Get properly configured LLM for CrewAI agents"""
     
@@ -439,25 +538,21 @@ def get_configured_llm():
     model_name = os.getenv('MODEL', 'gpt-4o-mini')
     
     if not openai_api_key:
-        print("ERROR: OPENAI_API_KEY environment variable not found", file=sys.stderr)
+        logger.error("OPENAI_API_KEY environment variable not found")
         return None
     
     try:
-        from crewai import LLM
-        print("Importing LLM from crewai...", file=sys.stderr)
-        
-        llm = LLM(
+        llm = CachedLLM(
             model=model_name,
             temperature=0.3,
             max_tokens=4000
         )
         
-        print("LLM configuration successful", file=sys.stderr)
+        logger.debug("LLM configuration successful")
         return llm
         
     except Exception as e:
-        print(f"ERROR: Failed to configure LLM: {str(e)}", file=sys.stderr)
-        print(f"Traceback:\n{traceback.format_exc()}", file=sys.stderr)
+        logger.error("Failed to configure LLM: %s", e, exc_info=True)
         return None
 
 @CrewBase
@@ -476,16 +571,16 @@ class FirstCrewFinova:
         self.llm = get_configured_llm()
         
         import os
-        print(f"Current working directory: {os.getcwd()}", file=sys.stderr)
-        print(f"Looking for agents config at: {self.agents_config}", file=sys.stderr)
-        print(f"Agents config file exists: {os.path.exists(self.agents_config)}", file=sys.stderr)
+        logger.debug("Current working directory: %s", os.getcwd())
+        logger.debug("Looking for agents config at: %s", self.agents_config)
+        logger.debug("Agents config file exists: %s", os.path.exists(self.agents_config))
         
         config_dir = os.path.dirname(self.agents_config) if self.agents_config else 'config'
-        print(f"Config directory '{config_dir}' exists: {os.path.exists(config_dir)}", file=sys.stderr)
+        logger.debug("Config directory '%s' exists: %s", config_dir, os.path.exists(config_dir))
         
         if os.path.exists(config_dir):
             files_in_config = os.listdir(config_dir)
-            print(f"Files in config directory: {files_in_config}", file=sys.stderr)
+            logger.debug("Files in config directory: %s", files_in_config)
     
     def attribute_account_for_transaction(self, transaction_data: dict, romanian_chart_of_accounts: str) -> dict:
         """Use the account attribution agent to categorize a bank transaction."""
@@ -509,8 +604,11 @@ class FirstCrewFinova:
 
             if hasattr(result, 'tasks_output') and result.tasks_output:
                 task_output = result.tasks_output[0]
-                if hasattr(task_output, 'raw'):
-                    return self._parse_account_attribution_result(task_output.raw)
+                if task_output.pydantic is not None:
+                    return document_models.to_dict(task_output.pydantic)
+                output = document_models.parse(task_output.raw, document_models.AccountAttribution)
+                if output is not None:
+                    return output.to_dict()
 
             return {
                 'account_code': '628',
@@ -521,7 +619,7 @@ class FirstCrewFinova:
             }
 
         except Exception as e:
-            print(f"Account attribution failed: {str(e)}", file=sys.stderr)
+            logger.error("Account attribution failed: %s", e)
             return {
                 'account_code': '628',
                 'account_name': 'Alte cheltuieli cu serviciile executate de terți',
@@ -530,32 +628,6 @@ class FirstCrewFinova:
                 'requires_manual_review': True
             }
 
-    def _parse_account_attribution_result(self, raw_output: str) -> dict:
-        """Parse the agent's JSON output."""
-        try:
-            import re
-            json_match = re.search(r'\{[^{}]*\}', raw_output)
-            if json_match:
-                result_json = json.loads(json_match.group())
-                return result_json
-            else:
-                return {
-                    'account_code': '628',
-                    'account_name': 'Alte cheltuieli cu serviciile executate de terți',
-                    'confidence': 0.2,
-                    'reasoning': 'Could not parse agent response',
-                    'requires_manual_review': True
-                }
-        except Exception as e:
-            print(f"Failed to parse attribution result: {str(e)}", file=sys.stderr)
-            return {
-                'account_code': '628',
-                'account_name': 'Alte cheltuieli cu serviciile executate de terți',
-                'confidence': 0.1,
-                'reasoning': 'Parsing error',
-                'requires_manual_review': True
-            }
-
     @agent
     def document_categorizer(self) -> Agent:
         learning_context = ""
@@ -566,7 +638,7 @@ class FirstCrewFinova:
                 for correction in categorization_corrections[-5:]:  # Use last 5 corrections
                     learning_context += f"- Original prediction: {correction.get('originalValue')}, Correct answer: {correction.get('correctedValue')}\n"
         
-        print(f"Trying to access document_categorizer config...", file=sys.stderr)
+        logger.debug("Trying to access document_categorizer config...")
         
         enhanced_goal = self.agents_config['document_categorizer']['goal'] + f" Learn from user corrections to improve accuracy.{learning_context}"
         enhanced_backstory = self.agents_config['document_categorizer']['backstory'] + " You learn from user feedback to continuously improve your classifications."
@@ -582,7 +654,7 @@ class FirstCrewFinova:
         if self.llm:
             agent_config['llm'] = self.llm
             
-        print(f"Document categorizer config created successfully", file=sys.stderr)
+        logger.debug("Document categorizer config created successfully")
         return Agent(**agent_config)
 
     @agent
@@ -655,9 +727,9 @@ class FirstCrewFinova:
         serper_tool = get_serper_tool()
         if serper_tool:
             tools.append(serper_tool)
-            print("Account attribution agent: Serper research enabled", file=sys.stderr)
+            logger.debug("Account attribution agent: Serper research enabled")
         else:
-            print("Account attribution agent: Using local knowledge only", file=sys.stderr)
+            logger.debug("Account attribution agent: Using local knowledge only")
     
 
         agent_config = {
@@ -677,54 +749,73 @@ class FirstCrewFinova:
     def categorize_document_task(self) -> Task:
         return Task(
             config=self.tasks_config['categorize_document_task'],
+            output_pydantic=document_models.DocumentCategory,
+            converter_cls=SchemaConverter,
         )
 
     @task
     def extract_invoice_data_task(self) -> Task:
         return Task(
             config=self.tasks_config['extract_invoice_data_task'],
-            output_file='invoice_data.json'
+            output_file='invoice_data.json',
+            output_pydantic=document_models.Invoice,
+            converter_cls=SchemaConverter,
         )
 
     @task
-    def extract_other_document_data_task(self) -> Task:
+    def extract_other_document_data_task(self, doc_type: str = "") -> Task:
+        # The output model follows the phase 0 document type; unknown types stay free-form.
         return Task(
             config=self.tasks_config['extract_other_document_data_task'],
-            output_file='other_document_data.json'
+            output_file='other_document_data.json',
+            output_pydantic=document_models.model_for(doc_type),
+            converter_cls=SchemaConverter,
         )
 
+    # Duplicate detection and compliance validation are skipped once the document's
+    # token budget is spent (see usage.py).
     @task
     def detect_duplicates_task(self) -> Task:
-        return Task(
+        return ConditionalTask(
             config=self.tasks_config['detect_duplicates_task'],
-            output_file='duplicate_detection.json'
+            output_file='duplicate_detection.json',
+            output_pydantic=document_models.DuplicateResult,
+            converter_cls=SchemaConverter,
+            condition=lambda _: usage.allow_optional_stage("detect_duplicates_task"),
         )
 
     @task
     def validate_compliance_task(self) -> Task:
-        return Task(
+        return ConditionalTask(
             config=self.tasks_config['validate_compliance_task'],
-            output_file='compliance_validation.json'
+            output_file='compliance_validation.json',
+            output_pydantic=document_models.ComplianceResult,
+            converter_cls=SchemaConverter,
+            condition=lambda _: usage.allow_optional_stage("validate_compliance_task"),
         )
 
     @task
     def attribute_bank_transaction_account_task(self) -> Task:
         return Task(
             config=self.tasks_config['attribute_bank_transaction_account_task'],
-            output_file='account_attribution.json'
+            output_file='account_attribution.json',
+            output_pydantic=document_models.AccountAttribution,
+            converter_cls=SchemaConverter,
         )
         
     @crew
-    def crew(self) -> Crew:
+    def crew(self, extraction_task: Optional[Task] = None) -> Crew:
+        """Phase 0 categorizes; phase 1 runs `extraction_task` followed by the optional checks."""
         if self.processing_phase == 0:
             tasks = [self.categorize_document_task()]
-            print("Phase 0: Only running categorization task", file=sys.stderr)
+            logger.info("Phase 0: Only running categorization task")
         else:
             tasks = [
+                extraction_task or self.extract_other_document_data_task(),
                 self.detect_duplicates_task(),
                 self.validate_compliance_task()
             ]
-            print("Phase 1: Running full processing pipeline", file=sys.stderr)
+            logger.info("Phase 1: Running full processing pipeline")
 
         crew_config = {
             'agents': self.agents,
@@ -0,0 +1,415 @@
+"""Typed outputs of the crew tasks, one pydantic model per document type and check.
+
+The tasks set these models as `output_pydantic`, so crewai appends their schema to
+the prompt and validates the final answer against them (crew.SchemaConverter).
+main.py reads the validated model instead of parsing free text.
+
+The models are lenient, because a rejected answer costs another LLM call:
+
+- amounts accept numbers or strings in Romanian or English formatting
+  ("1.234,56", "1,234.56 RON", "12.500 RON" is 12500, "7,249" is 7.249), except
+  that line item quantities and unit prices never read a lone dot as thousands;
+  text that is not a number becomes null;
+- EINs lose their "RO" prefix; codes and numbers given as numbers become strings;
+- a null list becomes [], a single value a one-item list;
+- unknown fields are kept, so nothing the LLM adds is lost on the way to Node.
+
+The defaults that main.py used to patch in at several places (empty vendor and
+buyer, total_amount 0, currency RON, empty line_items, PENDING compliance) are
+the models' defaults. `to_dict()` outputs what the LLM set plus the fields
+listed in `ALWAYS`, which are present even when the LLM left them out.
+"""
+
+import re
+from typing import Annotated, Any, ClassVar, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError, model_validator
+
+import json_extract
+from jsonlog import get_logger
+
+logger = get_logger("document_models")
+
+_NUMBER = re.compile(r"-?\d[\d.,\s]*")
+_THOUSANDS = re.compile(r"^-?[1-9]\d{0,2}\.\d{3}$")
+
+
+def _amount(value: Any, group_thousands: bool = True) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value))
+    if not match:
+        return None
+    number = re.sub(r"\s", "", match.group()).rstrip(".,")
+    if "," in number and "." in number:
+        # "1.234,56" or "1,234.56": the separator written last is the decimal one.
+        thousands = "." if number.rfind(",") > number.rfind(".") else ","
+        number = number.replace(thousands, "")
+    elif number.count(",") > 1 or number.count(".") > 1:
+        # "1.234.567": only thousands separators.
+        number = number.replace(",", "").replace(".", "")
+    elif group_thousands and _THOUSANDS.match(number):
+        # "12.500": a lone dot before exactly three digits groups thousands. A lone
+        # comma is the Romanian decimal point ("7,249" lei/l, "23,450" l).
+        number = number.replace(".", "")
+    try:
+        return float(number.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def _ein(value: Any) -> Optional[str]:
+    value = _text(value)
+    if isinstance(value, str):
+        value = re.sub(r"^\s*RO", "", value, flags=re.IGNORECASE).strip()
+    return value
+
+
+def _list(value: Any) -> Any:
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _texts(value: Any) -> Any:
+    return [_text(item) for item in _list(value) if item is not None]
+
+
+def _bilingual(value: Any) -> Dict[str, List[str]]:
+    if isinstance(value, dict):
+        return {"ro": _texts(value.get("ro")), "en": _texts(value.get("en"))}
+    messages = _texts(value)
+    return {"ro": messages, "en": list(messages)}
+
+
+Amount = Annotated[Optional[float], BeforeValidator(_amount)]
+# Quantities and unit prices (litres, fuel prices) often have three decimals: "1.500" is 1.5.
+Measure = Annotated[Optional[float], BeforeValidator(lambda value: _amount(value, group_thousands=False))]
+Text = Annotated[Optional[str], BeforeValidator(_text)]
+EIN = Annotated[Optional[str], BeforeValidator(_ein)]
+TextList = Annotated[List[str], BeforeValidator(_texts)]
+Bilingual = Annotated[Dict[str, List[str]], BeforeValidator(_bilingual)]
+
+
+class Output(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    # Fields output even when the LLM did not set them, with their defaults.
+    ALWAYS: ClassVar[Tuple[str, ...]] = ()
+
+    @model_validator(mode="before")
+    @classmethod
+    def _defaults_for_nulls(cls, data: Any) -> Any:
+        if isinstance(data, dict) and any(data.get(name) is None for name in cls.ALWAYS if name in data):
+            data = {key: value for key, value in data.items() if not (key in cls.ALWAYS and value is None)}
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.model_dump(include=set(self.ALWAYS)) if self.ALWAYS else {}
+        data.update(self.model_dump(exclude_unset=True))
+        return data
+
+
+def _listed(model: Type[Output]):
+    return Annotated[List[model], BeforeValidator(_list)]
+
+
+class LineItem(Output):
+    name: Text = None
+    quantity: Measure = None
+    unit_price: Measure = None
+    vat_amount: Amount = None
+    total: Amount = None
+    type: Text = None
+    articleCode: Text = None
+    vat: Text = None
+    um: Text = None
+    account_code: Text = None
+    management: Text = None
+    isNew: Optional[bool] = None
+
+
+class DocumentCategory(Output):
+    document_type: Text = None
+    direction: Text = None
+    confidence: Amount = None
+
+
+class Invoice(Output):
+    ALWAYS = ("vendor", "buyer", "total_amount", "document_date", "line_items", "currency", "vat_amount")
+
+    document_type: Text = None
+    direction: Text = None
+    vendor: Text = ""
+    vendor_ein: EIN = None
+    buyer: Text = ""
+    buyer_ein: EIN = None
+    document_number: Text = None
+    document_date: Text = ""
+    due_date: Text = None
+    total_amount: Amount = 0
+    vat_amount: Amount = 0
+    currency: Text = "RON"
+    referenced_numbers: TextList = []
+    line_items: _listed(LineItem) = []
+    validation_warning: Any = None
+
+
+class Receipt(Output):
+    document_type: Text = None
+    receipt_number: Text = None
+    vendor: Text = None
+    vendor_ein: EIN = None
+    buyer: Text = None
+    buyer_ein: EIN = None
+    total_amount: Amount = None
+    document_date: Text = None
+    invoice_reference: Text = None
+    payment_method: Text = None
+    currency: Text = None
+    referenced_numbers: TextList = []
+    validation_warning: Any = None
+
+
+class BankTransaction(Output):
+    transaction_date: Text = None
+    description: Text = None
+    reference_number: Text = None
+    debit_amount: Amount = None
+    credit_amount: Amount = None
+    balance_after_transaction: Amount = None
+    transaction_type: Text = None
+    referenced_numbers: TextList = []
+
+
+class BankStatement(Output):
+    ALWAYS = ("transactions",)
+
+    document_type: Text = None
+    company_name: Text = None
+    company_ein: EIN = None
+    bank_name: Text = None
+    account_number: Text = None
+    statement_number: Text = None
+    statement_period_start: Text = None
+    statement_period_end: Text = None
+    opening_balance: Amount = None
+    closing_balance: Amount = None
+    currency: Text = None
+    transactions: _listed(BankTransaction) = []
+    referenced_numbers: TextList = []
+    validation_warning: Any = None
+
+
+class ContractParty(Output):
+    name: Text = None
+    ein: EIN = None
+    role: Text = None
+
+
+class Deliverable(Output):
+    description: Text = None
+    due_date: Text = None
+    amount: Amount = None
+    status: Text = None
+
+
+class Contract(Output):
+    document_type: Text = None
+    contract_number: Text = None
+    contract_type: Text = None
+    parties: _listed(ContractParty) = []
+    contract_date: Text = None
+    start_date: Text = None
+    end_date: Text = None
+    total_value: Amount = None
+    currency: Text = None
+    payment_terms: Text = None
+    deliverables: _listed(Deliverable) = []
+    referenced_numbers: TextList = []
+    validation_warning: Any = None
+
+
+class BankDetails(Output):
+    account_number: Text = None
+    bank_name: Text = None
+    swift_code: Text = None
+
+
+class PaymentOrder(Output):
+    document_type: Text = None
+    order_number: Text = None
+    order_type: Text = None
+    payer: Text = None
+    payer_ein: EIN = None
+    payee: Text = None
+    payee_ein: EIN = None
+    amount: Amount = None
+    currency: Text = None
+    order_date: Text = None
+    execution_date: Text = None
+    reference_invoice: Text = None
+    payment_method: Text = None
+    bank_details: Optional[BankDetails] = None
+    referenced_numbers: TextList = []
+    validation_warning: Any = None
+
+
+class VatBreakdown(Output):
+    vat_rate: Text = None
+    net_amount: Amount = None
+    vat_amount: Amount = None
+    total_amount: Amount = None
+
+
+class PaymentMethodTotal(Output):
+    method: Text = None
+    amount: Amount = None
+    transaction_count: Amount = None
+
+
+class ZReport(Output):
+    document_type: Text = None
+    report_number: Text = None
+    register_id: Text = None
+    business_date: Text = None
+    opening_time: Text = None
+    closing_time: Text = None
+    total_sales: Amount = None
+    total_transactions: Amount = None
+    vat_breakdown: _listed(VatBreakdown) = []
+    payment_methods: _listed(PaymentMethodTotal) = []
+    cancelled_transactions: Amount = None
+    refunds_amount: Amount = None
+    currency: Text = None
+    referenced_numbers: TextList = []
+    validation_warning: Any = None
+
+
+class DuplicateMatch(Output):
+    document_id: Any = None
+    similarity_score: Amount = None
+    matching_fields: TextList = []
+    duplicate_type: Text = None
+    reason: Text = None
+
+
+class DuplicateResult(Output):
+    ALWAYS = ("is_duplicate", "duplicate_matches", "document_hash", "confidence")
+
+    is_duplicate: bool = False
+    duplicate_matches: _listed(DuplicateMatch) = []
+    document_hash: Text = ""
+    confidence: Amount = 0.0
+    debug_info: Optional[Dict[str, Any]] = None
+
+
+class ComplianceResult(Output):
+    ALWAYS = ("compliance_status", "overall_score", "validation_rules", "errors", "warnings")
+
+    compliance_status: Text = "PENDING"
+    overall_score: Amount = 0.0
+    validation_rules: Bilingual = {"ro": [], "en": []}
+    errors: Bilingual = {"ro": [], "en": []}
+    warnings: Bilingual = {"ro": [], "en": []}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _unwrap(cls, data: Any) -> Any:
+        # The prompt used to ask for {"compliance_validation": {...}}.
+        if isinstance(data, dict) and isinstance(data.get("compliance_validation"), dict):
+            return data["compliance_validation"]
+        return data
+
+
+class AlternativeAccount(Output):
+    code: Text = None
+    name: Text = None
+    confidence: Amount = None
+
+
+class TransferSuggestion(Output):
+    is_transfer: bool = False
+    reasoning: Text = None
+    expected_counter_currency: Text = None
+    expected_counter_amount: Amount = None
+    allowed_variance_pct: Amount = None
+    counterpart_transaction_id: Text = None
+
+
+class AccountAttribution(Output):
+    account_code: Text = None
+    account_name: Text = None
+    confidence: Amount = None
+    reasoning: Text = None
+    alternative_accounts: _listed(AlternativeAccount) = []
+    transfer_suggestion: Optional[TransferSuggestion] = None
+    requires_manual_review: Optional[bool] = None
+
+
+DOCUMENT_MODELS: Dict[str, Type[Output]] = {
+    "invoice": Invoice,
+    "receipt": Receipt,
+    "bank statement": BankStatement,
+    "contract": Contract,
+    "payment order": PaymentOrder,
+    "collection order": PaymentOrder,
+    "z report": ZReport,
+}
+
+
+def model_for(document_type: Optional[str]) -> Optional[Type[Output]]:
+    """The extraction model of a (standardized) document type, None for unknown types."""
+    return DOCUMENT_MODELS.get((document_type or "").strip().lower())
+
+
+def defaults(model: Type[Output]) -> Dict[str, Any]:
+    return model().to_dict()
+
+
+def parse(text: str, model: Type[Output]) -> Optional[Output]:
+    """`model` validated from the JSON answer in `text`, or None."""
+    data, _ = json_extract.extract_json(text or "")
+    if not data:
+        return None
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        logger.warning("%s output does not match its schema: %s", model.__name__, e.error_count())
+        return None
+
+
+def coerce(model: Type[Output], data: Dict[str, Any]) -> Dict[str, Any]:
+    """`data` validated by `model` as a dict; kept as it is, with the model's defaults, if it does not validate."""
+    try:
+        return model.model_validate(data).to_dict()
+    except ValidationError as e:
+        logger.warning("%s output does not match its schema: %s", model.__name__, e.error_count())
+        return dict(defaults(model), **data)
+
+
+def to_dict(output: Any) -> Dict[str, Any]:
+    return output.to_dict() if isinstance(output, Output) else output.model_dump()
+
+
+def complete(data: Dict[str, Any], model: Optional[Type[Output]]) -> Dict[str, Any]:
+    """Fill the fields a document of this type always has, and the duplicate and compliance blocks, in place."""
+    for field, value in (defaults(model) if model else {}).items():
+        if data.get(field) is None:
+            data[field] = value
+    for field, check in (("duplicate_detection", DuplicateResult), ("compliance_validation", ComplianceResult)):
+        if not isinstance(data.get(field), dict):
+            data[field] = defaults(check)
+    return data
@@ -0,0 +1,171 @@
+"""Page image preparation for vision OCR.
+
+Every page used to go to GPT-4o as a full 200 dpi RGB JPEG with `detail: high`.
+The model never sees more than the API's resize of that image: fit into 2048x2048,
+then the short side down to 768. It is billed 85 tokens plus 170 per 512 px tile.
+`prepare_page` makes the upload match what is actually needed:
+
+- white scanner margins are cropped (`MARGIN_PADDING_PX` of padding is kept);
+- the page is converted to grayscale;
+- it is downsampled to the API's effective size, and further while the median text
+  line stays at least `FINOVA_VISION_MIN_LINE_PX` tall (default 18). It is never
+  left at more tiles than the uncropped page would have cost, since a narrow crop
+  would otherwise be resized to a taller, more expensive image;
+- sparse pages (few text lines that stay legible at 512 px) are sent with
+  `detail: low`, a flat 85 tokens;
+- pages with no ink at all are marked blank so no request is made for them.
+
+Each `PreparedPage` carries its upload size and estimated image tokens next to
+the token estimate of the old encoding, for the per-page report.
+`FINOVA_VISION_PREPROCESS=0` restores the old encoding.
+
+Runs inside the render processes, so it only depends on PIL.
+"""
+
+import io
+import math
+import os
+from typing import NamedTuple
+
+JPEG_QUALITY = 85
+PREPROCESS = os.getenv("FINOVA_VISION_PREPROCESS", "1").lower() not in ("0", "false", "no", "off")
+MIN_LINE_PX = int(os.getenv("FINOVA_VISION_MIN_LINE_PX", "18"))
+# Pages with at most this many text lines may go out with detail=low.
+LOW_DETAIL_MAX_LINES = int(os.getenv("FINOVA_VISION_LOW_DETAIL_MAX_LINES", "12"))
+MARGIN_PADDING_PX = 16
+# Grey levels this close to white count as paper, so scanner noise does not stop the crop.
+INK_THRESHOLD = 48
+
+# OpenAI image token accounting (gpt-4o).
+BASE_TOKENS = 85
+TILE_TOKENS = 170
+TILE_PX = 512
+HIGH_DETAIL_MAX_PX = 2048
+HIGH_DETAIL_SHORT_SIDE_PX = 768
+LOW_DETAIL_PX = 512
+
+
+class PreparedPage(NamedTuple):
+    jpeg: bytes
+    detail: str
+    width: int
+    height: int
+    estimated_tokens: int
+    # Estimated tokens of the same page under the old full-size, detail=high encoding.
+    baseline_tokens: int
+    text_lines: int
+    blank: bool = False
+
+
+def estimate_image_tokens(width: int, height: int, detail: str = "high") -> int:
+    """Image input tokens the vision model bills for a width x height upload."""
+    if detail == "low":
+        return BASE_TOKENS
+    width, height = _high_detail_size(width, height)
+    return BASE_TOKENS + TILE_TOKENS * math.ceil(width / TILE_PX) * math.ceil(height / TILE_PX)
+
+
+def _high_detail_size(width: int, height: int):
+    """Size the API resizes a detail=high image to before tiling it."""
+    scale = min(1.0, HIGH_DETAIL_MAX_PX / max(width, height))
+    scale *= min(1.0, HIGH_DETAIL_SHORT_SIDE_PX / (min(width, height) * scale))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _tile_budget_scale(width: int, height: int, max_tokens: int) -> float:
+    """Largest scale (<= 1) at which a width x height image costs at most max_tokens."""
+    max_tiles = HIGH_DETAIL_MAX_PX // TILE_PX
+    best = 0.0
+    for columns in range(1, max_tiles + 1):
+        for rows in range(1, max_tiles + 1):
+            if BASE_TOKENS + TILE_TOKENS * columns * rows <= max_tokens:
+                best = max(best, min(1.0, columns * TILE_PX / width, rows * TILE_PX / height))
+    return best or min(1.0, TILE_PX / max(width, height))
+
+
+def _ink_mask(gray):
+    """1-bit style mask: 255 where the page has ink, 0 for paper."""
+    return gray.point(lambda value: 255 if value < 255 - INK_THRESHOLD else 0)
+
+
+def _text_line_heights(mask):
+    """Heights in px of the horizontal bands that contain ink, top to bottom."""
+    profile = mask.resize((1, mask.height), resample=_box_filter())
+    heights, run = [], 0
+    for value in profile.getdata():
+        # A row with ink in at least ~0.4% of its width belongs to a text line.
+        if value > 1:
+            run += 1
+        elif run:
+            heights.append(run)
+            run = 0
+    if run:
+        heights.append(run)
+    return [height for height in heights if height >= 3]
+
+
+def _box_filter():
+    from PIL import Image
+    return Image.Resampling.BOX if hasattr(Image, "Resampling") else Image.BOX
+
+
+def _lanczos_filter():
+    from PIL import Image
+    return Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS
+
+
+def _encode(image) -> bytes:
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def encode_unprocessed(image) -> PreparedPage:
+    """The old encoding: full size RGB JPEG sent with detail=high."""
+    tokens = estimate_image_tokens(image.width, image.height)
+    return PreparedPage(_encode(image), "high", image.width, image.height, tokens, tokens, 0)
+
+
+def prepare_page(image) -> PreparedPage:
+    """Crop, grayscale, downsample and choose the detail level for one rendered page."""
+    if not PREPROCESS:
+        return encode_unprocessed(image)
+
+    baseline_tokens = estimate_image_tokens(image.width, image.height)
+    gray = image.convert('L')
+    mask = _ink_mask(gray)
+    bbox = mask.getbbox()
+    if bbox is None:
+        return PreparedPage(b"", "low", 0, 0, 0, baseline_tokens, 0, blank=True)
+
+    left, top, right, bottom = bbox
+    gray = gray.crop((
+        max(0, left - MARGIN_PADDING_PX),
+        max(0, top - MARGIN_PADDING_PX),
+        min(gray.width, right + MARGIN_PADDING_PX),
+        min(gray.height, bottom + MARGIN_PADDING_PX),
+    ))
+    line_heights = _text_line_heights(mask.crop(bbox))
+    line_height = sorted(line_heights)[len(line_heights) // 2] if line_heights else MIN_LINE_PX
+
+    # Smallest scale that keeps the median text line legible, never upscaling.
+    legible_scale = min(1.0, MIN_LINE_PX / line_height)
+    low_scale = LOW_DETAIL_PX / max(gray.width, gray.height)
+    if len(line_heights) <= LOW_DETAIL_MAX_LINES and low_scale >= legible_scale:
+        detail, scale = "low", min(1.0, low_scale)
+    else:
+        effective_width, _ = _high_detail_size(gray.width, gray.height)
+        # Anything above the API's own resize is uploaded and then thrown away.
+        detail, scale = "high", min(legible_scale, effective_width / gray.width,
+                                    _tile_budget_scale(gray.width, gray.height, baseline_tokens))
+
+    if scale < 1.0:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, resample=_lanczos_filter())
+
+    return PreparedPage(
+        _encode(gray), detail, gray.width, gray.height,
+        estimate_image_tokens(gray.width, gray.height, detail), baseline_tokens, len(line_heights),
+    )
@@ -0,0 +1,111 @@
+"""Streaming document ingest.
+
+Node hands documents over as a base64 text file. `decode_base64_file` reads it in
+fixed-size blocks, decodes each block straight into a temp file and feeds the
+decoded bytes to MD5 in the same pass, so peak memory does not depend on the
+document size.
+
+The resulting hash is remembered per path. `document_hash` (used by main.py and
+`DocumentHashTool`) returns it without reading the document again, and falls back
+to a chunked read for documents that did not come through ingest.
+"""
+
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Tuple
+
+from jsonlog import get_logger
+
+logger = get_logger("ingest")
+
+READ_BLOCK_SIZE = 1024 * 1024  # multiple of 4, so blocks decode independently
+MAX_BASE64_FILE_SIZE = 100 * 1024 * 1024
+MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+_WHITESPACE = b" \t\r\n\v\f"
+
+_hashes: Dict[str, Tuple[int, int, str]] = {}
+_hashes_lock = threading.Lock()
+
+
+def _remember_hash(path: str, digest: str) -> None:
+    stat = os.stat(path)
+    with _hashes_lock:
+        _hashes[os.path.abspath(path)] = (stat.st_size, stat.st_mtime_ns, digest)
+
+
+def forget_document(path: str) -> None:
+    """Drop the remembered hash of a document, e.g. before deleting its temp file."""
+    with _hashes_lock:
+        _hashes.pop(os.path.abspath(path), None)
+
+
+def document_hash(path: str) -> str:
+    """MD5 of a document, reusing the hash computed at ingest when the file is unchanged."""
+    try:
+        stat = os.stat(path)
+        with _hashes_lock:
+            known = _hashes.get(os.path.abspath(path))
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                md5.update(block)
+        digest = md5.hexdigest()
+        _remember_hash(path, digest)
+        return digest
+    except Exception as e:
+        logger.warning("Failed to generate document hash: %s", e)
+        return ""
+
+
+def decode_base64_file(base64_path: str, suffix: str = '.pdf') -> Tuple[str, str]:
+    """Decode a base64 file into a new temp file. Returns (temp_path, md5 hex digest)."""
+    if not os.path.exists(base64_path):
+        raise FileNotFoundError(f"Base64 file not found: {base64_path}")
+
+    file_size = os.path.getsize(base64_path)
+    if file_size > MAX_BASE64_FILE_SIZE:
+        raise ValueError(f"Base64 file too large: {file_size // 1024 // 1024}MB")
+
+    md5 = hashlib.md5()
+    decoded_size = 0
+    pending = b''
+
+    temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=suffix, delete=False)
+    try:
+        with temp_file, open(base64_path, 'rb') as source:
+            while True:
+                block = source.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                data = pending + block.translate(None, _WHITESPACE)
+                usable = len(data) - len(data) % 4
+                pending = data[usable:]
+                if not usable:
+                    continue
+
+                decoded = base64.b64decode(data[:usable])
+                decoded_size += len(decoded)
+                if decoded_size > MAX_DOCUMENT_SIZE:
+                    raise ValueError(f"File too large: more than {MAX_DOCUMENT_SIZE // 1024 // 1024}MB")
+                temp_file.write(decoded)
+                md5.update(decoded)
+
+            if pending:
+                raise ValueError("Invalid base64 data: truncated input")
+            if decoded_size == 0:
+                raise ValueError("Empty base64 file")
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
+
+    digest = md5.hexdigest()
+    _remember_hash(temp_file.name, digest)
+    logger.info("Decoded %s to %s (%sKB, md5 %s)", base64_path, temp_file.name, decoded_size // 1024, digest)
+    return temp_file.name, digest
@@ -0,0 +1,144 @@
+"""Extraction of the JSON answer from an agent's raw output.
+
+Task outputs are usually a bare JSON object, but some come wrapped in prose,
+markdown code fences or ANSI colour codes, several objects long (tool calls
+before the final answer) or cut off. `extract_json(text)` returns the object
+that best represents the answer:
+
+1. The whole text, when it is one JSON object.
+2. Otherwise the JSON objects found in the text, in one left-to-right pass. A
+   compiled pattern finds each brace that can open an object, and the object is
+   decoded in place with `JSONDecoder.raw_decode`, which skips to its end. When
+   that fails, a second pattern that jumps between braces and whole string
+   literals (so "{doc_type}" or "a } b" inside a value do not throw the nesting
+   off) finds the complete objects nested in it. The object with the most keys
+   wins.
+3. Otherwise, or when the text ends inside an object that never closes
+   (truncated output), the known scalar fields and the `line_items` array are
+   picked out one by one, if that gives more keys than the objects found.
+
+The pass is linear in the text for well-formed output; text is scanned twice
+only inside an object that failed to decode.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+# Inside an object: a whole string literal (escapes included) or a brace.
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]', re.DOTALL)
+# A brace that can open a JSON object: followed by a key or by the closing brace.
+_OBJECT_START = re.compile(r'\{\s*["}]')
+_DECODER = json.JSONDecoder()
+
+FIELD_KEYWORDS = ("document_type", "vendor", "buyer", "company", "compliance_validation", "document_number",
+                  "document_date", "total_amount")
+_STRING_FIELDS = ("document_type", "direction", "document_number", "document_date", "vendor", "vendor_ein", "buyer",
+                  "buyer_ein", "currency", "company_name", "company_ein")
+_NUMBER_FIELDS = ("total_amount", "vat_amount")
+_FIELD_PATTERNS = (
+    [(re.compile(rf'"{key}"\s*:\s*"([^"]+)"', re.IGNORECASE), key, str) for key in _STRING_FIELDS]
+    + [(re.compile(rf'"{key}"\s*:\s*([\d.]+)', re.IGNORECASE), key, float) for key in _NUMBER_FIELDS]
+)
+_LINE_ITEMS = re.compile(r'"line_items"\s*:\s*(?=\[)', re.IGNORECASE)
+_COMPLIANCE_STATUS = re.compile(r'"compliance_status"\s*:\s*"([^"]+)"', re.IGNORECASE)
+
+
+def _spans(text: str, start: int) -> Tuple[List[Tuple[int, int]], int]:
+    """Balanced {...} spans from the brace at `start`, outermost first, and where the outer one ends.
+
+    No spans when the outer brace is never closed: the text was cut off inside it.
+    """
+    spans, stack = [], []
+    for token in _TOKEN.finditer(text, start):
+        char = token.group()
+        if char == "{":
+            stack.append(token.start())
+        elif char == "}" and stack:
+            opened = stack.pop()
+            spans.append((opened, token.end()))
+            if not stack:
+                return sorted(spans), token.end()
+    return [], len(text)
+
+
+def find_objects(text: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """The JSON objects in `text` not nested in another one, in order, and whether the text ends inside one."""
+    found: List[Dict[str, Any]] = []
+    match = _OBJECT_START.search(text)
+    while match:
+        position = match.start()
+        try:
+            value, end = _DECODER.raw_decode(text, position)
+            found.append(value)
+        except json.JSONDecodeError:
+            # Not an object as a whole: the complete objects inside it may still be.
+            spans, end = _spans(text, position)
+            if not spans:
+                return found, True
+            covered = position + 1
+            for opened, closed in spans:
+                if opened < covered:
+                    continue
+                try:
+                    value, stop = _DECODER.raw_decode(text, opened)
+                except json.JSONDecodeError:
+                    continue
+                if stop == closed:
+                    found.append(value)
+                    covered = closed
+        match = _OBJECT_START.search(text, end)
+    return found, False
+
+
+def _fields(text: str) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for pattern, key, convert in _FIELD_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            try:
+                result[key] = convert(match.group(1))
+            except ValueError:
+                result[key] = match.group(1)
+    match = _LINE_ITEMS.search(text)
+    if match:
+        try:
+            result["line_items"] = _DECODER.raw_decode(text, match.end())[0]
+        except json.JSONDecodeError:
+            result["line_items"] = []
+    if "compliance_validation" in text.lower():
+        match = _COMPLIANCE_STATUS.search(text)
+        if match:
+            result["compliance_validation"] = {
+                "compliance_status": match.group(1),
+                "overall_score": 0.0,
+                "validation_rules": {"ro": [], "en": []},
+                "errors": {"ro": [], "en": []},
+                "warnings": {"ro": [], "en": []}
+            }
+    return result
+
+
+def extract_json(text: str) -> Tuple[Dict[str, Any], str]:
+    """The answer object in `text` and how it was found: "direct", "object", "fields" or "none"."""
+    text = _ANSI.sub("", text or "").strip()
+    if not text:
+        return {}, "none"
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value, "direct"
+    except json.JSONDecodeError:
+        pass
+    objects, truncated = find_objects(text)
+    best = max(objects, key=len) if objects else {}
+    if best and not truncated:
+        return best, "object"
+    lowered = text.lower()
+    if any(keyword in lowered for keyword in FIELD_KEYWORDS):
+        # Output cut off inside the answer: its fields beat a smaller object before it.
+        result = _fields(text)
+        if len(result) > len(best):
+            return result, "fields"
+    return (best, "object") if best else ({}, "none")
@@ -0,0 +1,177 @@
+"""Structured stderr logging for the agents.
+
+Every record is one JSON line on stderr with `ts`, `level`, `logger`, `msg` and the
+fields of the enclosing `log_fields` scopes (job, document, phase, attempt...).
+`FINOVA_LOG_FORMAT=text` switches to plain lines for reading by hand.
+
+The default level is INFO (`FINOVA_LOG_LEVEL`). Payload dumps (raw task outputs,
+phase 0 data, extracted documents) are logged at TRACE, below DEBUG, and are only
+formatted when TRACE is enabled.
+
+Each job also has a volume budget (`FINOVA_LOG_BUDGET_KB`, default 64, 0 = off).
+Once a job has written that much, records below WARNING are dropped and a single
+summary line reports how many were suppressed.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+DEFAULT_BUDGET_KB = 64
+
+# Libraries that log every HTTP request or prompt at INFO/DEBUG.
+NOISY_LOGGERS = ("httpx", "httpcore", "openai", "LiteLLM", "litellm", "urllib3", "chromadb", "opentelemetry")
+
+_fields = contextvars.ContextVar("finova_log_fields", default={})
+
+
+class LazyJson:
+    """Defer `json.dumps` of a payload until a record is actually emitted."""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, ensure_ascii=False, default=str)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_fields.get())
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = dict(_fields.get(), **(getattr(record, "fields", None) or {}))
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class BudgetedStreamHandler(logging.StreamHandler):
+    """Stream handler that stops emitting sub-WARNING records once a job's budget is spent."""
+
+    def __init__(self, stream=None, budget_bytes: int = DEFAULT_BUDGET_KB * 1024):
+        super().__init__(stream)
+        self.budget_bytes = budget_bytes
+        self._budget_lock = threading.Lock()
+        self.reset_budget()
+
+    def reset_budget(self) -> None:
+        with self._budget_lock:
+            self.bytes_written = 0
+            self.suppressed = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            exempt = getattr(record, "budget_exempt", False)
+            with self._budget_lock:
+                over_budget = self.budget_bytes and self.bytes_written >= self.budget_bytes
+                if over_budget and record.levelno < logging.WARNING and not exempt:
+                    self.suppressed += 1
+                    return
+            line = self.format(record) + self.terminator
+            with self._budget_lock:
+                self.bytes_written += len(line)
+            self.stream.write(line)
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+_handler: Optional[BudgetedStreamHandler] = None
+
+
+def parse_level(level: Optional[str]) -> int:
+    level = (level or "INFO").strip().upper()
+    if level.isdigit():
+        return int(level)
+    value = logging.getLevelName(level)
+    return value if isinstance(value, int) else logging.INFO
+
+
+def setup_logging(level: Optional[str] = None, stream=None) -> BudgetedStreamHandler:
+    """Route all logging through one budgeted stderr handler. Safe to call again."""
+    global _handler
+    numeric_level = parse_level(level or os.getenv("FINOVA_LOG_LEVEL"))
+    budget_kb = int(os.getenv("FINOVA_LOG_BUDGET_KB", str(DEFAULT_BUDGET_KB)))
+
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    _handler = BudgetedStreamHandler(stream or sys.stderr, budget_kb * 1024)
+    if os.getenv("FINOVA_LOG_FORMAT", "json").lower() == "text":
+        _handler.setFormatter(TextFormatter())
+    else:
+        _handler.setFormatter(JsonLinesFormatter())
+    root.addHandler(_handler)
+    root.setLevel(numeric_level)
+
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(numeric_level if numeric_level <= TRACE else logging.WARNING)
+    return _handler
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"finova.{name}")
+
+
+def trace(logger: logging.Logger, msg: str, *args: Any) -> None:
+    """Log a payload dump at TRACE. Arguments are only formatted when TRACE is enabled."""
+    if logger.isEnabledFor(TRACE):
+        logger.log(TRACE, msg, *args)
+
+
+@contextmanager
+def log_fields(**fields: Any):
+    """Attach fields to every record logged inside the block (per thread/context)."""
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+@contextmanager
+def job_log_scope(**fields: Any):
+    """Start a fresh log budget for one job and report what it suppressed."""
+    if _handler is not None:
+        _handler.reset_budget()
+    with log_fields(**fields):
+        try:
+            yield
+        finally:
+            if _handler is not None and _handler.suppressed:
+                get_logger("log").warning(
+                    "Log budget of %d KB exhausted, %d records suppressed",
+                    _handler.budget_bytes // 1024, _handler.suppressed,
+                    extra={"budget_exempt": True},
+                )
@@ -0,0 +1,298 @@
+"""Persistent, content-addressed cache of LLM responses.
+
+Retries, re-uploads of the same PDF and phase 1 re-runs send identical prompts.
+Responses are stored in a local sqlite file keyed by a SHA-256 of the model, the
+rendered messages, the call parameters, the task name and the hash of the
+document being processed (`document_scope`).
+
+Entries expire after `FINOVA_LLM_CACHE_TTL` seconds (default 7 days). The least
+recently used entries are evicted once the stored responses exceed
+`FINOVA_LLM_CACHE_MAX_MB` (default 256). `FINOVA_LLM_CACHE=0` turns the cache off;
+`FINOVA_LLM_CACHE_PATH` moves the file, which by default lives in the private
+state_dir. The cache is off when that directory is not private to this user.
+
+The crew LLM (`crew.CachedLLM`), the vision OCR calls and the direct retry call in
+main.py all go through it. Hit/miss counters are per process (`stats`).
+
+An unusable answer must not be served again for the whole TTL. main.py collects
+the keys of a document's calls (`recorded_keys`) and `discard`s them when the
+result fails validation or is marked for retry, and retries run inside
+`refresh_scope()`, where calls skip the cache read and their fresh responses
+replace the stored ones.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import openai_client
+import state_dir
+import usage
+from jsonlog import get_logger
+
+logger = get_logger("llm_cache")
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_MB = 256
+# After a size eviction, shrink to this fraction of the cap so we do not evict on every put.
+EVICT_TO_FRACTION = 0.9
+
+_document_hash = contextvars.ContextVar("finova_llm_cache_document", default="")
+_refresh = contextvars.ContextVar("finova_llm_cache_refresh", default=False)
+_recorders = contextvars.ContextVar("finova_llm_cache_recorders", default=())
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    task TEXT NOT NULL,
+    document_hash TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at);
+"""
+
+
+@contextmanager
+def document_scope(document_hash: str):
+    """Key every LLM call made inside the block by this document's hash."""
+    token = _document_hash.set(document_hash or "")
+    try:
+        yield
+    finally:
+        _document_hash.reset(token)
+
+
+@contextmanager
+def refresh_scope(refresh: bool = True):
+    """Inside the block, LLM calls are not answered from the cache; their responses replace the stored ones."""
+    token = _refresh.set(bool(refresh) or _refresh.get())
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+
+@contextmanager
+def recorded_keys():
+    """Collect the cache keys of the LLM calls made inside the block, for `discard`."""
+    keys: List[str] = []
+    token = _recorders.set(_recorders.get() + (keys,))
+    try:
+        yield keys
+    finally:
+        _recorders.reset(token)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class LLMResponseCache:
+    def __init__(self, path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite connections must not cross a fork, so pooled workers open their own.
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def make_key(self, model: str, messages: Any, task: str = "", params: Optional[Dict[str, Any]] = None) -> str:
+        material = _canonical({
+            "model": model,
+            "messages": messages,
+            "params": params or {},
+            "task": task,
+            "document": _document_hash.get(),
+        })
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    db.execute("UPDATE responses SET last_used_at = ?, hits = hits + 1 WHERE key = ?", (now, key))
+                    self.hits += 1
+                    return row[0]
+                if row:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.evictions += 1
+                self.misses += 1
+                return None
+        except sqlite3.Error as e:
+            logger.warning("LLM cache read failed: %s", e)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str, model: str, task: str = "") -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, task, document_hash, response, size, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, task, _document_hash.get(), response, size, now, now),
+                )
+                self.writes += 1
+                self._evict(db, now)
+        except sqlite3.Error as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        try:
+            with self._lock:
+                deleted = self._db().executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys]).rowcount
+        except sqlite3.Error as e:
+            logger.warning("LLM cache delete failed: %s", e)
+            return 0
+        self.discarded += max(deleted, 0)
+        return max(deleted, 0)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        expired = db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        self.evictions += max(expired, 0)
+
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO_FRACTION
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used_at").fetchall():
+            if total <= target:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "discarded": self.discarded,
+        }
+        try:
+            with self._lock:
+                entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            stats.update(entries=entries, size_mb=round(size / 1024 / 1024, 2))
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_initialised = False
+
+
+def get_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache, or None when `FINOVA_LLM_CACHE=0`."""
+    global _cache, _cache_initialised
+    if not _cache_initialised:
+        _cache_initialised = True
+        if os.getenv("FINOVA_LLM_CACHE", "1").lower() not in ("0", "false", "no", "off"):
+            configured = os.getenv("FINOVA_LLM_CACHE_PATH")
+            try:
+                path = state_dir.private_file(configured) if configured else state_dir.path("llm_cache.sqlite")
+            except OSError as e:
+                logger.warning("LLM cache disabled: %s", e)
+                return None
+            ttl = int(os.getenv("FINOVA_LLM_CACHE_TTL", str(DEFAULT_TTL_SECONDS)))
+            max_mb = float(os.getenv("FINOVA_LLM_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+            _cache = LLMResponseCache(path, ttl, int(max_mb * 1024 * 1024))
+    return _cache
+
+
+def stats() -> Dict[str, Any]:
+    cache = get_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+def discard(keys: Iterable[str]) -> int:
+    """Delete the cached responses stored under `keys` (answers that turned out unusable)."""
+    cache = get_cache()
+    deleted = cache.delete(keys) if cache else 0
+    if deleted:
+        logger.info("Discarded %d cached LLM responses of an unusable result", deleted)
+    return deleted
+
+
+def cached_call(model: str, messages: Any, task: str, call: Callable[[], Optional[str]],
+                params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Return the cached response for this prompt, or run `call` and store its text."""
+    cache = get_cache()
+    if cache is None:
+        usage.check_budget(task)
+        return call()
+
+    key = cache.make_key(model, messages, task, params)
+    for keys in _recorders.get():
+        keys.append(key)
+    if _refresh.get():
+        cache.refreshes += 1
+        cached = None
+    else:
+        cached = cache.get(key)
+    if cached is not None:
+        logger.debug("LLM cache hit for %s (%s)", task, model)
+        usage.record(task, model, cache_hit=True)
+        return cached
+
+    usage.check_budget(task)
+    response = call()
+    if isinstance(response, str) and response.strip():
+        cache.put(key, response, model, task)
+    return response
+
+
+def cached_chat_completion(task: str, **request: Any) -> Optional[str]:
+    """`openai_client.chat_completion(**request)` through the cache; returns the message text."""
+    messages = request.get("messages")
+    params = {name: value for name, value in request.items() if name not in ("messages", "model", "timeout")}
+
+    def call() -> Optional[str]:
+        started = time.perf_counter()
+        response = openai_client.chat_completion(**request)
+        usage.record_response(task, request.get("model", ""), response, (time.perf_counter() - started) * 1000)
+        return response.choices[0].message.content
+
+    return cached_call(request.get("model", ""), messages, task, call, params)
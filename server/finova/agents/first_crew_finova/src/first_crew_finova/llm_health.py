@@ -0,0 +1,152 @@
+"""Cached health state of the OpenAI API key.
+
+Instead of spending a test completion before every document, the outcome of real
+LLM calls marks the key healthy or unhealthy for a TTL. A key that is known to be
+rejected fails the next document immediately, without a network round trip.
+
+One-shot CLI runs share the state through a small JSON file in the private
+state_dir, so another local user cannot mark the key rejected; long-lived workers
+keep it in memory only. The key itself is never stored, only a
+SHA-256 fingerprint of it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from jsonlog import get_logger
+import state_dir
+
+logger = get_logger("llm_health")
+
+DEFAULT_TTL_SECONDS = 900
+
+AUTH_ERROR_MARKERS = ("authentication", "api key", "api_key", "unauthorized", "invalid_api_key", "incorrect api key")
+
+
+def key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def is_auth_error(error: BaseException) -> bool:
+    """True when an exception means the API key itself was rejected."""
+    status_code = getattr(error, "status_code", None)
+    if status_code == 401:
+        return True
+    message = str(error).lower()
+    if status_code == 429 or "rate limit" in message or "ratelimit" in type(error).__name__.lower():
+        return False
+    if "authentication" in type(error).__name__.lower():
+        return True
+    return any(marker in message for marker in AUTH_ERROR_MARKERS)
+
+
+class LLMHealth:
+    """TTL-bound healthy/unhealthy state per API key fingerprint."""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, state_file: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.state_file = state_file
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                states = json.load(f)
+            if isinstance(states, dict):
+                self._states = states
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable LLM health file: %s", e)
+
+    def _save(self) -> None:
+        if not self.state_file:
+            return
+        try:
+            temp_path = f"{self.state_file}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._states, f)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            logger.warning("Could not persist LLM health state: %s", e)
+
+    def get(self, api_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached state for this key, or None when unknown or expired."""
+        with self._lock:
+            state = self._states.get(key_fingerprint(api_key))
+        if not state or time.time() - state.get("checked_at", 0) > self.ttl_seconds:
+            return None
+        return state
+
+    def is_known_bad(self, api_key: str) -> bool:
+        state = self.get(api_key)
+        return bool(state and not state.get("healthy"))
+
+    def mark_healthy(self, api_key: str) -> None:
+        fingerprint = key_fingerprint(api_key)
+        with self._lock:
+            previous = self._states.get(fingerprint)
+            # Only touch the disk when the state flips or is halfway to expiring.
+            if previous and previous.get("healthy") and time.time() - previous.get("checked_at", 0) < self.ttl_seconds / 2:
+                return
+            self._states[fingerprint] = {"healthy": True, "checked_at": time.time()}
+            self._save()
+
+    def mark_unhealthy(self, api_key: str, details: str) -> None:
+        with self._lock:
+            self._states[key_fingerprint(api_key)] = {
+                "healthy": False,
+                "checked_at": time.time(),
+                "details": details[:500],
+            }
+            self._save()
+        logger.error("OpenAI API key marked unhealthy")
+
+    def record_failure(self, api_key: Optional[str], error: BaseException) -> bool:
+        """Record a failed LLM call. Returns True when it was an authentication failure."""
+        if not is_auth_error(error):
+            return False
+        if api_key:
+            self.mark_unhealthy(api_key, str(error))
+        return True
+
+
+_health: Optional[LLMHealth] = None
+
+
+def get_llm_health() -> LLMHealth:
+    """Process-wide health state, persisted to disk unless `use_memory_only` was called."""
+    global _health
+    if _health is None:
+        ttl = int(os.getenv("FINOVA_LLM_HEALTH_TTL", str(DEFAULT_TTL_SECONDS)))
+        configured = os.getenv("FINOVA_LLM_HEALTH_FILE")
+        try:
+            state_file = state_dir.private_file(configured) if configured else state_dir.path("llm_health.json")
+        except OSError as e:
+            logger.warning("Keeping the LLM health state in memory: %s", e)
+            state_file = None
+        _health = LLMHealth(ttl, state_file)
+    return _health
+
+
+def use_memory_only() -> None:
+    """Keep the health state in memory (long-lived workers)."""
+    global _health
+    ttl = int(os.getenv("FINOVA_LLM_HEALTH_TTL", str(DEFAULT_TTL_SECONDS)))
+    _health = LLMHealth(ttl, None)
+
+
+def record_llm_success() -> None:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        get_llm_health().mark_healthy(api_key)
+
+
+def record_llm_failure(error: BaseException) -> bool:
+    return get_llm_health().record_failure(os.getenv("OPENAI_API_KEY"), error)
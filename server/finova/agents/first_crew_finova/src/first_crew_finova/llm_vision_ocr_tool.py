@@ -1,30 +1,35 @@
 import os
 import tempfile
-import logging
 import base64
-from typing import Type, Optional, Any
+import importlib.util
+import time
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Type, Optional, Any, Dict, Iterable, List
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
+import image_prep
+import llm_cache
+import local_ocr
+import pdf_pages
+import rasterize
+import text_cache
+from jsonlog import get_logger
+from llm_health import record_llm_failure, record_llm_success
 
-try:
-    from pdf2image import convert_from_path
-    from PIL import Image
-    import io
-    PDF_TO_IMAGE_AVAILABLE = True
-except ImportError:
-    PDF_TO_IMAGE_AVAILABLE = False
+logger = get_logger("vision_ocr")
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# PyPDF2, pdf2image/PIL and openai are imported on first use, so building the tool
+# (once per agent) does not pay for them.
+PYPDF2_AVAILABLE = importlib.util.find_spec("PyPDF2") is not None
+PDF_TO_IMAGE_AVAILABLE = importlib.util.find_spec("pdf2image") is not None and importlib.util.find_spec("PIL") is not None
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+# Pages sent to the vision model at once, and extra attempts per failed page.
+OCR_CONCURRENCY = int(os.getenv("FINOVA_OCR_CONCURRENCY", "4"))
+OCR_PAGE_RETRIES = int(os.getenv("FINOVA_OCR_PAGE_RETRIES", "2"))
+OCR_RETRY_BACKOFF_SECONDS = 1.0
 
 class FileReadInput(BaseModel):
     file_path: str = Field(..., description="Path to the file to read")
@@ -33,21 +38,18 @@ class LLMVisionTextExtractorTool(BaseTool):
     name: str = "llm_vision_text_extractor"
     description: str = "Advanced text extraction using LLM vision capabilities for Romanian documents"
     args_schema: Type[BaseModel] = FileReadInput
-    client: Optional[Any] = Field(None, description="OpenAI client instance")
     llm_available: bool = Field(False, description="Whether LLM is available")
     
     def __init__(self):
         super().__init__()
         api_key = os.getenv('OPENAI_API_KEY')
         if OPENAI_AVAILABLE and api_key:
-            self.client = openai.OpenAI(api_key=api_key)
             self.llm_available = True
-            logging.info("LLM Vision OCR initialized with OpenAI")
+            logger.debug("LLM Vision OCR initialized with OpenAI")
         else:
-            self.client = None
             self.llm_available = False
-            logging.warning("LLM Vision OCR not available - falling back to simple text extraction")
-    
+            logger.warning("LLM Vision OCR not available - falling back to simple text extraction")
+
     def _run(self, file_path: str) -> str:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -55,37 +57,56 @@ class LLMVisionTextExtractorTool(BaseTool):
         if file_path.endswith(".pdf"):
             return self._extract_from_pdf(file_path)
         elif file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.bmp')):
-            if self.llm_available:
-                return self._extract_from_image(file_path)
+            if self.llm_available or local_ocr.is_available():
+                return text_cache.get_or_extract(file_path, "ocr", lambda: self._extract_from_image(file_path))
             else:
                 return "Image file detected but LLM vision not available"
         else:
             return self._extract_from_text_file(file_path)
     
     def _extract_from_pdf(self, file_path: str) -> str:
-        logging.info(f"Starting PDF text extraction for: {file_path}")
-        
+        logger.info("Starting PDF text extraction for: %s", file_path)
+        try:
+            text = text_cache.get_or_extract(file_path, "pdf", lambda: self._extract_pdf_pages(file_path))
+        except Exception as e:
+            logger.error("OCR failed: %s", e)
+            return self._extract_direct_text_fallback(file_path)
+        return text or "No text could be extracted from this document using LLM Vision."
+    
+    def _extract_pdf_pages(self, file_path: str) -> str:
+        """Use each page's text layer where it is usable and OCR only the image-only pages"""
+        pages = None
         if PYPDF2_AVAILABLE:
             try:
-                direct_text = self._extract_direct_text(file_path)
-                if len(direct_text.strip()) > 100:
-                    logging.info("Direct text extraction successful")
-                    return direct_text
+                pages = pdf_pages.classify_pages(file_path)
             except Exception as e:
-                logging.info(f"Direct text extraction failed: {str(e)}")
+                logger.info("Direct text extraction failed: %s", e)
         
-        if self.llm_available and PDF_TO_IMAGE_AVAILABLE:
-            try:
-                return self._extract_with_llm_vision(file_path)
-            except Exception as e:
-                logging.error(f"LLM Vision OCR failed: {str(e)}")
-                return self._extract_direct_text_fallback(file_path)
+        if pages is not None and all(page.has_text_layer for page in pages):
+            logger.info("Direct text extraction successful")
+            local_ocr.record("documents.pypdf2")
+            local_ocr.record("pages.text_layer", len(pages))
+            return pdf_pages.merge_pages(pages, {})
+        
+        if not (PDF_TO_IMAGE_AVAILABLE and (self.llm_available or local_ocr.is_available())):
+            logger.warning("LLM Vision not available, using basic PDF extraction")
+            # Raises when there is no text layer, so _extract_from_pdf answers with its
+            # fallback message and the failure is not cached as the document's text.
+            return self._extract_direct_text(file_path)
+        
+        if pages is None:
+            ocr_texts = self.ocr_pdf_pages(file_path)
+            pages = [pdf_pages.PageText(number, "", False) for number in sorted(ocr_texts)]
         else:
-            logging.warning("LLM Vision not available, using basic PDF extraction")
-            return self._extract_direct_text_fallback(file_path)
+            text_layer = "\n".join(page.text for page in pages if page.has_text_layer)
+            image_only = [page.number for page in pages if not page.has_text_layer]
+            local_ocr.record("pages.text_layer", len(pages) - len(image_only))
+            ocr_texts = self.ocr_pdf_pages(file_path, image_only, text_layer)
+        return pdf_pages.merge_pages(pages, ocr_texts)
     
     def _extract_direct_text(self, file_path: str) -> str:
         """Extract text directly from PDF if it contains selectable text"""
+        import PyPDF2
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             text = ""
@@ -100,85 +121,183 @@ class LLMVisionTextExtractorTool(BaseTool):
         try:
             return self._extract_direct_text(file_path)
         except Exception as e:
-            logging.error(f"PDF text extraction failed: {str(e)}")
+            logger.error("PDF text extraction failed: %s", e)
             return "Could not extract text from PDF. This may be an image-based PDF that requires OCR."
     
-    def _extract_with_llm_vision(self, file_path: str) -> str:
-        """Extract text using LLM vision capabilities"""
-        logging.info("Starting LLM Vision OCR extraction")
-        
-        images = convert_from_path(file_path, dpi=200, fmt='PNG')
-        logging.info(f"Converted PDF to {len(images)} images")
+    def ocr_pdf_pages(self, file_path: str, page_numbers: Optional[List[int]] = None,
+                      context_text: str = "") -> Dict[int, str]:
+        """OCR the given pages (default: all) of a PDF; returns their texts by page number.
+
+        `context_text` is the rest of the document (text-layer pages) and counts
+        towards the key fields that decide whether local OCR text is kept.
+        """
+        logger.info("Starting OCR extraction of %s pages", len(page_numbers) if page_numbers is not None else "all")
         
-        all_text = ""
-        for i, image in enumerate(images):
-            logging.info(f"Processing page {i + 1}/{len(images)} with LLM Vision")
-            page_text = self._extract_text_from_image_with_llm(image, i + 1)
-            if page_text.strip():
-                all_text += f"=== PAGE {i + 1} ===\n{page_text}\n\n"
+        # Pages are rendered (and read by tesseract) a window at a time in a process pool
+        # and handled as they arrive.
+        pages = rasterize.iter_page_images(file_path, use_local_ocr=local_ocr.is_available(), pages=page_numbers)
+        return self._ocr_pages(pages, context_text)
+    
+    def _ocr_pages(self, pages: Iterable[rasterize.RenderedPage], context_text: str = "") -> Dict[int, str]:
+        """Turn rendered pages into texts, by page number, as the pages arrive.
+
+        A page the local OCR read confidently keeps that text. Every other page goes
+        to LLM vision, as do the locally read pages when the document text as a whole
+        lacks the key fields. At most OCR_CONCURRENCY vision requests run at once and
+        twice that many pages wait in memory. Failed pages are retried on their own;
+        a page that still fails yields an [OCR_ERROR] marker so the other pages are
+        still returned. Blank pages are not sent.
+        """
+        started = time.time()
+        workers = max(1, OCR_CONCURRENCY)
+        futures = {}
+        local_pages: Dict[int, rasterize.RenderedPage] = {}
+        numbers = []
+        blank = 0
+        report = {"pages": 0, "low_detail": 0, "bytes": 0, "estimated_tokens": 0, "baseline_tokens": 0}
         
-        if not all_text.strip():
-            return "No text could be extracted from this document using LLM Vision."
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vision-ocr") as executor:
+            def send(page: rasterize.RenderedPage) -> None:
+                self._report_page(report, page.number, page.prepared)
+                in_flight = [future for future in futures.values() if not future.done()]
+                if len(in_flight) >= workers * 2:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                # Each page runs in a copy of this context, so log fields and the LLM cache's
+                # document scope carry over into the worker threads.
+                futures[page.number] = executor.submit(
+                    contextvars.copy_context().run, self._ocr_page_with_retries, page.prepared, page.number)
+            
+            for page in pages:
+                numbers.append(page.number)
+                if page.prepared.blank:
+                    blank += 1
+                    logger.debug("Page %d is blank, not sending it", page.number)
+                elif local_ocr.is_confident(page.local_ocr) or (page.local_ocr and not self.llm_available):
+                    logger.debug("Page %d read locally (confidence %.0f, %d words)",
+                                 page.number, page.local_ocr.confidence, page.local_ocr.words)
+                    local_pages[page.number] = page
+                else:
+                    if page.local_ocr is not None:
+                        local_ocr.record("escalated.low_confidence")
+                        logger.debug("Page %d escalated to LLM vision: local OCR confidence %.0f, %d words",
+                                     page.number, page.local_ocr.confidence, page.local_ocr.words)
+                    send(page)
+            
+            if local_pages and self.llm_available:
+                document_text = "\n".join(
+                    [context_text] + [page.local_ocr.text for page in local_pages.values()] +
+                    [future.result() for future in futures.values()])
+                if not local_ocr.has_key_fields(document_text):
+                    logger.info("Local OCR text has %d of the key fields, sending %d locally read pages to LLM vision",
+                                local_ocr.count_key_fields(document_text), len(local_pages))
+                    local_ocr.record("escalated.missing_key_fields", len(local_pages))
+                    for page in local_pages.values():
+                        send(page)
+                    local_pages = {}
+            
+            page_texts = {}
+            for page_num in numbers:
+                if page_num in futures:
+                    page_texts[page_num] = futures[page_num].result()
+                elif page_num in local_pages:
+                    page_texts[page_num] = local_pages[page_num].local_ocr.text
+                else:
+                    page_texts[page_num] = ""
         
-        return all_text
+        self._record_tiers(len(local_pages), len(futures), blank, bool(context_text))
+        failed = sum(1 for text in page_texts.values() if text.startswith("[OCR_ERROR"))
+        logger.info("OCR of %d pages took %.1fs: %d local, %d LLM vision with %d workers (%d failed), %d blank",
+                    len(numbers), time.time() - started, len(local_pages), len(futures), workers, failed, blank)
+        if futures:
+            logger.info("Vision upload: %d pages (%d low detail), %.0f KB, ~%d image tokens (~%d before preprocessing)",
+                        report["pages"], report["low_detail"], report["bytes"] / 1024,
+                        report["estimated_tokens"], report["baseline_tokens"], extra={"fields": {"vision_upload": report}})
+        return page_texts
+    
+    def _record_tiers(self, local_pages: int, vision_pages: int, blank_pages: int, text_layer: bool) -> None:
+        if text_layer or (local_pages and vision_pages):
+            local_ocr.record("documents.mixed")
+        elif local_pages:
+            local_ocr.record("documents.local_ocr")
+        elif vision_pages:
+            local_ocr.record("documents.llm_vision")
+        local_ocr.record("pages.local_ocr", local_pages)
+        local_ocr.record("pages.llm_vision", vision_pages)
+        local_ocr.record("pages.blank", blank_pages)
+    
+    def _report_page(self, report: dict, page_num: int, page: image_prep.PreparedPage) -> None:
+        report["pages"] += 1
+        report["low_detail"] += page.detail == "low"
+        report["bytes"] += len(page.jpeg)
+        report["estimated_tokens"] += page.estimated_tokens
+        report["baseline_tokens"] += page.baseline_tokens
+        logger.debug("Page %d prepared: %dx%d detail=%s, %.0f KB, ~%d tokens (was ~%d), %d text lines",
+                     page_num, page.width, page.height, page.detail, len(page.jpeg) / 1024,
+                     page.estimated_tokens, page.baseline_tokens, page.text_lines)
+    
+    def _ocr_page_with_retries(self, page: image_prep.PreparedPage, page_num: int) -> str:
+        for attempt in range(OCR_PAGE_RETRIES + 1):
+            try:
+                return self._ocr_page(page, page_num)
+            except Exception as e:
+                auth_error = record_llm_failure(e)
+                if auth_error or attempt == OCR_PAGE_RETRIES:
+                    logger.error("LLM Vision OCR failed for page %d: %s", page_num, e)
+                    return f"[OCR_ERROR: Failed to extract text from page {page_num} - {str(e)}]"
+                logger.warning("LLM Vision OCR attempt %d failed for page %d, retrying: %s", attempt + 1, page_num, e)
+                time.sleep(OCR_RETRY_BACKOFF_SECONDS * (attempt + 1))
     
     def _extract_from_image(self, file_path: str) -> str:
-        """Extract text from image file using LLM vision"""
+        """Extract text from an image file with local OCR, escalating to LLM vision"""
+        from PIL import Image
         with Image.open(file_path) as image:
-            return self._extract_text_from_image_with_llm(image, 1)
+            page = rasterize.render_page(image, 1, local_ocr.is_available())
+        return self._ocr_pages([page])[1]
     
-    def _extract_text_from_image_with_llm(self, image: Image.Image, page_num: int) -> str:
-        """Use LLM vision to extract text from image"""
-        if not self.llm_available or not self.client:
+    def _ocr_page(self, page: image_prep.PreparedPage, page_num: int) -> str:
+        """Send one prepared page to the vision model. Raises on failure."""
+        if not self.llm_available:
             return f"[LLM_VISION_UNAVAILABLE: Page {page_num}]"
         
-        try:
-            buffer = io.BytesIO()
-            if image.mode in ('RGBA', 'LA', 'P'):
-                image = image.convert('RGB')
-            image.save(buffer, format='JPEG', quality=85)
-            base64_image = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            prompt = """You are an expert OCR system specialized in Romanian financial documents. 
-            Please extract ALL text from this image with high accuracy. Pay special attention to:
-            
-            - Romanian diacritics (ă, â, î, ș, ț)
-            - Numbers, dates, and currency amounts
-            - Company names and CUI/EIN numbers
-            - Table structures and line items
-            - Preserve the original formatting and layout as much as possible
-            
-            Return ONLY the extracted text, maintaining the document structure.
-            If you cannot read certain parts clearly, indicate with [UNCLEAR] but try your best to extract everything visible."""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
-                                    "detail": "high"
-                                }
+        base64_image = base64.b64encode(page.jpeg).decode('utf-8')
+        
+        prompt = """You are an expert OCR system specialized in Romanian financial documents. 
+        Please extract ALL text from this image with high accuracy. Pay special attention to:
+        
+        - Romanian diacritics (ă, â, î, ș, ț)
+        - Numbers, dates, and currency amounts
+        - Company names and CUI/EIN numbers
+        - Table structures and line items
+        - Preserve the original formatting and layout as much as possible
+        
+        Return ONLY the extracted text, maintaining the document structure.
+        If you cannot read certain parts clearly, indicate with [UNCLEAR] but try your best to extract everything visible."""
+        
+        extracted_text = llm_cache.cached_chat_completion(
+            "vision_ocr",
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{base64_image}",
+                                "detail": page.detail
                             }
-                        ]
-                    }
-                ],
-                max_tokens=4000,
-                temperature=0.1
-            )
-            
-            extracted_text = response.choices[0].message.content
-            logging.info(f"Successfully extracted text from page {page_num} using LLM Vision")
-            return extracted_text
-            
-        except Exception as e:
-            logging.error(f"LLM Vision OCR failed for page {page_num}: {str(e)}")
-            return f"[OCR_ERROR: Failed to extract text from page {page_num} - {str(e)}]"
+                        }
+                    ]
+                }
+            ],
+            max_tokens=4000,
+            temperature=0.1
+        )
+        
+        record_llm_success()
+        logger.debug("Successfully extracted text from page %d using LLM Vision", page_num)
+        return extracted_text or ""
     
     def _extract_from_text_file(self, file_path: str) -> str:
         """Extract text from plain text files"""
@@ -0,0 +1,150 @@
+"""Local CPU OCR tier (tesseract) between PyPDF2 and GPT-4o vision.
+
+Image-only pages are first read by the `tesseract` binary (`FINOVA_TESSERACT_LANG`,
+default "ron+eng", limited to the installed language packs). This runs in the
+render processes, on the full resolution grayscale page. A page is sent to LLM
+vision when:
+
+- its mean word confidence is below `FINOVA_LOCAL_OCR_MIN_CONFIDENCE` (default 80),
+  or it has fewer than `MIN_WORDS` words; or
+- the locally read text of the whole document has fewer than
+  `FINOVA_LOCAL_OCR_MIN_FIELDS` (default 2) of the key fields: CUI, a total and a
+  date (`count_key_fields`).
+
+`FINOVA_LOCAL_OCR=0` turns the tier off. Without the tesseract binary it is
+skipped. `tier_stats()` reports per process which tier served each document and
+page, and why pages were escalated, so the thresholds can be tuned.
+
+Imported by the render processes, so it only depends on the standard library and PIL.
+"""
+
+import io
+import os
+import re
+import shutil
+import subprocess
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from jsonlog import get_logger
+
+logger = get_logger("local_ocr")
+
+ENABLED = os.getenv("FINOVA_LOCAL_OCR", "1").lower() not in ("0", "false", "no", "off")
+LANGUAGES = os.getenv("FINOVA_TESSERACT_LANG", "ron+eng")
+MIN_CONFIDENCE = float(os.getenv("FINOVA_LOCAL_OCR_MIN_CONFIDENCE", "80"))
+MIN_KEY_FIELDS = int(os.getenv("FINOVA_LOCAL_OCR_MIN_FIELDS", "2"))
+MIN_WORDS = 5
+TIMEOUT_SECONDS = 60
+
+KEY_FIELD_PATTERNS = {
+    "cui": re.compile(r"\b(?:CUI|CIF|C\.I\.F\.|cod fiscal|cod de TVA|RO)\s*[:.]?\s*(?:RO\s*)?\d{2,10}\b", re.IGNORECASE),
+    "total": re.compile(r"\btotal\w*\b[^\n\d]{0,40}\d[\d.,]*", re.IGNORECASE),
+    "date": re.compile(r"\b\d{1,2}[./-]\d{1,2}[./-](?:\d{4}|\d{2})\b"),
+}
+
+_languages: Optional[str] = None
+_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+
+
+class LocalOcrResult(NamedTuple):
+    text: str
+    confidence: float
+    words: int
+
+
+def is_available() -> bool:
+    return ENABLED and shutil.which("tesseract") is not None
+
+
+def _installed_languages() -> str:
+    """The requested languages that are installed, falling back to tesseract's default."""
+    global _languages
+    if _languages is None:
+        try:
+            listed = subprocess.run(["tesseract", "--list-langs"], capture_output=True, text=True, timeout=10).stdout
+            installed = set(listed.split())
+        except (OSError, subprocess.SubprocessError):
+            installed = set()
+        wanted = [language for language in LANGUAGES.split("+") if language in installed]
+        if "ron" not in wanted:
+            logger.warning("Tesseract Romanian language pack not installed; diacritics will be read poorly")
+        _languages = "+".join(wanted) or "eng"
+    return _languages
+
+
+def _parse_tsv(tsv: str) -> LocalOcrResult:
+    """Rebuild the page text from tesseract's TSV output and average its word confidences."""
+    lines: Dict[tuple, List[str]] = {}
+    confidences = []
+    for row in tsv.splitlines()[1:]:
+        columns = row.split("\t")
+        if len(columns) < 12 or not columns[11].strip():
+            continue
+        confidence = float(columns[10])
+        if confidence < 0:
+            continue
+        block, paragraph, line = columns[2], columns[3], columns[4]
+        lines.setdefault((int(block), int(paragraph), int(line)), []).append(columns[11])
+        confidences.append(confidence)
+
+    text_lines, previous_block = [], None
+    for (block, _, _), words in sorted(lines.items()):
+        if previous_block is not None and block != previous_block:
+            text_lines.append("")
+        text_lines.append(" ".join(words))
+        previous_block = block
+    mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return LocalOcrResult("\n".join(text_lines), round(mean_confidence, 1), len(confidences))
+
+
+def recognize(image) -> Optional[LocalOcrResult]:
+    """OCR one page image with tesseract. Returns None when tesseract fails."""
+    buffer = io.BytesIO()
+    image.convert("L").save(buffer, format="PNG")
+    # Pages are already OCR'd in parallel processes; tesseract's own OpenMP threads
+    # would only oversubscribe the CPUs.
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    try:
+        completed = subprocess.run(
+            ["tesseract", "stdin", "stdout", "-l", _installed_languages(), "--psm", "3", "tsv"],
+            input=buffer.getvalue(), capture_output=True, timeout=TIMEOUT_SECONDS, env=env,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning("Tesseract failed: %s", e)
+        return None
+    if completed.returncode != 0:
+        logger.warning("Tesseract exited with %d: %s", completed.returncode,
+                       completed.stderr.decode("utf-8", "replace").strip()[:200])
+        return None
+    return _parse_tsv(completed.stdout.decode("utf-8", "replace"))
+
+
+def is_confident(result: Optional[LocalOcrResult]) -> bool:
+    return result is not None and result.words >= MIN_WORDS and result.confidence >= MIN_CONFIDENCE
+
+
+def count_key_fields(text: str) -> int:
+    """How many of the key invoice fields (CUI, total, date) appear in the text."""
+    return sum(1 for pattern in KEY_FIELD_PATTERNS.values() if pattern.search(text))
+
+
+def has_key_fields(text: str) -> bool:
+    return count_key_fields(text) >= MIN_KEY_FIELDS
+
+
+def record(name: str, count: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += count
+
+
+def tier_stats() -> Dict[str, int]:
+    """Per-process counters: `documents.<tier>`, `pages.<tier>` and `escalated.<reason>`.
+
+    Tiers are pypdf2/text_layer, local_ocr and llm_vision; a document served by more
+    than one tier counts as `documents.mixed`.
+    """
+    with _stats_lock:
+        return dict(sorted(_stats.items()))
@@ -0,0 +1,237 @@
+"""Shared OpenAI clients and a request/token rate limiter for every LLM call.
+
+Clients used to be created per tool instance and per call, each with its own
+connection pool, and nothing knew about the account's rate limits. Parallel
+OCR pages and parallel jobs then ran into bursts of 429s.
+
+- `get_client()` / `get_async_client()` return one pooled `OpenAI` / `AsyncOpenAI`
+  client per process (and per event loop for the async one).
+- `chat_completion(**request)` / `achat_completion(**request)` wait for the limiter,
+  make the call and settle the token estimate against the reported usage.
+- The limiter is two token buckets, requests and tokens per minute
+  (`FINOVA_OPENAI_RPM`, default 500; `FINOVA_OPENAI_TPM`, default 150000; 0 turns a
+  bucket off). Set them to the account's limits. The buckets live in shared memory
+  created at import, so the forked workers of `serve --workers N` and
+  `batch --concurrency N` draw from the same budget.
+
+A request reserves its estimated tokens up front: prompt characters / 4, a flat
+cost per image and the full `max_tokens`, which is how OpenAI counts requests
+against the TPM limit. When the budget is short, the caller sleeps until the
+bucket refills instead of sending the request. A 429 that survives the SDK's own
+retries drains the buckets for the Retry-After period, so the other threads and
+workers back off too.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from jsonlog import get_logger
+
+logger = get_logger("openai_client")
+
+DEFAULT_RPM = 500
+DEFAULT_TPM = 150000
+# Buckets hold this many seconds of budget, so a burst cannot spend a whole minute at once.
+BURST_SECONDS = 10
+DEFAULT_RETRY_AFTER_SECONDS = 20
+CHARS_PER_TOKEN = 4
+LOW_DETAIL_IMAGE_TOKENS = 85
+# A letter/A4 page at detail=high is 6 tiles after the API's resize.
+HIGH_DETAIL_IMAGE_TOKENS = 1105
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class TokenBucket:
+    """Refilling budget shared by every process forked after it was created."""
+
+    def __init__(self, per_minute: float, context, lock):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        # [available budget, monotonic time of the last update]
+        self._state = context.RawArray('d', [self.capacity, time.monotonic()])
+        self._lock = lock
+
+    def _refill(self, now: float) -> None:
+        self._state[0] = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+        self._state[1] = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` from the bucket, going into debt if needed; returns the seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._state[0] -= amount
+            level = self._state[0]
+        return 0.0 if level >= 0 else -level / self.rate
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._state[0] = min(self.capacity, self._state[0] + amount)
+
+    def drain(self, seconds: float) -> None:
+        """Leave the bucket empty for `seconds`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._state[0] = min(self._state[0], -seconds * self.rate)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float, tpm: float):
+        # fork, so the shared memory and lock are inherited by pre-forked workers.
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else None)
+        lock = context.Lock()
+        self.requests = TokenBucket(rpm, context, lock) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, context, lock) if tpm > 0 else None
+        self.waited_seconds = 0.0
+        self.rate_limited = 0
+
+    def _reserve(self, tokens: int) -> float:
+        wait_seconds = 0.0
+        if self.requests:
+            wait_seconds = max(wait_seconds, self.requests.reserve(1))
+        if self.tokens:
+            wait_seconds = max(wait_seconds, self.tokens.reserve(tokens))
+        if wait_seconds > 0:
+            self.waited_seconds += wait_seconds
+            logger.debug("Rate limiter: waiting %.1fs for %d tokens", wait_seconds, tokens)
+        return wait_seconds
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of `tokens` estimated tokens fits the budget."""
+        wait_seconds = self._reserve(tokens)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self, tokens: int) -> None:
+        wait_seconds = self._reserve(tokens)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Give back the part of the estimate the request did not use."""
+        if self.tokens and actual is not None and actual < estimated:
+            self.tokens.refund(estimated - actual)
+
+    def penalize(self, retry_after: Optional[float]) -> None:
+        """A 429 got through: pause every caller for the Retry-After period."""
+        self.rate_limited += 1
+        seconds = retry_after or DEFAULT_RETRY_AFTER_SECONDS
+        logger.warning("OpenAI rate limit hit, pausing LLM calls for %.0fs", seconds)
+        for bucket in (self.requests, self.tokens):
+            if bucket:
+                bucket.drain(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"waited_seconds": round(self.waited_seconds, 1), "rate_limited": self.rate_limited}
+
+
+limiter = RateLimiter(
+    float(os.getenv("FINOVA_OPENAI_RPM", str(DEFAULT_RPM))),
+    float(os.getenv("FINOVA_OPENAI_TPM", str(DEFAULT_TPM))),
+)
+
+_client = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The process-wide OpenAI client. Connections are pooled and reused across calls."""
+    global _client, _client_pid
+    # A client inherited over fork would share its sockets with the parent.
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                import openai
+                _client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_client():
+    """The AsyncOpenAI client of the running event loop (its connections cannot cross loops)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import openai
+        client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        _async_clients[loop] = client
+    return client
+
+
+def estimate_tokens(messages: Any, max_tokens: Optional[int] = None) -> int:
+    """Tokens a request counts against the TPM limit: prompt estimate plus max_tokens."""
+    chars = 0
+    images = 0
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", message)
+        parts = content if isinstance(content, list) else [content]
+        for part in parts:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                detail = (part.get("image_url") or {}).get("detail", "high")
+                images += LOW_DETAIL_IMAGE_TOKENS if detail == "low" else HIGH_DETAIL_IMAGE_TOKENS
+            elif isinstance(part, dict):
+                chars += len(str(part.get("text", "")))
+            elif part is not None:
+                chars += len(str(part))
+    return chars // CHARS_PER_TOKEN + images + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or "rate limit" in str(error).lower()
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def note_error(error: Exception) -> None:
+    """Let the limiter know about a failed call (only 429s matter)."""
+    if is_rate_limit_error(error):
+        limiter.penalize(_retry_after(error))
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def chat_completion(**request: Any):
+    """`chat.completions.create` on the shared client, within the rate limits."""
+    estimated = estimate_tokens(request.get("messages"), request.get("max_tokens"))
+    limiter.acquire(estimated)
+    try:
+        response = get_client().chat.completions.create(**request)
+    except Exception as e:
+        note_error(e)
+        raise
+    limiter.settle(estimated, _usage_tokens(response))
+    return response
+
+
+async def achat_completion(**request: Any):
+    """Async `chat.completions.create` on the event loop's client, within the rate limits."""
+    estimated = estimate_tokens(request.get("messages"), request.get("max_tokens"))
+    await limiter.acquire_async(estimated)
+    try:
+        response = await get_async_client().chat.completions.create(**request)
+    except Exception as e:
+        note_error(e)
+        raise
+    limiter.settle(estimated, _usage_tokens(response))
+    return response
+
+
+def stats() -> Dict[str, Any]:
+    return limiter.stats()
@@ -0,0 +1,81 @@
+"""Per-page text-layer classification for PDFs.
+
+Both extractor tools used to decide for the whole document. If the PyPDF2 text was
+over 100 characters it was trusted, even when some pages were scans. Otherwise
+every page went to OCR, even pages with a good text layer. Hybrid PDFs (an
+e-invoice followed by scanned annexes) hit both cases.
+
+`classify_pages` reads each page's text layer and marks the page as text or
+image-only. Only image-only pages are rendered and OCR'd; `merge_pages` puts
+the two sources back together in page order.
+
+A text layer counts when it has at least `FINOVA_TEXT_LAYER_MIN_CHARS` (default 40)
+non-blank characters and looks like text: at least `MIN_WORDS` words, mostly
+letters, digits and punctuation, and few unmapped glyphs (`(cid:NN)` or U+FFFD,
+which PDFs with broken font encodings produce).
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple
+
+from jsonlog import get_logger
+
+logger = get_logger("pdf_pages")
+
+MIN_PAGE_CHARS = int(os.getenv("FINOVA_TEXT_LAYER_MIN_CHARS", "40"))
+MIN_WORDS = 5
+MIN_READABLE_RATIO = 0.85
+MAX_UNMAPPED_RATIO = 0.02
+
+_WORD = re.compile(r"[^\W\d_]{2,}")
+_UNMAPPED = re.compile(r"\(cid:\d+\)|\ufffd")
+
+
+class PageText(NamedTuple):
+    number: int
+    text: str
+    has_text_layer: bool
+
+
+def is_plausible_text(text: str) -> bool:
+    """Whether an extracted text layer looks like real text rather than noise or glyph ids."""
+    stripped = "".join(text.split())
+    if len(stripped) < MIN_PAGE_CHARS:
+        return False
+    if len(_UNMAPPED.findall(text)) / len(stripped) > MAX_UNMAPPED_RATIO:
+        return False
+    if len(_WORD.findall(text)) < MIN_WORDS:
+        return False
+    readable = sum(1 for char in stripped if char.isalnum() or char in ".,;:-/()%+'\"")
+    return readable / len(stripped) >= MIN_READABLE_RATIO
+
+
+def classify_pages(file_path: str) -> List[PageText]:
+    """Text layer of every page and whether it is good enough to skip OCR."""
+    import PyPDF2
+
+    pages = []
+    with open(file_path, "rb") as f:
+        for index, page in enumerate(PyPDF2.PdfReader(f).pages):
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                logger.debug("Text layer of page %d unreadable: %s", index + 1, e)
+                text = ""
+            pages.append(PageText(index + 1, text, is_plausible_text(text)))
+
+    image_only = [page.number for page in pages if not page.has_text_layer]
+    logger.info("%d of %d pages have a text layer", len(pages) - len(image_only), len(pages),
+                extra={"fields": {"image_only_pages": image_only}})
+    return pages
+
+
+def merge_pages(pages: List[PageText], ocr_texts: Dict[int, str]) -> str:
+    """Document text in page order: the text layer where it is usable, OCR text elsewhere."""
+    parts = []
+    for page in pages:
+        text = page.text if page.has_text_layer else ocr_texts.get(page.number, page.text)
+        if text.strip():
+            parts.append(f"=== PAGE {page.number} ===\n{text}\n\n")
+    return "".join(parts)
@@ -0,0 +1,152 @@
+"""Opt-in per-job profiling (`--profile` or `FINOVA_PROFILE=1`).
+
+While a profiled job runs, tracemalloc and a `gc.callbacks` hook are active.
+`checkpoint(name)` closes the stage that just finished and records its wall time,
+peak traced memory and RSS. `JobProfiler.stop` returns the `_profile` block
+for the result JSON. It holds the stages, the top allocation sites still alive
+and the GC pauses by generation.
+
+When profiling is off, `job_profile` yields None and `checkpoint` returns
+immediately. Nothing is traced and no collection is forced.
+"""
+
+import gc
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from jsonlog import get_logger
+
+logger = get_logger("profiling")
+
+TRACEMALLOC_FRAMES = 5
+HOTSPOT_COUNT = 10
+
+_enabled = os.getenv("FINOVA_PROFILE", "").lower() in ("1", "true", "yes")
+_active: Optional["JobProfiler"] = None
+
+
+def enable(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        import psutil
+        return round(psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024, 1)
+    except ImportError:
+        return None
+
+
+class JobProfiler:
+    """Stages, allocation hotspots and GC pauses of one job."""
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self.gc_pauses: Dict[int, List[float]] = {0: [], 1: [], 2: []}
+        self._gc_started: Optional[float] = None
+        self._owns_tracemalloc = False
+        self._closed = False
+        self._started = time.perf_counter()
+        self._stage_started = self._started
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self.gc_pauses[info["generation"]].append((time.perf_counter() - self._gc_started) * 1000)
+            self._gc_started = None
+
+    def start(self) -> None:
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        gc.callbacks.append(self._on_gc)
+
+    def checkpoint(self, name: str) -> None:
+        now = time.perf_counter()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.stages.append({
+            "stage": name,
+            "ms": round((now - self._stage_started) * 1000, 1),
+            "peak_traced_mb": round(peak / 1024 / 1024, 2),
+            "traced_mb": round(current / 1024 / 1024, 2),
+            "rss_mb": _rss_mb(),
+        })
+        self._stage_started = now
+
+    def _hotspots(self) -> List[Dict[str, Any]]:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:HOTSPOT_COUNT]
+        ]
+
+    def stop(self) -> Dict[str, Any]:
+        """Finish the job and return its `_profile` block."""
+        self.checkpoint("finish")
+        hotspots = self._hotspots()
+        self.close()
+
+        all_pauses = [pause for pauses in self.gc_pauses.values() for pause in pauses]
+        profile = {
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 1),
+            "peak_traced_mb": max((stage["peak_traced_mb"] for stage in self.stages), default=0.0),
+            "stages": self.stages,
+            "hotspots": hotspots,
+            "gc": {
+                "collections": {str(generation): len(pauses) for generation, pauses in self.gc_pauses.items()},
+                "pause_ms_total": round(sum(all_pauses), 2),
+                "pause_ms_max": round(max(all_pauses, default=0.0), 2),
+            },
+        }
+        logger.info("Job profile: %.0f ms, peak traced %.1f MB, %d GC pauses totalling %.1f ms",
+                    profile["total_ms"], profile["peak_traced_mb"], len(all_pauses), profile["gc"]["pause_ms_total"])
+        return profile
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        gc.callbacks.remove(self._on_gc)
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+
+@contextmanager
+def job_profile():
+    """Profile the enclosed job when profiling is enabled; yields the profiler or None."""
+    global _active
+    if not _enabled or _active is not None:
+        yield None
+        return
+
+    profiler = JobProfiler()
+    profiler.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.close()
+
+
+def checkpoint(name: str) -> None:
+    """Close the current stage of the profiled job. No-op when nothing is being profiled."""
+    if _active is not None:
+        _active.checkpoint(name)
@@ -0,0 +1,133 @@
+"""Page-streaming PDF rasterization for vision OCR.
+
+`convert_from_path` on a whole document keeps every page as a PIL image in
+memory, and OCR cannot start until the last page is rendered. `iter_page_images`
+instead renders small windows of pages (`first_page`/`last_page` passed to
+poppler) in a process pool. Each page is prepared for upload (`image_prep`) in the
+worker process, along with the local OCR pass (`local_ocr`) when it is enabled,
+and pages are yielded in order as their window finishes. Only a few windows are
+in flight at a time, so memory stays bounded for long scans.
+
+The pool is created on the first multi-window document and kept for the life of
+the process (a forked worker creates its own), so the spawn start-up, which
+re-imports main.py as `__mp_main__` in every child, is paid once per worker and
+not once per document. This module is imported by the render processes, so it
+must stay light (no crewai, no openai).
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from image_prep import PreparedPage, prepare_page
+from local_ocr import LocalOcrResult, recognize
+
+RENDER_DPI = 200
+RENDER_WINDOW = int(os.getenv("FINOVA_RASTER_WINDOW", "2"))
+RENDER_PROCESSES = int(os.getenv("FINOVA_RASTER_PROCESSES", "2"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+class RenderedPage(NamedTuple):
+    number: int
+    prepared: PreparedPage
+    local_ocr: Optional[LocalOcrResult] = None
+
+
+def render_page(image, number: int, use_local_ocr: bool = False) -> RenderedPage:
+    """Prepare one page image for upload and, if asked, OCR it locally."""
+    prepared = prepare_page(image)
+    result = recognize(image) if use_local_ocr and not prepared.blank else None
+    return RenderedPage(number, prepared, result)
+
+
+def page_count(file_path: str) -> int:
+    from pdf2image import pdfinfo_from_path
+    return int(pdfinfo_from_path(file_path)["Pages"])
+
+
+def render_window(file_path: str, first_page: int, last_page: int, dpi: int = RENDER_DPI,
+                  use_local_ocr: bool = False) -> List[RenderedPage]:
+    """Render pages first_page..last_page (1-based, inclusive) and prepare them for upload."""
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(file_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    pages = []
+    for offset, image in enumerate(images):
+        pages.append(render_page(image, first_page + offset, use_local_ocr))
+        image.close()
+    return pages
+
+
+def _windows(pages: List[int], window: int) -> List[Tuple[int, int]]:
+    """Split sorted page numbers into (first, last) runs of consecutive pages, at most `window` long."""
+    windows = []
+    for number in pages:
+        if windows and windows[-1][1] == number - 1 and number - windows[-1][0] < window:
+            windows[-1] = (windows[-1][0], number)
+        else:
+            windows.append((number, number))
+    return windows
+
+
+def _get_executor(processes: int) -> ProcessPoolExecutor:
+    """The process's render pool, created on first use with `processes` workers."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        # A pool inherited over fork belongs to the parent.
+        if _executor is None or _executor_pid != os.getpid():
+            # spawn, not fork: the caller may be running OCR threads, and forking a
+            # threaded process can deadlock the children.
+            _executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_page_images(file_path: str, dpi: int = RENDER_DPI, window: int = RENDER_WINDOW,
+                     processes: int = RENDER_PROCESSES, use_local_ocr: bool = False,
+                     pages: Optional[Iterable[int]] = None) -> Iterator[RenderedPage]:
+    """Yield every page (or only `pages`), in page order, as pages are rendered."""
+    if pages is None:
+        pages = range(1, page_count(file_path) + 1)
+    windows = _windows(sorted(set(pages)), max(1, window))
+    if not windows:
+        return
+
+    if processes <= 1 or len(windows) == 1:
+        for first, last in windows:
+            yield from render_window(file_path, first, last, dpi, use_local_ocr)
+        return
+
+    executor = _get_executor(processes)
+    max_in_flight = processes + 1
+    pending = []
+    next_window = 0
+    try:
+        while next_window < len(windows) or pending:
+            while next_window < len(windows) and len(pending) < max_in_flight:
+                first, last = windows[next_window]
+                pending.append(executor.submit(render_window, file_path, first, last, dpi, use_local_ocr))
+                next_window += 1
+            yield from pending.pop(0).result()
+    except BrokenProcessPool:
+        # A render process died (poppler crash, OOM kill); the next document gets a new pool.
+        _discard_executor(executor)
+        raise
+    finally:
+        # Stopped early (error, or the caller closed the generator): do not render the rest.
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,95 @@
+"""Cold-start measurements for the agent entry points (`main.py --startup-report`).
+
+`timed_stage` records how long the lazy loaders in main.py take in the current
+process. `print_startup_report` starts fresh interpreters to measure the cold start
+to first job and to collect a `-X importtime` breakdown of what that start imports.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+STAGES: List[Tuple[str, float]] = []
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Record the wall time of one startup stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGES.append((name, (time.perf_counter() - started) * 1000))
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` stderr into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        rows.append((parts[2].rstrip(), self_us, cumulative_us))
+    return rows
+
+
+def _startup_command(job_type: str) -> List[str]:
+    code = f"import main; main.prepare_for_job({job_type!r})"
+    return [sys.executable, "-c", code]
+
+
+def _run_fresh(args: List[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=SCRIPT_DIR)
+    return subprocess.run(args, cwd=SCRIPT_DIR, env=env, capture_output=True, text=True)
+
+
+def measure_cold_start(job_type: str = "extract") -> float:
+    """Milliseconds from launching a fresh interpreter until it is ready for its first job."""
+    started = time.perf_counter()
+    completed = _run_fresh(_startup_command(job_type))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Cold start failed: {completed.stderr[-2000:]}")
+    return elapsed_ms
+
+
+def collect_importtime(job_type: str = "extract") -> List[Tuple[str, int, int]]:
+    """Run a fresh interpreter under `-X importtime` and return its parsed rows."""
+    command = _startup_command(job_type)
+    completed = _run_fresh(command[:1] + ["-X", "importtime"] + command[1:])
+    return parse_importtime(completed.stderr)
+
+
+def print_startup_report(job_type: str = "extract", top: int = 30, budget_ms: Optional[float] = None,
+                         stream=None) -> int:
+    """Print the import breakdown and cold-start time. Returns 1 when over budget."""
+    stream = stream or sys.stderr
+
+    rows = collect_importtime(job_type)
+    rows.sort(key=lambda row: row[2], reverse=True)
+    print(f"Import time breakdown for a '{job_type}' cold start (top {top} by cumulative time):", file=stream)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=stream)
+    for module, self_us, cumulative_us in rows[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}", file=stream)
+
+    cold_start_ms = measure_cold_start(job_type)
+    print(f"Cold start to first '{job_type}' job: {cold_start_ms:.0f} ms", file=stream)
+
+    if budget_ms is not None and cold_start_ms > budget_ms:
+        print(f"ERROR: Cold start exceeds the budget of {budget_ms:.0f} ms", file=stream)
+        return 1
+    if budget_ms is not None:
+        print(f"Within the startup budget of {budget_ms:.0f} ms", file=stream)
+    return 0
@@ -0,0 +1,72 @@
+"""Private directory for the agent's local state: caches, snapshots, sequences.
+
+These files used to sit under fixed names in the shared temp directory, where any
+local user could create them first: plant a pickle that runs code when a worker
+loads the chart snapshot, or feed text and LLM answers into the pipeline.
+
+`path(name)` returns a path under `FINOVA_STATE_DIR`, else
+$XDG_CACHE_HOME/finova (~/.cache/finova), else <tmp>/finova-<uid> when the home
+directory is not writable. `ensure_private(directory)` creates a directory with
+mode 0700 and refuses one that is a symlink, belongs to another user or is open
+to group or others; the explicit `FINOVA_*_PATH` overrides go through it too.
+"""
+
+import os
+import stat
+import tempfile
+import threading
+from typing import Set
+
+from jsonlog import get_logger
+
+logger = get_logger("state_dir")
+
+_checked: Set[str] = set()
+_lock = threading.Lock()
+
+
+class UnsafeStateDir(PermissionError):
+    pass
+
+
+def ensure_private(directory: str) -> str:
+    """Create `directory` (mode 0700) if needed and check that only this user can use it."""
+    directory = os.path.abspath(directory)
+    with _lock:
+        if directory in _checked:
+            return directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+        if not stat.S_ISDIR(info.st_mode):
+            raise UnsafeStateDir(f"{directory} is not a directory")
+        if info.st_uid != os.getuid():
+            raise UnsafeStateDir(f"{directory} belongs to uid {info.st_uid}, not {os.getuid()}")
+        if info.st_mode & 0o077:
+            raise UnsafeStateDir(f"{directory} is accessible to other users (mode {stat.S_IMODE(info.st_mode):o})")
+        _checked.add(directory)
+    return directory
+
+
+def _default_dir() -> str:
+    configured = os.getenv("FINOVA_STATE_DIR")
+    if configured:
+        return configured
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    if os.path.isabs(cache_home):
+        candidate = os.path.join(cache_home, "finova")
+        try:
+            return ensure_private(candidate)
+        except OSError as e:
+            logger.debug("State directory %s unusable: %s", candidate, e)
+    return os.path.join(tempfile.gettempdir(), f"finova-{os.getuid()}")
+
+
+def path(name: str) -> str:
+    """`name` in the private state directory, which is created on first use."""
+    return os.path.join(ensure_private(_default_dir()), name)
+
+
+def private_file(file_path: str) -> str:
+    """`file_path` after checking that its directory is private (explicitly configured paths)."""
+    ensure_private(os.path.dirname(os.path.abspath(file_path)))
+    return file_path
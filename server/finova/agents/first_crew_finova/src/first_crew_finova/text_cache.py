@@ -0,0 +1,152 @@
+"""Extracted-text cache shared by every agent, tool and phase.
+
+Each agent that reads the document used to run PyPDF2, or GPT-4o vision OCR of
+every page, again. This happened in phase 0 and again in phase 1. Text is now
+cached by (document content hash, extractor tier). It lives in memory for the
+current process and as one file per entry under `FINOVA_TEXT_CACHE_DIR`
+(default: text_cache in the private state_dir), so phase 1 reuses what phase 0
+extracted. Text is neither read from nor written to a directory that other users
+can write to.
+
+Files older than `FINOVA_TEXT_CACHE_TTL` seconds (default one day) are ignored
+and pruned. Text containing OCR error markers is not cached, so a failed page is
+retried the next time; extractors raise or return "" when they get no text, and
+the tools' fallback messages are produced outside the cache.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ingest import document_hash
+from jsonlog import get_logger
+import state_dir
+
+logger = get_logger("text_cache")
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+MEMORY_ENTRIES = 32
+PRUNE_INTERVAL_SECONDS = 600
+UNCACHEABLE_MARKERS = ("[OCR_ERROR", "[LLM_VISION_UNAVAILABLE")
+
+_memory: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_lock = threading.Lock()
+# (digest, tier) -> [extraction lock, callers using it]; removed when the last caller is done.
+_locks: Dict[Tuple[str, str], List] = {}
+_last_prune = 0.0
+stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def _cache_dir() -> str:
+    return state_dir.ensure_private(os.getenv("FINOVA_TEXT_CACHE_DIR") or state_dir.path("text_cache"))
+
+
+def _ttl() -> int:
+    return int(os.getenv("FINOVA_TEXT_CACHE_TTL", str(DEFAULT_TTL_SECONDS)))
+
+
+def _entry_path(digest: str, tier: str) -> str:
+    return os.path.join(_cache_dir(), f"{digest}.{tier}.txt")
+
+
+def _remember(key: Tuple[str, str], text: str) -> None:
+    with _lock:
+        _memory[key] = text
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _read_disk(digest: str, tier: str) -> Optional[str]:
+    try:
+        path = _entry_path(digest, tier)
+        if time.time() - os.path.getmtime(path) > _ttl():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_disk(digest: str, tier: str, text: str) -> None:
+    try:
+        path = _entry_path(digest, tier)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("Could not persist extracted text: %s", e)
+    _prune()
+
+
+def _prune() -> None:
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = now
+    try:
+        for entry in os.scandir(_cache_dir()):
+            if entry.is_file() and now - entry.stat().st_mtime > _ttl():
+                os.remove(entry.path)
+    except OSError:
+        pass
+
+
+def get(file_path: str, tier: str) -> Optional[str]:
+    digest = document_hash(file_path)
+    if not digest:
+        return None
+    key = (digest, tier)
+    with _lock:
+        text = _memory.get(key)
+    if text is not None:
+        stats["memory_hits"] += 1
+        return text
+    text = _read_disk(digest, tier)
+    if text is not None:
+        stats["disk_hits"] += 1
+        _remember(key, text)
+    return text
+
+
+def put(file_path: str, tier: str, text: str) -> None:
+    digest = document_hash(file_path)
+    if not digest or not text or not text.strip() or any(marker in text for marker in UNCACHEABLE_MARKERS):
+        return
+    _remember((digest, tier), text)
+    _write_disk(digest, tier, text)
+
+
+def get_or_extract(file_path: str, tier: str, extract: Callable[[], str]) -> str:
+    """Return the cached text of this tier, or run `extract` once and cache its result.
+
+    Concurrent callers for the same document and tier wait for the first extraction
+    instead of starting their own.
+    """
+    text = get(file_path, tier)
+    if text is not None:
+        return text
+
+    key = (document_hash(file_path), tier)
+    with _lock:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            text = get(file_path, tier)
+            if text is not None:
+                return text
+            stats["misses"] += 1
+            logger.info("Extracting text with %s", tier, extra={"fields": {"document_hash": key[0]}})
+            text = extract()
+            put(file_path, tier, text)
+            return text
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[key]
@@ -1,7 +1,6 @@
 from crewai.tools import BaseTool
 from typing import Type, Optional
 from pydantic import BaseModel, Field
-import requests
 import os
 import json
 
@@ -21,6 +20,8 @@ class SerperAccountingResearchTool(BaseTool):
         if not api_key:
             return "Internet research unavailable - no Serper API key configured. Using local Romanian Chart of Accounts knowledge only."
         
+        import requests
+
         try:
             enhanced_query = f"Romania accounting {query} plan de conturi OMFP 1802"
             
@@ -0,0 +1,177 @@
+"""Per-document LLM usage ledger and token budget.
+
+Every LLM call made while a job runs is recorded in the job's ledger. That covers
+the crew's completions (`crew.CachedLLM`), vision OCR, the simple extractor's
+vision call and the invoice retry. Each record holds the stage (the crew task
+or direct-call name), model, prompt/completion/cached tokens, latency and
+estimated cost. `UsageLedger.to_dict` is the `_usage` block attached to every
+job result. Cache hits are counted but cost nothing.
+
+A job may set a token budget (`token_budget` in the job, else
+`FINOVA_DOC_TOKEN_BUDGET`; 0 means none). Once the tokens spent reach it:
+
+- optional stages ask `allow_optional_stage` and are skipped (duplicate detection,
+  compliance validation, the empty-invoice retry and repeat attempts);
+- with `FINOVA_TOKEN_BUDGET_ACTION=abort`, any further uncached LLM call raises
+  `BudgetExceeded` and the job fails with an error instead.
+
+Prices are USD per million tokens, matched by model name prefix.
+"""
+
+import contextvars
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from jsonlog import get_logger
+
+logger = get_logger("usage")
+
+# model prefix -> (input, cached input, output) USD per million tokens
+PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+
+_ledger = contextvars.ContextVar("finova_usage_ledger", default=None)
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def _price(model: str):
+    name = (model or "").split("/")[-1]
+    for prefix in sorted(PRICES_PER_MILLION, key=len, reverse=True):
+        if name.startswith(prefix):
+            return PRICES_PER_MILLION[prefix]
+    return None
+
+
+def _new_stage() -> Dict[str, Any]:
+    return {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+            "latency_ms": 0.0, "cost_usd": 0.0, "models": []}
+
+
+class UsageLedger:
+    def __init__(self, token_budget: int = 0, abort_on_budget: bool = False):
+        self.token_budget = token_budget
+        self.abort_on_budget = abort_on_budget
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.skipped_stages: List[str] = []
+        self.unpriced_models: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(stage["prompt_tokens"] + stage["completion_tokens"] for stage in self.stages.values())
+
+    def over_budget(self) -> bool:
+        return bool(self.token_budget) and self.total_tokens >= self.token_budget
+
+    def record(self, stage: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               cached_tokens: int = 0, latency_ms: float = 0.0, cache_hit: bool = False) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(stage or "other", _new_stage())
+            if model and model not in entry["models"]:
+                entry["models"].append(model)
+            if cache_hit:
+                entry["cache_hits"] += 1
+                return
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cached_tokens"] += cached_tokens
+            entry["latency_ms"] += latency_ms
+            price = _price(model)
+            if price is None:
+                if model and model not in self.unpriced_models:
+                    self.unpriced_models.append(model)
+            else:
+                input_price, cached_price, output_price = price
+                entry["cost_usd"] += ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+                                      + completion_tokens * output_price) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(entry, latency_ms=round(entry["latency_ms"], 1), cost_usd=round(entry["cost_usd"], 6))
+                      for name, entry in self.stages.items()}
+        total = _new_stage()
+        del total["models"]
+        for entry in stages.values():
+            for key in total:
+                total[key] += entry[key]
+        total["latency_ms"] = round(total["latency_ms"], 1)
+        total["cost_usd"] = round(total["cost_usd"], 6)
+        total["total_tokens"] = total["prompt_tokens"] + total["completion_tokens"]
+        usage = {"stages": stages, "total": total}
+        if self.token_budget:
+            usage["budget"] = {"tokens": self.token_budget, "exceeded": self.over_budget(),
+                               "skipped_stages": list(self.skipped_stages)}
+        if self.unpriced_models:
+            usage["unpriced_models"] = list(self.unpriced_models)
+        return usage
+
+
+@contextmanager
+def document_usage(token_budget: Optional[int] = None):
+    """Record the LLM usage of the enclosed job in a fresh ledger; yields the ledger."""
+    if token_budget is None:
+        token_budget = int(os.getenv("FINOVA_DOC_TOKEN_BUDGET", "0"))
+    abort = os.getenv("FINOVA_TOKEN_BUDGET_ACTION", "skip").lower() == "abort"
+    ledger = UsageLedger(token_budget, abort)
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+def current() -> Optional[UsageLedger]:
+    return _ledger.get()
+
+
+def record(stage: str, model: str, **counts: Any) -> None:
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.record(stage, model, **counts)
+
+
+def record_response(stage: str, model: str, response: Any, latency_ms: float) -> None:
+    """Record an OpenAI/litellm response's `usage` object."""
+    usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+    if usage is None:
+        record(stage, model, latency_ms=latency_ms)
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details")
+    cached = (details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", 0)) or 0
+
+    def count(name: str) -> int:
+        return (usage.get(name) if isinstance(usage, dict) else getattr(usage, name, 0)) or 0
+
+    record(stage, model, prompt_tokens=count("prompt_tokens"), completion_tokens=count("completion_tokens"),
+           cached_tokens=cached, latency_ms=latency_ms)
+
+
+def check_budget(stage: str) -> None:
+    """Raise BudgetExceeded before an uncached call when the budget is spent and set to abort."""
+    ledger = _ledger.get()
+    if ledger is not None and ledger.abort_on_budget and ledger.over_budget():
+        raise BudgetExceeded(f"Token budget of {ledger.token_budget} exceeded before {stage} "
+                             f"({ledger.total_tokens} tokens used)")
+
+
+def allow_optional_stage(stage: str) -> bool:
+    """Whether an optional stage may run; False (and noted in the ledger) once over budget."""
+    ledger = _ledger.get()
+    if ledger is None or not ledger.over_budget():
+        return True
+    with ledger._lock:
+        ledger.skipped_stages.append(stage)
+    logger.warning("Token budget of %d spent (%d used), skipping %s", ledger.token_budget, ledger.total_tokens, stage)
+    return False
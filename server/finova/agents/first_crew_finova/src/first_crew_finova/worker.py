@@ -0,0 +1,112 @@
+"""JSON-lines job loop for the long-lived extraction worker (`main.py serve`).
+
+Each request is one JSON object per line, each reply is one JSON object per line
+carrying the request `id`. The actual job handling lives in main.py and is passed
+in as `handle_job`, so this module stays free of crew/LLM imports.
+"""
+
+import json
+import os
+import socketserver
+import sys
+import time
+from typing import Any, Callable, Dict, IO, Tuple
+
+from jsonlog import get_logger
+
+logger = get_logger("worker")
+
+JobHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _parse_job(line: str) -> Dict[str, Any]:
+    job = json.loads(line)
+    if not isinstance(job, dict):
+        raise ValueError("Job must be a JSON object")
+    return job
+
+
+def run_job_safely(handle_job: JobHandler, line: str) -> Tuple[Dict[str, Any], bool]:
+    """Run one raw JSON-lines request. Returns the reply and whether to stop serving."""
+    job_id = None
+    started = time.time()
+    stop = False
+    try:
+        job = _parse_job(line)
+        job_id = job.get("id")
+        if job.get("type") == "shutdown":
+            result = {"status": "shutdown"}
+            stop = True
+        else:
+            result = handle_job(job)
+    except Exception as e:
+        logger.error("Worker job %s failed: %s", job_id, e, exc_info=True)
+        result = {"error": str(e)}
+
+    reply = {"id": job_id}
+    reply.update(result)
+    reply["_elapsed_ms"] = int((time.time() - started) * 1000)
+    return reply, stop
+
+
+def serve_stream(handle_job: JobHandler, input_stream: IO[str], output_stream: IO[str]) -> int:
+    """Serve jobs from a text stream until EOF or a `shutdown` job. Returns the job count."""
+    handled = 0
+    original_stdout = sys.stdout
+    # Anything that prints to stdout during a job (crew verbose output, tools) must not
+    # end up interleaved with the protocol replies.
+    sys.stdout = sys.stderr
+    try:
+        for line in input_stream:
+            line = line.strip()
+            if not line:
+                continue
+
+            reply, stop = run_job_safely(handle_job, line)
+            output_stream.write(json.dumps(reply, ensure_ascii=False) + "\n")
+            output_stream.flush()
+            if stop:
+                break
+            handled += 1
+    finally:
+        sys.stdout = original_stdout
+
+    logger.info("Worker stopped after %s jobs", handled)
+    return handled
+
+
+def serve_socket(handle_job: JobHandler, socket_path: str) -> None:
+    """Serve jobs over a local Unix domain socket, one connection at a time."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    class _JobConnectionHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode("utf-8").strip()
+                if not line:
+                    continue
+                original_stdout = sys.stdout
+                sys.stdout = sys.stderr
+                try:
+                    reply, stop = run_job_safely(handle_job, line)
+                finally:
+                    sys.stdout = original_stdout
+                self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                if stop:
+                    self.server.shutdown_requested = True
+                    return
+
+    class _JobServer(socketserver.UnixStreamServer):
+        shutdown_requested = False
+
+    server = _JobServer(socket_path, _JobConnectionHandler)
+    logger.info("Worker listening on %s", socket_path)
+    try:
+        while not server.shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,382 @@
+"""Pre-forked worker pool for `main.py serve --workers N`.
+
+The supervisor imports and warms everything once (crewai, openai, chart of accounts,
+article catalog), freezes the GC and then forks the workers, so that warm state is
+shared copy-on-write. Jobs arrive as JSON lines (stdin or a Unix socket), are handed
+to idle workers over socket pairs and the replies are written back to the client
+that sent the job, in completion order.
+
+A worker is recycled after `max_jobs` jobs or once its RSS passes `max_rss_mb`.
+If a worker dies in the middle of a job, that job is answered with an error and the
+worker is replaced. After a shutdown job, jobs received before it are still run
+(recycled workers are replaced while any are queued); later ones are refused.
+"""
+
+import gc
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsonlog import get_logger
+from worker import JobHandler, run_job_safely
+
+logger = get_logger("worker_pool")
+
+RssProbe = Callable[[], Optional[int]]
+
+
+class _Worker:
+    def __init__(self, pid: int, sock: socket.socket):
+        self.pid = pid
+        self.sock = sock
+        self.buffer = b""
+        self.current: Optional[Tuple["_Client", Dict[str, Any]]] = None
+        self.retiring = False
+
+
+class _Client:
+    """A source of jobs and the sink for their replies."""
+
+    def __init__(self, read_fd: int, write: Callable[[str], None], sock: Optional[socket.socket] = None):
+        self.read_fd = read_fd
+        self.write = write
+        self.sock = sock
+        self.buffer = b""
+        self.eof = False
+
+
+def _worker_main(sock: socket.socket, handle_job: JobHandler, max_jobs: int,
+                 max_rss_mb: Optional[int], rss_probe: RssProbe) -> None:
+    """Child loop: run jobs from the supervisor until told to stop or due for recycling."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout = sys.stderr
+
+    reader = sock.makefile("r", encoding="utf-8")
+    jobs_done = 0
+    for line in reader:
+        line = line.strip()
+        if not line:
+            continue
+
+        reply, _ = run_job_safely(handle_job, line)
+        jobs_done += 1
+
+        rss_mb = rss_probe()
+        recycle = jobs_done >= max_jobs or bool(max_rss_mb and rss_mb and rss_mb > max_rss_mb)
+        if recycle:
+            logger.info("Worker %s recycling after %s jobs (RSS=%sMB)", os.getpid(), jobs_done, rss_mb)
+        reply["_worker"] = {"pid": os.getpid(), "jobs": jobs_done, "rss_mb": rss_mb, "recycle": recycle}
+
+        sock.sendall((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+        if recycle:
+            break
+
+
+class WorkerPool:
+    """Supervisor for a fixed number of forked job workers."""
+
+    def __init__(self, handle_job: JobHandler, workers: int, max_jobs: int = 50,
+                 max_rss_mb: Optional[int] = None, rss_probe: Optional[RssProbe] = None):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("WorkerPool requires os.fork (POSIX only)")
+        self.handle_job = handle_job
+        self.size = max(1, workers)
+        self.max_jobs = max(1, max_jobs)
+        self.max_rss_mb = max_rss_mb
+        self.rss_probe = rss_probe or (lambda: None)
+
+        self.selector = selectors.DefaultSelector()
+        self.workers: Dict[int, _Worker] = {}
+        self.clients: List[_Client] = []
+        self.pending: Deque[Tuple[_Client, Dict[str, Any], str]] = deque()
+        self.listener: Optional[socket.socket] = None
+        self.feed: Optional[Tuple[_Client, Iterator[Dict[str, Any]]]] = None
+        self.stopping = False
+        self.jobs_dispatched = 0
+        self.workers_restarted = 0
+
+    # -- worker lifecycle -------------------------------------------------
+
+    def _spawn_worker(self) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                parent_sock.close()
+                # Drop every supervisor-side descriptor so EOF detection keeps working
+                # for the other workers and clients.
+                for other in self.workers.values():
+                    other.sock.close()
+                for client in self.clients:
+                    if client.sock is not None:
+                        client.sock.close()
+                if self.listener is not None:
+                    self.listener.close()
+                _worker_main(child_sock, self.handle_job, self.max_jobs, self.max_rss_mb, self.rss_probe)
+            except BaseException as e:
+                logger.error("Worker %s crashed: %s", os.getpid(), e)
+                exit_code = 1
+            finally:
+                sys.stderr.flush()
+                os._exit(exit_code)
+
+        child_sock.close()
+        parent_sock.setblocking(False)
+        worker = _Worker(pid, parent_sock)
+        self.workers[pid] = worker
+        self.selector.register(parent_sock, selectors.EVENT_READ, ("worker", worker))
+        logger.debug("Started worker %s", pid)
+
+    def _retire_worker(self, worker: _Worker) -> None:
+        self.selector.unregister(worker.sock)
+        worker.sock.close()
+        self.workers.pop(worker.pid, None)
+        try:
+            os.waitpid(worker.pid, 0)
+        except ChildProcessError:
+            pass
+
+        if worker.current is not None:
+            client, job = worker.current
+            worker.current = None
+            logger.error("Worker %s exited during job %s", worker.pid, job.get('id'))
+            self._reply(client, {"id": job.get("id"), "error": "Worker exited unexpectedly while processing the job"})
+
+        # Jobs accepted before a shutdown job still run, so keep a worker for them.
+        if not self.stopping or self.pending:
+            self.workers_restarted += 1
+            self._spawn_worker()
+
+    # -- clients ----------------------------------------------------------
+
+    def _add_client(self, client: _Client) -> None:
+        self.clients.append(client)
+        self.selector.register(client.read_fd, selectors.EVENT_READ, ("client", client))
+
+    def _close_client_input(self, client: _Client) -> None:
+        client.eof = True
+        self.selector.unregister(client.read_fd)
+
+    def _reply(self, client: _Client, reply: Dict[str, Any]) -> None:
+        try:
+            client.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning("Could not deliver reply %s: %s", reply.get('id'), e)
+
+    def _read_client(self, client: _Client) -> None:
+        if client.sock is not None:
+            try:
+                chunk = client.sock.recv(65536)
+            except ConnectionError:
+                chunk = b""
+        else:
+            chunk = os.read(client.read_fd, 65536)
+
+        if not chunk:
+            self._close_client_input(client)
+            if client.buffer.strip():
+                self._enqueue(client, client.buffer)
+            client.buffer = b""
+            return
+
+        client.buffer += chunk
+        *lines, client.buffer = client.buffer.split(b"\n")
+        for raw in lines:
+            self._enqueue(client, raw)
+
+    def _enqueue(self, client: _Client, raw: bytes) -> None:
+        line = raw.decode("utf-8").strip()
+        if not line:
+            return
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("Job must be a JSON object")
+        except ValueError as e:
+            self._reply(client, {"id": None, "error": str(e)})
+            return
+
+        if job.get("type") == "shutdown":
+            self.stopping = True
+            self._reply(client, {"id": job.get("id"), "status": "shutdown"})
+            return
+
+        if self.stopping:
+            self._reply(client, {"id": job.get("id"), "error": "Worker pool is shutting down"})
+            return
+
+        self.pending.append((client, job, line))
+
+    # -- dispatch ---------------------------------------------------------
+
+    def _dispatch(self) -> None:
+        for worker in list(self.workers.values()):
+            if not self.pending:
+                return
+            if worker.current is not None or worker.retiring:
+                continue
+            client, job, line = self.pending.popleft()
+            worker.current = (client, job)
+            worker.sock.setblocking(True)
+            try:
+                worker.sock.sendall((line + "\n").encode("utf-8"))
+            finally:
+                worker.sock.setblocking(False)
+            self.jobs_dispatched += 1
+
+    def _read_worker(self, worker: _Worker) -> None:
+        try:
+            chunk = worker.sock.recv(65536)
+        except ConnectionError:
+            chunk = b""
+
+        if not chunk:
+            self._retire_worker(worker)
+            return
+
+        worker.buffer += chunk
+        *lines, worker.buffer = worker.buffer.split(b"\n")
+        for raw in lines:
+            if not raw.strip():
+                continue
+            reply = json.loads(raw.decode("utf-8"))
+            meta = reply.pop("_worker", {})
+            if worker.current is not None:
+                client, _ = worker.current
+                worker.current = None
+                self._reply(client, reply)
+            if meta.get("recycle"):
+                worker.retiring = True
+
+    def _reap_clients(self) -> None:
+        """Close socket clients that hung up and have nothing left in flight."""
+        in_flight = {id(c) for c, _, _ in self.pending}
+        in_flight.update(id(w.current[0]) for w in self.workers.values() if w.current is not None)
+        for client in list(self.clients):
+            if client.eof and client.sock is not None and id(client) not in in_flight:
+                client.sock.close()
+                self.clients.remove(client)
+
+    def _busy(self) -> bool:
+        return bool(self.pending) or any(w.current is not None for w in self.workers.values())
+
+    def _inputs_open(self) -> bool:
+        return self.feed is not None or self.listener is not None or any(not c.eof for c in self.clients)
+
+    def _top_up(self) -> None:
+        """Pull batch jobs lazily, only as many as there are idle workers."""
+        if self.feed is None:
+            return
+        client, jobs = self.feed
+        idle = sum(1 for w in self.workers.values() if w.current is None and not w.retiring)
+        while len(self.pending) < idle:
+            try:
+                job = next(jobs)
+            except StopIteration:
+                self.feed = None
+                client.eof = True
+                return
+            if "error" in job and "type" not in job:
+                # An entry the feed could not turn into a job: its error is the reply.
+                self._reply(client, job)
+                continue
+            self.pending.append((client, job, json.dumps(job, ensure_ascii=False)))
+
+    # -- public API -------------------------------------------------------
+
+    def _run(self) -> None:
+        gc.freeze()
+        for _ in range(self.size):
+            self._spawn_worker()
+        logger.info("Worker pool started with %s workers (max_jobs=%s, max_rss_mb=%s)", self.size, self.max_jobs, self.max_rss_mb)
+
+        try:
+            while self._busy() or (self._inputs_open() and not self.stopping):
+                self._top_up()
+                self._dispatch()
+                for key, _ in self.selector.select(timeout=1.0):
+                    kind, obj = key.data
+                    if kind == "worker":
+                        self._read_worker(obj)
+                    elif kind == "listener":
+                        conn, _ = obj.accept()
+                        conn.setblocking(False)
+                        self._add_client(_Client(conn.fileno(), lambda text, c=conn: self._send_blocking(c, text), sock=conn))
+                    else:
+                        self._read_client(obj)
+                self._dispatch()
+                self._reap_clients()
+        finally:
+            self._shutdown()
+
+    @staticmethod
+    def _send_blocking(conn: socket.socket, text: str) -> None:
+        conn.setblocking(True)
+        try:
+            conn.sendall(text.encode("utf-8"))
+        finally:
+            conn.setblocking(False)
+
+    def _shutdown(self) -> None:
+        self.stopping = True
+        for worker in list(self.workers.values()):
+            self.selector.unregister(worker.sock)
+            worker.sock.close()
+        for worker in list(self.workers.values()):
+            try:
+                os.waitpid(worker.pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers.clear()
+        for client in self.clients:
+            if client.sock is not None:
+                client.sock.close()
+        if self.listener is not None:
+            self.listener.close()
+        self.selector.close()
+        logger.info("Worker pool stopped: %s jobs, %s worker restarts", self.jobs_dispatched, self.workers_restarted)
+
+    def serve_stream(self, input_fd: int, output_stream) -> None:
+        """Serve jobs read from a file descriptor (stdin) until EOF or a shutdown job."""
+        def write(text: str) -> None:
+            output_stream.write(text)
+            output_stream.flush()
+
+        self._add_client(_Client(input_fd, write))
+        self._run()
+
+    def run_batch(self, jobs: Iterable[Dict[str, Any]], output_stream) -> None:
+        """Run a finite set of jobs, writing each reply as soon as its job finishes.
+
+        An entry with an `error` and no `type` is written back as its own reply.
+        """
+        def write(text: str) -> None:
+            output_stream.write(text)
+            output_stream.flush()
+
+        client = _Client(-1, write)
+        self.clients.append(client)
+        self.feed = (client, iter(jobs))
+        self._run()
+
+    def serve_socket(self, socket_path: str) -> None:
+        """Serve jobs from any number of connections on a local Unix socket."""
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(socket_path)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, ("listener", self.listener))
+        logger.info("Worker pool listening on %s", socket_path)
+        try:
+            self._run()
+        finally:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
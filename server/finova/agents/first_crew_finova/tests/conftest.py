@@ -0,0 +1,12 @@
+"""The agent modules import each other by bare name, as main.py runs them from src/first_crew_finova."""
+
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "first_crew_finova"))
+sys.path.insert(0, SRC_DIR)
+
+# Caches, snapshots and article code sequences of the test run stay out of the user's state dir.
+os.environ.setdefault("FINOVA_STATE_DIR", tempfile.mkdtemp(prefix="finova_tests_"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
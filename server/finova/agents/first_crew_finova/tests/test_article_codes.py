@@ -0,0 +1,69 @@
+"""Article code reservations: stable per article name, never shared between concurrent callers."""
+
+import threading
+
+import pytest
+
+import article_codes
+from article_codes import ArticleCodeAllocator
+
+
+@pytest.fixture
+def allocator_path(tmp_path):
+    return str(tmp_path / "article_codes.sqlite")
+
+
+@pytest.fixture
+def allocator(monkeypatch, allocator_path):
+    allocator = ArticleCodeAllocator(allocator_path)
+    monkeypatch.setattr(article_codes, "_allocator", allocator)
+    return allocator
+
+
+def invoice(*names):
+    return {"line_items": [{"name": name, "articleCode": "", "isNew": True} for name in names]}
+
+
+def test_rerun_in_another_order_keeps_each_articles_code(allocator):
+    first = invoice("Hartie A4", "Toner  HP", "Capsator")
+    assert article_codes.assign_new_items("RO1", first, {"ART007": {}}, "doc-1") == 3
+    codes = {item["name"]: item["articleCode"] for item in first["line_items"]}
+    assert codes == {"Hartie A4": "ART008", "Toner  HP": "ART009", "Capsator": "ART010"}
+
+    rerun = invoice("capsator", "Hartie A4", "Toner HP", "Biblioraft")
+    article_codes.assign_new_items("RO1", rerun, {"ART007": {}}, "doc-1")
+    assert [item["articleCode"] for item in rerun["line_items"]] == ["ART010", "ART008", "ART009", "ART011"]
+    assert allocator.reused == 3 and allocator.reserved == 4
+
+
+def test_same_name_in_one_document_shares_a_code(allocator):
+    data = invoice("Toner HP", "Hartie A4", "toner hp")
+    assert article_codes.assign_new_items("RO1", data, {}, "doc-2") == 2
+    assert [item["articleCode"] for item in data["line_items"]] == ["ART001", "ART002", "ART001"]
+
+
+@pytest.mark.parametrize("same_document", [False, True])
+def test_concurrent_reserve_on_one_ein(allocator_path, same_document):
+    names = [f"article {n}" for n in range(25)]
+    results = {}
+    start = threading.Barrier(2)
+
+    def reserve(caller):
+        # One allocator (and sqlite connection) per caller, as in separate worker processes.
+        allocator = ArticleCodeAllocator(allocator_path)
+        start.wait()
+        results[caller] = allocator.reserve("RO1", names, (), "doc" if same_document else f"doc-{caller}")
+
+    threads = [threading.Thread(target=reserve, args=(caller,)) for caller in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert set(results) == {0, 1}
+    if same_document:
+        assert results[0] == results[1]
+        assert len(set(results[0].values())) == len(names)
+    else:
+        codes = list(results[0].values()) + list(results[1].values())
+        assert sorted(codes) == [article_codes.format_code(n) for n in range(1, 2 * len(names) + 1)]
@@ -0,0 +1,53 @@
+"""`main.py batch`: a bad manifest entry gets its own error line and the batch goes on."""
+
+import io
+import json
+import os
+
+import pytest
+
+import main
+
+MANIFEST = "\n".join([
+    json.dumps({"id": "a", "document_path": "a.pdf", "client_company_ein": "RO1"}),
+    "{not json",
+    "[1, 2]",
+    json.dumps({"id": "b", "document_path": "b.pdf", "client_company_ein": "RO1"}),
+]) + "\n"
+
+
+def fake_run_job(job):
+    return {"id": job["id"], "data": {"document_path": job["document_path"]}}
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(MANIFEST)
+    return str(path)
+
+
+def test_manifest_yields_error_markers_in_place(manifest):
+    entries = list(main.read_batch_manifest(manifest))
+    assert [entry["id"] for entry in entries] == ["a", 1, 2, "b"]
+    assert "Invalid manifest entry" in entries[1]["error"] and "type" not in entries[1]
+    assert "type" not in entries[2]
+    assert entries[3]["type"] == "extract"
+
+
+@pytest.mark.parametrize("concurrency", [
+    1,
+    pytest.param(2, marks=pytest.mark.skipif(not hasattr(os, "fork"), reason="WorkerPool needs os.fork")),
+])
+def test_batch_continues_after_bad_entries(monkeypatch, manifest, concurrency):
+    monkeypatch.setattr(main, "warm_up", lambda: None)
+    monkeypatch.setattr(main, "run_job", fake_run_job)
+    output = io.StringIO()
+    monkeypatch.setattr(main.sys, "stdout", output)
+
+    assert main.run_batch(manifest, concurrency=concurrency) == 2
+
+    replies = {reply["id"]: reply for reply in map(json.loads, output.getvalue().splitlines())}
+    assert set(replies) == {"a", 1, 2, "b"}
+    assert replies["b"]["data"]["document_path"] == "b.pdf"
+    assert replies[1]["error"].startswith("Invalid manifest entry")
@@ -0,0 +1,54 @@
+"""Lenient parsing of the LLM's answers into the task output models."""
+
+import pytest
+
+import document_models
+from document_models import ComplianceResult, Invoice, LineItem, _amount
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12.500", 12500.0),
+    ("12.500 RON", 12500.0),
+    ("12,500", 12.5),
+    ("7,249", 7.249),
+    ("23,450", 23.45),
+    ("1.234,56", 1234.56),
+    ("1.234,56 lei", 1234.56),
+    ("1,234.56 RON", 1234.56),
+    ("1.234.567", 1234567.0),
+    ("1.234.567,89", 1234567.89),
+    ("12,50", 12.5),
+    ("12.5", 12.5),
+    ("0,500", 0.5),
+    ("-1.250", -1250.0),
+    ("1 234,56", 1234.56),
+    ("119", 119.0),
+    (119, 119.0),
+    ("n/a", None),
+    (None, None),
+])
+def test_amount_formats(text, expected):
+    assert _amount(text) == expected
+
+
+def test_line_item_measures_keep_three_decimals():
+    item = LineItem.model_validate({"quantity": "23,450", "unit_price": "7,249", "total": "169,99"})
+    assert (item.quantity, item.unit_price, item.total) == (23.45, 7.249, 169.99)
+    assert LineItem.model_validate({"quantity": "1.500"}).quantity == 1.5
+
+
+def test_invoice_defaults_and_normalisation():
+    invoice = Invoice.model_validate({"total_amount": "12.500 RON", "vendor_ein": "RO12345678", "line_items": None})
+    data = invoice.to_dict()
+    assert data["total_amount"] == 12500.0
+    assert data["vendor_ein"] == "12345678"
+    assert data["line_items"] == []
+    assert data["currency"] == "RON"
+
+
+def test_compliance_unwraps_nested_block():
+    result = ComplianceResult.model_validate({"compliance_validation": {"compliance_status": "COMPLIANT",
+                                                                        "errors": ["CUI lipsa"]}})
+    data = document_models.to_dict(result)
+    assert data["compliance_status"] == "COMPLIANT"
+    assert data["errors"] == {"ro": ["CUI lipsa"], "en": ["CUI lipsa"]}
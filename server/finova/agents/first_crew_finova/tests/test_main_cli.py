@@ -0,0 +1,101 @@
+"""One pipeline execution per CLI request: one crew kickoff, no extra OpenAI completions, one JSON line."""
+
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import document_models
+import main
+import openai_client
+
+CATEGORIZATION = {"document_type": "Invoice", "direction": "incoming", "referenced_numbers": []}
+INVOICE = {
+    "document_type": "Invoice",
+    "vendor": "Exemplu Furnizor SRL",
+    "vendor_ein": "RO12345678",
+    "buyer": "Client Demo SRL",
+    "buyer_ein": "RO87654321",
+    "document_number": "FCT-42",
+    "document_date": "15-03-2024",
+    "total_amount": 119.0,
+    "vat_amount": 19.0,
+    "currency": "RON",
+    "line_items": [{"name": "Servicii contabile", "quantity": 1, "unit_price": 100.0, "total": 119.0}],
+}
+DUPLICATES = {"is_duplicate": False, "duplicate_matches": [], "confidence": 0.0}
+COMPLIANCE = {"compliance_status": "COMPLIANT", "overall_score": 0.9}
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.completions = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.models = SimpleNamespace(retrieve=lambda *args, **kwargs: None)
+
+    def _create(self, **request):
+        self.completions += 1
+        raise AssertionError("the CLI made an OpenAI completion outside the crew")
+
+
+def make_stub_crew_class(outputs, kickoffs):
+    class StubCrew:
+        def kickoff(self, inputs):
+            kickoffs.append(inputs["processing_phase"])
+            return SimpleNamespace(tasks_output=[SimpleNamespace(raw=json.dumps(output), pydantic=None)
+                                                 for output in outputs])
+
+    class StubFinovaCrew:
+        def __init__(self, client_company_ein, existing_articles, management_records, user_corrections, processing_phase):
+            self.processing_phase = processing_phase
+
+        def crew(self, extraction_task=None):
+            return StubCrew()
+
+        def extract_invoice_data_task(self):
+            return SimpleNamespace(output_pydantic=document_models.Invoice)
+
+        def extract_other_document_data_task(self, doc_type=""):
+            return SimpleNamespace(output_pydantic=document_models.model_for(doc_type))
+
+    return StubFinovaCrew
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    client = FakeOpenAI()
+    monkeypatch.setattr(openai_client, "get_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def base64_file(tmp_path):
+    path = tmp_path / "document.b64"
+    path.write_text(base64.b64encode(b"%PDF-1.4 test document\n").decode("ascii"))
+    return str(path)
+
+
+@pytest.mark.parametrize("phase, outputs", [
+    (0, [CATEGORIZATION]),
+    (1, [INVOICE, DUPLICATES, COMPLIANCE]),
+])
+def test_legacy_argv_runs_the_pipeline_once(monkeypatch, capsys, fake_openai, base64_file, phase, outputs):
+    kickoffs = []
+    monkeypatch.setattr(main, "get_crew_class", lambda: make_stub_crew_class(outputs, kickoffs))
+    # Candidate selection reads the document through the real extractor tool; the stub PDF has no text.
+    monkeypatch.setattr(main, "get_document_text", lambda doc_path: "Servicii contabile")
+
+    argv = ["RO87654321", base64_file, "", "", "", str(phase)]
+    if phase == 1:
+        argv.append(json.dumps(CATEGORIZATION))
+    assert main.main(argv) == 0
+
+    assert kickoffs == [phase]
+    assert fake_openai.completions == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 1
+    result = json.loads(lines[0])
+    assert result["data"]["document_type"] == "Invoice"
+    if phase == 1:
+        assert result["data"]["vendor"] == INVOICE["vendor"]
@@ -0,0 +1,39 @@
+"""Cold-start budget of the agent entry points (main.py --startup-report measures the same)."""
+
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+
+import startup
+
+# Cold start to the first extract job, crewai included. FINOVA_STARTUP_BUDGET_MS tightens it in CI.
+BUDGET_MS = float(os.getenv("FINOVA_STARTUP_BUDGET_MS", "20000"))
+
+HEAVY_MODULES = ("crew", "crewai", "litellm", "openai", "pydantic", "PyPDF2", "PIL", "requests",
+                 "document_models", "llm_cache", "openai_client", "chart_fallback")
+
+
+def test_import_main_stays_light():
+    code = ("import json, sys, main; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=startup.SCRIPT_DIR, capture_output=True, text=True,
+                               env=dict(os.environ, PYTHONPATH=startup.SCRIPT_DIR))
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+
+def test_cold_start_to_first_job_within_budget():
+    pytest.importorskip("crewai")
+    elapsed_ms = startup.measure_cold_start("extract")
+    assert elapsed_ms <= BUDGET_MS, f"cold start took {elapsed_ms:.0f} ms, budget {BUDGET_MS:.0f} ms"
+
+
+def test_startup_report_fails_over_budget(monkeypatch):
+    monkeypatch.setattr(startup, "collect_importtime", lambda job_type: [("main", 1000, 50000)])
+    monkeypatch.setattr(startup, "measure_cold_start", lambda job_type: 1500.0)
+    assert startup.print_startup_report(budget_ms=1000, stream=StringIO()) == 1
+    assert startup.print_startup_report(budget_ms=2000, stream=StringIO()) == 0
@@ -0,0 +1,49 @@
+"""WorkerPool: replies per job, recycling, and shutdown while workers recycle."""
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from worker_pool import WorkerPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="WorkerPool needs os.fork")
+
+
+def echo_job(job):
+    return {"id": job.get("id"), "pid": os.getpid()}
+
+
+def serve(pool, lines, timeout=20):
+    """Feed `lines` to pool.serve_stream through a pipe; returns the replies by id, in arrival order."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8"))
+    output = io.StringIO()
+    thread = threading.Thread(target=pool.serve_stream, args=(read_fd, output), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    os.close(write_fd)
+    alive = thread.is_alive()
+    thread.join(5)
+    os.close(read_fd)
+    assert not alive, "the pool did not stop"
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_every_job_answered_with_recycling():
+    replies = serve(WorkerPool(echo_job, workers=2, max_jobs=1), [{"id": n} for n in range(6)] + [{"type": "shutdown", "id": "stop"}])
+    by_id = {reply["id"]: reply for reply in replies}
+    assert set(by_id) == {0, 1, 2, 3, 4, 5, "stop"}
+    assert len({by_id[n]["pid"] for n in range(6)}) == 6
+
+
+def test_shutdown_while_recycling_runs_queued_jobs_and_exits():
+    pool = WorkerPool(echo_job, workers=1, max_jobs=1)
+    replies = serve(pool, [{"id": 1}, {"id": 2}, {"type": "shutdown", "id": "stop"}, {"id": 3}])
+    by_id = {reply["id"]: reply for reply in replies}
+    assert "error" not in by_id[1] and "error" not in by_id[2]
+    assert by_id["stop"]["status"] == "shutdown"
+    assert by_id[3]["error"] == "Worker pool is shutting down"
+    assert not pool.workers